@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Set, Dict
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from src.extractors.web_scraper import TOP_SCORERS_URL, TOP_SCORERS_COLUMNS
+from src.extractors.html_parser import parse_top_scorers
+from src.transformers.data_cleaner import clean_top_scorers
+from src.loaders.data_loader import PremierLeagueLoader, PLAYER_STATS_COLUMNS
+from src.loaders.s3_loader import S3Loader
+from src.loaders.sinks import Sink, SinkFanout
+from src.utils.rate_limiter import HostRateLimiter
+
+
+class SeasonBackfill:
+    """
+    Carga histórica de varias temporadas: descarga y parsea las páginas en un
+    pool de hilos acotado (con límite de peticiones por host) y carga cada
+    temporada en su propia transacción. Las temporadas completadas se anotan
+    en un checkpoint para poder retomar una ejecución interrumpida.
+
+    Solo se cargan los goleadores: la tabla de la BBC únicamente publica la
+    temporada en curso.
+    """
+
+    # Timeouts de conexión y lectura (segundos) por petición
+    TIMEOUT = (5, 30)
+
+    def __init__(self, from_year: int, to_year: int, workers: int = 4,
+                 checkpoint_path: Optional[str] = None, min_interval: float = 1.0,
+                 save_to_s3: bool = True):
+        """
+        Args:
+            from_year: Año de inicio de la primera temporada (1992 -> "1992-1993")
+            to_year: Año de inicio de la última temporada (incluida)
+            workers: Descargas simultáneas como máximo
+            checkpoint_path: Archivo con las temporadas ya cargadas
+            min_interval: Segundos mínimos entre peticiones al mismo host
+            save_to_s3: Guardar también cada temporada en S3
+        """
+        self.logger = logging.getLogger(__name__)
+        self.seasons = self.season_range(from_year, to_year)
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path or os.path.join('.cache', 'backfill_checkpoint.json')
+        self.rate_limiter = HostRateLimiter(min_interval)
+        self.save_to_s3 = save_to_s3
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @staticmethod
+    def season_range(from_year: int, to_year: int) -> List[str]:
+        """Temporadas entre dos años de inicio, p. ej. ['2022-2023', '2023-2024']"""
+        return [f"{year}-{year + 1}" for year in range(from_year, to_year + 1)]
+
+    def load_checkpoint(self) -> Set[str]:
+        """Temporadas ya cargadas en ejecuciones anteriores"""
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return set(json.load(f).get('completed', []))
+        except (OSError, ValueError):
+            return set()
+
+    def _save_checkpoint(self, completed: Set[str]):
+        """Guarda el checkpoint de forma atómica"""
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'completed': sorted(completed)}, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def fetch_season(self, season: str) -> Optional[pd.DataFrame]:
+        """
+        Descarga y parsea los goleadores de una temporada.
+
+        Args:
+            season: Temporada, p. ej. "2023-2024"
+
+        Returns:
+            DataFrame de goleadores o None si no se encontró la tabla
+        """
+        url = TOP_SCORERS_URL.format(season=season)
+        self.rate_limiter.wait(url)
+
+        response = self.session.get(url, timeout=self.TIMEOUT)
+        response.raise_for_status()
+
+        df = parse_top_scorers(response.text)
+        return clean_top_scorers(df) if df is not None else None
+
+    def load_season(self, loader: PremierLeagueLoader, s3_loader: Optional[S3Loader],
+                    season: str, df: pd.DataFrame) -> bool:
+        """
+        Carga una temporada en su propia transacción, escribiendo a la vez en
+        S3 (opcional) y en PostgreSQL.
+        """
+        def load_db(df: pd.DataFrame) -> bool:
+            try:
+                loader.season = season
+                loader.load_player_stats_bulk(df.rename(columns=TOP_SCORERS_COLUMNS)[PLAYER_STATS_COLUMNS])
+                loader.commit()
+                return True
+            except Exception:
+                loader.rollback()
+                raise
+
+        # La conexión del loader es compartida entre temporadas: no se puede
+        # abandonar una carga a medias, así que PostgreSQL no tiene timeout
+        sinks = [Sink('postgres', load_db, timeout=None)]
+        if s3_loader is not None:
+            sinks.append(Sink('s3', lambda df: s3_loader.save_to_s3(df, 'top_scorers', season), required=False))
+
+        results = SinkFanout(sinks).write(df, f"top_scorers {season}")
+        return SinkFanout.succeeded(results)
+
+    def run(self) -> Dict[str, List[str]]:
+        """
+        Ejecuta la carga histórica.
+
+        Returns:
+            Diccionario con las temporadas 'loaded', 'failed' y 'skipped'
+        """
+        completed = self.load_checkpoint()
+        pending = [season for season in self.seasons if season not in completed]
+        summary = {'loaded': [], 'failed': [], 'skipped': [s for s in self.seasons if s in completed]}
+
+        if not pending:
+            self.logger.info("No hay temporadas pendientes")
+            return summary
+
+        self.logger.info(f"Temporadas pendientes: {len(pending)} (ya cargadas: {len(summary['skipped'])})")
+        s3_loader = S3Loader(partitioned=True) if self.save_to_s3 else None
+
+        with PremierLeagueLoader() as loader, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_season, season): season for season in pending}
+
+            # Cada temporada se carga en cuanto llega su página
+            for future in as_completed(futures):
+                season = futures[future]
+                try:
+                    df = future.result()
+                except requests.RequestException as e:
+                    self.logger.error(f"Error al hacer la petición HTTP ({season}): {str(e)}")
+                    df = None
+                except Exception as e:
+                    self.logger.error(f"Error procesando temporada {season}: {str(e)}")
+                    df = None
+
+                if df is None or df.empty or not self.load_season(loader, s3_loader, season, df):
+                    summary['failed'].append(season)
+                    continue
+
+                completed.add(season)
+                self._save_checkpoint(completed)
+                summary['loaded'].append(season)
+                self.logger.info(f"Temporada {season} cargada ({len(df)} goleadores)")
+
+        self.session.close()
+        return summary
@@ -0,0 +1,134 @@
+"""
+Páginas HTML para los benchmarks y las pruebas del parser.
+
+Son sintéticas: imitan la estructura de la tabla de la BBC y de la de
+worldfootball.net (clases CSS, celdas, otras tablas en la página), pero el
+resto de la página es relleno generado (navegación con enlaces repetidos y un
+script de 'x'). No son páginas reales guardadas, así que los tiempos (p50) y
+el pico de memoria de los motores lxml y bs4 no reflejan el marcado real
+(anidamiento, atributos, tamaño del <head>...). src/benchmarks/fixtures/*.html
+son estas mismas páginas guardadas con save_fixtures().
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import random
+from typing import Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TEAMS = [
+    'Manchester City', 'Arsenal', 'Liverpool', 'Aston Villa', 'Tottenham Hotspur',
+    'Chelsea', 'Newcastle United', 'Manchester United', 'West Ham United', 'Crystal Palace',
+    'Brighton & Hove Albion', 'Bournemouth', 'Fulham', 'Wolverhampton Wanderers', 'Everton',
+    'Brentford', 'Nottingham Forest', 'Luton Town', 'Burnley', 'Sheffield United'
+]
+COUNTRIES = ['England', 'Norway', 'Egypt', 'Brazil', 'France', 'Portugal', 'Spain', 'Korea Republic']
+
+
+def _page(body: str, filler_kb: int) -> str:
+    """Envuelve la tabla en una página con cabecera, navegación y scripts de relleno"""
+    nav = ''.join(f'<li><a href="/sport/{i}">Enlace {i}</a></li>' for i in range(filler_kb * 4))
+    script = 'window.__DATA__ = "' + 'x' * (filler_kb * 512) + '";'
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Fixture</title>'
+        f'<script>{script}</script></head><body><header><nav><ul>{nav}</ul></nav></header>'
+        f'<main>{body}</main><footer><p>Fixture generada para benchmarks</p></footer></body></html>'
+    )
+
+
+def league_table_html(n_rows: int = 20, filler_kb: int = 64, seed: int = 0) -> str:
+    """
+    Genera una página con la estructura de la tabla de posiciones de la BBC.
+
+    Args:
+        n_rows: Número de equipos (más de 20 para versiones escaladas)
+        filler_kb: Tamaño aproximado del contenido ajeno a la tabla
+        seed: Semilla para los datos aleatorios
+    """
+    rng = random.Random(seed)
+    headers = ['Position', 'Team', 'Played', 'Won', 'Drawn', 'Lost', 'Goals For',
+               'Goals Against', 'Goal Difference', 'Points', 'Form, Last 6 games, Oldest first']
+
+    rows = []
+    for position in range(1, n_rows + 1):
+        won, drawn, lost = rng.randint(0, 28), rng.randint(0, 10), rng.randint(0, 20)
+        goals_for, goals_against = rng.randint(20, 95), rng.randint(20, 95)
+        team = TEAMS[(position - 1) % len(TEAMS)]
+        if position > len(TEAMS):
+            team = f"{team} {position // len(TEAMS)}"
+        cells = [
+            f'<td><span class="pos">{position}</span></td>',
+            f'<td><span class="team"><a href="/teams/{position}">{team}</a></span></td>',
+            *(f'<td>{value}</td>' for value in (
+                won + drawn + lost, won, drawn, lost, goals_for, goals_against,
+                goals_for - goals_against, won * 3 + drawn
+            )),
+            '<td><ul>' + ''.join(f'<li>{rng.choice("WDL")}</li>' for _ in range(6)) + '</ul></td>'
+        ]
+        rows.append(f'<tr>{"".join(cells)}</tr>')
+
+    table = (
+        '<table class="ssrcss-14j0ip6-Table e3bga5w5"><caption>Premier League Table</caption>'
+        '<thead><tr>' + ''.join(f'<th>{header}</th>' for header in headers) + '</tr></thead>'
+        '<tbody>' + ''.join(rows) + '</tbody></table>'
+    )
+    return _page(table, filler_kb)
+
+
+def top_scorers_html(n_rows: int = 300, filler_kb: int = 64, seed: int = 0) -> str:
+    """
+    Genera una página con la estructura de la tabla de goleadores de worldfootball.net.
+
+    Args:
+        n_rows: Número de goleadores
+        filler_kb: Tamaño aproximado del contenido ajeno a la tabla
+        seed: Semilla para los datos aleatorios
+    """
+    rng = random.Random(seed)
+    rows = []
+    for position in range(1, n_rows + 1):
+        goals = max(1, 40 - position // 8)
+        penalties = rng.randint(0, min(goals, 8))
+        goals_text = f'{goals} ({penalties})' if penalties else f'{goals}'
+        team = TEAMS[rng.randrange(len(TEAMS))]
+        rows.append(
+            f'<tr><td><b>{position}.</b></td>'
+            f'<td><a href="/player_summary/player-{position}/">Player {position}</a></td>'
+            f'<td><img src="/flags/{position % 8}.png" alt=""></td>'
+            f'<td>{rng.choice(COUNTRIES)}</td>'
+            f'<td><img src="/logos/{team}.gif" alt=""> <a href="/teams/{position}/">{team}</a>\n</td>'
+            f'<td><b>{goals_text}</b></td></tr>'
+        )
+
+    table = (
+        '<table class="standard_tabelle" cellpadding="3" cellspacing="1">'
+        '<tr><th>#</th><th>Player</th><th></th><th>Country</th><th>Team</th>'
+        '<th>Goals (Penalty)</th></tr>' + ''.join(rows) + '</table>'
+    )
+    # worldfootball.net incluye otras tablas en la página
+    sidebar = '<table class="auswahlbox"><tr><td>Season</td></tr></table>'
+    return _page(sidebar + table, filler_kb)
+
+
+def load_fixture(name: str) -> Optional[str]:
+    """Lee una fixture (sintética) guardada en src/benchmarks/fixtures"""
+    path = os.path.join(FIXTURES_DIR, f"{name}.html")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def save_fixtures():
+    """Regenera las fixtures guardadas (páginas sintéticas, ver el docstring del módulo)"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, html in (('league_table', league_table_html()), ('top_scorers', top_scorers_html())):
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"✅ Fixture guardada: {name}.html ({len(html) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    save_fixtures()
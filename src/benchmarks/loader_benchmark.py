@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import logging
+import time
+import pandas as pd
+from src.loaders.data_loader import PremierLeagueLoader, RoundTripCursor
+
+logging.basicConfig(level=logging.INFO)
+
+
+def build_team_stats(n_teams: int) -> pd.DataFrame:
+    """Genera una tabla de posiciones sintética"""
+    return pd.DataFrame({
+        'team_name': [f"Benchmark FC {i}" for i in range(n_teams)],
+        'position': range(1, n_teams + 1),
+        'played': [38] * n_teams,
+        'won': [20] * n_teams,
+        'drawn': [10] * n_teams,
+        'lost': [8] * n_teams,
+        'goals_for': [60] * n_teams,
+        'goals_against': [40] * n_teams,
+        'goal_difference': [20] * n_teams,
+        'points': [70] * n_teams
+    })
+
+
+def build_player_stats(n_players: int, n_teams: int) -> pd.DataFrame:
+    """Genera una tabla de goleadores sintética"""
+    return pd.DataFrame({
+        'name': [f"Benchmark Player {i}" for i in range(n_players)],
+        'team_name': [f"Benchmark FC {i % n_teams}" for i in range(n_players)],
+        'country': ['England'] * n_players,
+        'goals': [i % 30 for i in range(n_players)],
+        'penalties': [i % 5 for i in range(n_players)]
+    })
+
+
+def run_path(loader: PremierLeagueLoader, load) -> tuple:
+    """
+    Ejecuta una ruta de carga y revierte los cambios.
+
+    Returns:
+        (round-trips, segundos)
+    """
+    loader.cur = loader.conn.cursor(cursor_factory=RoundTripCursor)
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    round_trips = loader.cur.round_trips
+    loader.rollback()
+    return round_trips, elapsed
+
+
+def benchmark_loader(n_teams: int, n_players: int):
+    """Compara la carga fila a fila con la carga masiva"""
+    team_stats = build_team_stats(n_teams)
+    player_stats = build_player_stats(n_players, n_teams)
+
+    with PremierLeagueLoader() as loader:
+        results = {
+            'team_stats (fila a fila)': run_path(loader, lambda: [
+                loader.load_team_stats(row) for row in team_stats.to_dict('records')
+            ]),
+            'team_stats (bulk)': run_path(loader, lambda: loader.load_team_stats_bulk(
+                team_stats, skip_unchanged=False
+            )),
+            'player_stats (fila a fila)': run_path(loader, lambda: [
+                loader.load_player_stats(row) for row in player_stats.to_dict('records')
+            ]),
+            'player_stats (bulk)': run_path(loader, lambda: loader.load_player_stats_bulk(
+                player_stats, skip_unchanged=False
+            )),
+        }
+
+    print(f"\nEquipos: {n_teams} | Jugadores: {n_players}\n")
+    print(f"{'Ruta':<30}{'Round-trips':>12}{'Tiempo (ms)':>14}")
+    for name, (round_trips, elapsed) in results.items():
+        print(f"{name:<30}{round_trips:>12}{elapsed * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas de carga en PostgreSQL")
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--players', type=int, default=500)
+    args = parser.parse_args()
+
+    benchmark_loader(args.teams, args.players)
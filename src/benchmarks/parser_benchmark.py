@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import statistics
+import time
+import tracemalloc
+import pandas as pd
+from bs4 import BeautifulSoup
+from src.extractors.html_parser import parse_league_table, parse_top_scorers, lxml_html
+from src.transformers.data_cleaner import clean_top_scorers
+from src.benchmarks.fixtures import load_fixture, league_table_html, top_scorers_html
+
+
+def legacy_league_table(html: str) -> pd.DataFrame:
+    """Ruta original: árbol completo con html.parser y lista de filas"""
+    table = BeautifulSoup(html, "html.parser").find("table", class_="ssrcss-14j0ip6-Table e3bga5w5")
+    headers = [th.text for th in table.find_all('th')]
+    rows = [[td.text for td in row.find_all('td')] for row in table.find_all('tr')[1:]]
+    return pd.DataFrame([row for row in rows if row], columns=headers)
+
+
+def legacy_top_scorers(html: str) -> pd.DataFrame:
+    """Ruta original: árbol completo con html.parser y lista de filas"""
+    table = BeautifulSoup(html, "html.parser").find("table", class_="standard_tabelle")
+    rows = []
+    for row in table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        goals_text = cells[5].text.strip()
+        rows.append([
+            cells[0].text.strip().replace('.', ''), cells[1].text.strip(), cells[3].text.strip(),
+            cells[4].text.strip(), int(goals_text.split('(')[0]),
+            int(goals_text.split('(')[1].replace(')', '')) if '(' in goals_text else 0
+        ])
+    return pd.DataFrame(rows, columns=['Posición', 'Jugador', 'País', 'Equipo', 'Goles', 'Penales'])
+
+
+def measure(parse, html: str, repeat: int) -> tuple:
+    """
+    Mide una función de parseo.
+
+    Returns:
+        (latencia mediana en ms, pico de memoria en KB, filas)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = parse(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings) * 1000, peak / 1024, len(df)
+
+
+def benchmark_parsers(scale: int, repeat: int):
+    """Compara la ruta html.parser original con los motores de html_parser"""
+    pages = {
+        'league_table': load_fixture('league_table') if scale == 0 else league_table_html(scale),
+        'top_scorers': load_fixture('top_scorers') if scale == 0 else top_scorers_html(scale),
+    }
+    paths = {
+        'league_table': [
+            ('html.parser (original)', legacy_league_table),
+            ('bs4 + SoupStrainer', lambda html: parse_league_table(html, 'bs4')),
+        ],
+        'top_scorers': [
+            ('html.parser (original)', legacy_top_scorers),
+            # Goles y penales los separa data_cleaner: se incluye en la medida
+            ('bs4 + SoupStrainer', lambda html: clean_top_scorers(parse_top_scorers(html, 'bs4'))),
+        ],
+    }
+    if lxml_html is not None:
+        paths['league_table'].append(('lxml', lambda html: parse_league_table(html, 'lxml')))
+        paths['top_scorers'].append(('lxml', lambda html: clean_top_scorers(parse_top_scorers(html, 'lxml'))))
+
+    for page, html in pages.items():
+        if html is None:
+            print(f"❌ No se encontró la fixture {page}.html")
+            continue
+        print(f"\n{page} ({len(html) // 1024} KB)")
+        print(f"{'Motor':<26}{'Filas':>8}{'p50 (ms)':>12}{'Pico (KB)':>12}")
+        for name, parse in paths[page]:
+            latency, peak, rows = measure(parse, html, repeat)
+            print(f"{name:<26}{rows:>8}{latency:>12.2f}{peak:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de parseo HTML")
+    parser.add_argument('--scale', type=int, default=0,
+                        help="Filas de la fixture sintética (0: usar las fixtures guardadas, también sintéticas)")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    benchmark_parsers(args.scale, args.repeat)
@@ -0,0 +1,326 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import json
+import logging
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto < 5
+    try:
+        from moto import mock_s3 as mock_aws
+    except ImportError:  # sin moto no se mide la etapa de S3
+        mock_aws = None
+
+from src.benchmarks.fixtures import load_fixture, league_table_html, top_scorers_html
+from src.extractors.web_scraper import PremierLeagueScraper, LEAGUE_TABLE_COLUMNS, TOP_SCORERS_COLUMNS
+from src.extractors.html_parser import parse_league_table, parse_top_scorers
+from src.transformers.data_cleaner import clean_league_table, clean_top_scorers
+
+logging.basicConfig(level=logging.WARNING)
+
+BENCHMARK_BUCKET = 'premier-league-benchmark'
+
+
+class ReplayScraper(PremierLeagueScraper):
+    """Scraper que sirve páginas ya guardadas (sintéticas) en lugar de descargarlas"""
+
+    def __init__(self, pages: Dict[str, str]):
+        super().__init__()
+        self.pages = pages
+
+    def fetch_page(self, name: str, use_cache: bool = False) -> Optional[str]:
+        return self.pages[name]
+
+
+class PeakRSS:
+    """
+    Pico de memoria residente (MB) mientras dura el bloque, muestreando
+    /proc/self/statm. Sin /proc se usa el máximo del proceso (ru_maxrss).
+    """
+
+    INTERVAL = 0.002
+
+    def __init__(self):
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._page_mb = os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+    def _current_mb(self) -> float:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self._page_mb
+        except OSError:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self._current_mb())
+            self._stop.wait(self.INTERVAL)
+
+    def __enter__(self):
+        self.peak_mb = self._current_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._current_mb())
+
+
+def measure(stage: Callable[[], object], rows: int, repeat: int) -> Dict[str, float]:
+    """
+    Mide una etapa.
+
+    Returns:
+        Diccionario con p50/p99 (ms), filas por segundo y pico de RSS (MB)
+    """
+    stage()  # calentamiento: importaciones diferidas, cachés y conexiones
+    timings = []
+    with PeakRSS() as rss:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage()
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(round(0.99 * (len(timings) - 1))))]
+    return {
+        'rows': rows,
+        'p50_ms': p50 * 1000,
+        'p99_ms': p99 * 1000,
+        'rows_per_s': rows / p50 if p50 else 0.0,
+        'peak_rss_mb': rss.peak_mb,
+    }
+
+
+def start_local_postgres() -> Optional[object]:
+    """
+    Levanta un PostgreSQL temporal con pgserver (si está instalado) cuando no
+    hay DATABASE_URL, y aplica las migraciones.
+
+    Returns:
+        Servidor (hay que llamar a cleanup()) o None
+    """
+    try:
+        import pgserver
+    except ImportError:
+        return None
+
+    server = pgserver.get_server(tempfile.mkdtemp(prefix='pl-benchmark-pg-'), cleanup_mode='delete')
+    os.environ['DATABASE_URL'] = server.get_uri()
+
+    from src.utils.migrations import MigrationRunner
+    MigrationRunner().migrate()
+    return server
+
+
+def build_stages(scraper: ReplayScraper, with_s3: bool, with_db: bool) -> Dict[str, tuple]:
+    """
+    Etapas a medir por página: (función, filas).
+
+    Las cargas en PostgreSQL se revierten en cada repetición y las subidas a S3
+    van a un bucket simulado, así que el resultado no depende de ejecuciones
+    anteriores.
+    """
+    from src.loaders.data_loader import PremierLeagueLoader, TEAM_STATS_COLUMNS, PLAYER_STATS_COLUMNS
+
+    pages = scraper.pages
+    league = scraper.get_league_table()
+    scorers = scraper.get_top_scorers()
+    team_stats = league.rename(columns=LEAGUE_TABLE_COLUMNS)[TEAM_STATS_COLUMNS]
+    player_stats = scorers.rename(columns=TOP_SCORERS_COLUMNS)[PLAYER_STATS_COLUMNS]
+    raw_league = parse_league_table(pages['league_table'])
+    raw_scorers = parse_top_scorers(pages['top_scorers'])
+
+    stages = {
+        'league_table': {
+            'parse': (lambda: parse_league_table(pages['league_table']), len(league)),
+            'clean': (lambda: clean_league_table(raw_league), len(league)),
+            'extract': (scraper.get_league_table, len(league)),
+        },
+        'top_scorers': {
+            'parse': (lambda: parse_top_scorers(pages['top_scorers']), len(scorers)),
+            'clean': (lambda: clean_top_scorers(raw_scorers), len(scorers)),
+            'extract': (scraper.get_top_scorers, len(scorers)),
+        },
+    }
+
+    if with_s3:
+        stages['league_table']['s3'] = (
+            lambda: scraper.s3_loader.save_to_s3(league, 'league_table', scraper.season, skip_unchanged=False),
+            len(league)
+        )
+        stages['top_scorers']['s3'] = (
+            lambda: scraper.s3_loader.save_to_s3(scorers, 'top_scorers', scraper.season, skip_unchanged=False),
+            len(scorers)
+        )
+
+    if with_db:
+        def load(method, df):
+            def run():
+                with PremierLeagueLoader(scraper.season) as loader:
+                    method(loader, df)
+                    loader.rollback()
+            return run
+
+        stages['league_table']['load'] = (
+            load(lambda loader, df: loader.load_team_stats_bulk(df, skip_unchanged=False), team_stats),
+            len(team_stats)
+        )
+        stages['top_scorers']['load'] = (
+            load(lambda loader, df: loader.load_player_stats_bulk(df, skip_unchanged=False), player_stats),
+            len(player_stats)
+        )
+
+    if with_s3 and with_db:
+        from src.loaders.sinks import Sink, SinkFanout
+
+        # S3 y PostgreSQL a la vez. Con moto y un PostgreSQL local ambas
+        # etapas gastan CPU de este proceso (no hay red que solapar), así que
+        # aquí se mide sobre todo la contención del GIL; contra AWS y RDS
+        # reales la etapa tiende al destino más lento
+        for page, df in (('league_table', league), ('top_scorers', scorers)):
+            s3_write, _ = stages[page]['s3']
+            db_write, _ = stages[page]['load']
+            fanout = SinkFanout([
+                Sink('s3', lambda _, run=s3_write: run(), required=False),
+                Sink('postgres', lambda _, run=db_write: run()),
+            ])
+            stages[page]['sinks'] = (lambda fanout=fanout, page=page, df=df: fanout.write(df, page), len(df))
+
+    return stages
+
+
+def run_benchmarks(scale: int, repeat: int, with_s3: bool, with_db: bool) -> Dict[str, Dict]:
+    """
+    Reproduce las páginas por todas las etapas del pipeline.
+
+    Args:
+        scale: Filas de las páginas sintéticas (0: fixtures guardadas, también sintéticas)
+        repeat: Repeticiones por etapa
+        with_s3: Medir la subida a un S3 simulado con moto
+        with_db: Medir la carga en PostgreSQL
+
+    Returns:
+        Diccionario 'página/etapa' -> métricas
+    """
+    pages = {
+        'league_table': load_fixture('league_table') if scale == 0 else league_table_html(scale),
+        'top_scorers': load_fixture('top_scorers') if scale == 0 else top_scorers_html(scale),
+    }
+    scraper = ReplayScraper(pages)
+
+    results = {}
+    for page, stages in build_stages(scraper, with_s3, with_db).items():
+        for stage, (run, rows) in stages.items():
+            results[f"{page}/{stage}"] = measure(run, rows, repeat)
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict], scale: int, baseline_path: str,
+                          max_regression: float) -> List[str]:
+    """
+    Compara el p50 de cada etapa con una ejecución anterior guardada con --json.
+
+    Returns:
+        Etapas cuyo p50 empeoró más de max_regression (p. ej. 0.2 = 20 %)
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data['scale'] != scale:
+        raise ValueError(f"La referencia se midió con --scale {data['scale']} (ahora {scale})")
+    baseline = data['results']
+
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous and metrics['p50_ms'] > previous['p50_ms'] * (1 + max_regression):
+            regressions.append(f"{name}: {previous['p50_ms']:.2f} ms -> {metrics['p50_ms']:.2f} ms")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict]):
+    """Imprime la tabla de resultados"""
+    print(f"\n{'Etapa':<26}{'Filas':>8}{'p50 (ms)':>12}{'p99 (ms)':>12}{'Filas/s':>12}{'RSS (MB)':>11}")
+    for name, m in results.items():
+        print(f"{name:<26}{m['rows']:>8}{m['p50_ms']:>12.2f}{m['p99_ms']:>12.2f}"
+              f"{m['rows_per_s']:>12.0f}{m['peak_rss_mb']:>11.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline del pipeline con páginas sintéticas (ver src/benchmarks/fixtures.py)")
+    parser.add_argument('--scale', type=int, default=0,
+                        help="Filas de las páginas sintéticas (0: usar las fixtures guardadas, también sintéticas)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--skip-s3', action='store_true', help="No medir la subida a S3")
+    parser.add_argument('--skip-db', action='store_true', help="No medir la carga en PostgreSQL")
+    parser.add_argument('--json', dest='json_path', default=None, help="Guardar los resultados en JSON")
+    parser.add_argument('--baseline', default=None, help="JSON de una ejecución anterior para comparar")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Empeoramiento máximo del p50 respecto a --baseline (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    with_s3 = not args.skip_s3 and mock_aws is not None
+    if not args.skip_s3 and not with_s3:
+        print("⏭️  moto no está instalado: se omite la etapa de S3")
+
+    server = None
+    with_db = not args.skip_db
+    if with_db and not os.getenv('DATABASE_URL'):
+        server = start_local_postgres()
+        if server is None:
+            print("⏭️  Sin DATABASE_URL ni pgserver: se omite la carga en PostgreSQL")
+            with_db = False
+
+    mock = None
+    if with_s3:
+        # Bucket simulado: nunca se sube nada a AWS
+        os.environ.update(AWS_BUCKET_NAME=BENCHMARK_BUCKET, AWS_REGION='us-east-1',
+                          AWS_ACCESS_KEY_ID='benchmark', AWS_SECRET_ACCESS_KEY='benchmark')
+        mock = mock_aws()
+        mock.start()
+        from src.loaders.s3_loader import get_s3_client
+        get_s3_client().create_bucket(Bucket=BENCHMARK_BUCKET)
+
+    try:
+        results = run_benchmarks(args.scale, args.repeat, with_s3, with_db)
+    finally:
+        from src.utils.resources import close_all
+        close_all()
+        if mock is not None:
+            mock.stop()
+        if server is not None:
+            server.cleanup()
+
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"\n✅ Resultados guardados en {args.json_path}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.scale, args.baseline, args.max_regression)
+        for regression in regressions:
+            print(f"❌ Regresión: {regression}")
+        if regressions:
+            return 1
+        print("✅ Sin regresiones respecto a la referencia")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import re
+import logging
+from typing import Optional, Dict, List
+import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml es opcional: se usa BeautifulSoup como respaldo
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# Clases CSS de las tablas a extraer
+LEAGUE_TABLE_CLASS = "ssrcss-14j0ip6-Table e3bga5w5"
+TOP_SCORERS_CLASS = "standard_tabelle"
+
+TOP_SCORERS_HEADERS = ['Posición', 'Jugador', 'País', 'Equipo', 'Goles']
+
+_TABLE_TAG = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+_CLASS_ATTR = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def default_backend() -> str:
+    """Motor de parseo por defecto: lxml si está instalado, si no bs4"""
+    return 'lxml' if lxml_html is not None else 'bs4'
+
+
+def find_table_fragment(html: str, css_class: str) -> Optional[str]:
+    """
+    Recorta del HTML la primera tabla con la clase indicada, deteniéndose en
+    su </table>, para no construir el árbol del resto de la página.
+
+    Args:
+        html: HTML completo de la página
+        css_class: Clase (o atributo class completo) de la tabla
+
+    Returns:
+        HTML de la tabla o None si no se encontró
+    """
+    start = None
+    depth = 0
+    for match in _TABLE_TAG.finditer(html):
+        closing = match.group(1) == '/'
+
+        if start is None:
+            if closing:
+                continue
+            class_attr = _CLASS_ATTR.search(match.group(0))
+            classes = class_attr.group(2) if class_attr else ''
+            if classes == css_class or css_class in classes.split():
+                start = match.start()
+                depth = 1
+            continue
+
+        depth += -1 if closing else 1
+        if depth == 0:
+            return html[start:match.end()]
+
+    return None
+
+
+def _table_rows(fragment: str, backend: str) -> Optional[List[List[str]]]:
+    """
+    Devuelve las filas de la tabla como listas de textos de celda. La
+    primera fila contiene los textos de las celdas <th>.
+    """
+    if backend == 'lxml':
+        table = lxml_html.fragment_fromstring(fragment)
+        header = [th.text_content() for th in table.iter('th')]
+        rows = [[td.text_content() for td in tr.iter('td')] for tr in table.iter('tr')]
+    else:
+        parser = 'lxml' if lxml_html is not None else 'html.parser'
+        table = BeautifulSoup(fragment, parser, parse_only=SoupStrainer('table')).find('table')
+        if table is None:
+            return None
+        header = [th.text for th in table.find_all('th')]
+        rows = [[td.text for td in tr.find_all('td')] for tr in table.find_all('tr')]
+
+    return [header] + rows
+
+
+def parse_league_table(html: str, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Parsea la tabla de posiciones de la BBC.
+
+    Args:
+        html: HTML de la página
+        backend: 'lxml' o 'bs4' (por defecto el más rápido disponible)
+
+    Returns:
+        DataFrame con una columna por cabecera o None si no se encontró la tabla
+    """
+    fragment = find_table_fragment(html, LEAGUE_TABLE_CLASS)
+    if fragment is None:
+        return None
+
+    rows = _table_rows(fragment, backend or default_backend())
+    if rows is None:
+        return None
+    headers, rows = rows[0], rows[2:]
+
+    # Columnas construidas directamente (sin pasar por una lista de filas)
+    columns: Dict[str, List[str]] = {header: [] for header in headers}
+    for row in rows:
+        if not row:
+            continue
+        if len(row) != len(headers):
+            raise ValueError(f"Se esperaban {len(headers)} columnas y la fila tiene {len(row)}")
+        for header, value in zip(headers, row):
+            columns[header].append(value)
+
+    df = pd.DataFrame(columns)
+
+    # Limpieza básica
+    if 'Form, Last 6 games, Oldest first' in df.columns:
+        df = df.drop(["Form, Last 6 games, Oldest first"], axis=1)
+
+    return df
+
+
+def parse_top_scorers(html: str, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Parsea la tabla de goleadores de worldfootball.net. Las celdas se
+    devuelven como texto; el tipado lo hace src.transformers.data_cleaner.
+
+    Args:
+        html: HTML de la página
+        backend: 'lxml' o 'bs4' (por defecto el más rápido disponible)
+
+    Returns:
+        DataFrame con las columnas de TOP_SCORERS_HEADERS ('Goles' como
+        '27 (7)') o None si no se encontró la tabla
+    """
+    fragment = find_table_fragment(html, TOP_SCORERS_CLASS)
+    if fragment is None:
+        return None
+
+    rows = _table_rows(fragment, backend or default_backend())
+    if rows is None:
+        return None
+
+    # Celda de cada columna: posición, jugador, país, equipo y goles
+    cell_indexes = (0, 1, 3, 4, 5)
+    columns: Dict[str, List[str]] = {header: [] for header in TOP_SCORERS_HEADERS}
+    # rows[0] son las cabeceras y rows[1] la fila de títulos de la tabla
+    for cells in rows[2:]:
+        if len(cells) <= cell_indexes[-1]:
+            if len(cells) >= 4:
+                logger.warning(f"Fila de goleadores incompleta: {len(cells)} celdas")
+            continue
+        for header, index in zip(TOP_SCORERS_HEADERS, cell_indexes):
+            columns[header].append(cells[index])
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict
+
+
+class PageCache:
+    """
+    Caché en disco de las páginas descargadas, indexada por URL.
+    Guarda el ETag, el Last-Modified y un hash del contenido para hacer
+    peticiones condicionales y detectar páginas sin cambios.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 50 * 1024 * 1024):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_dir: Directorio de la caché (por defecto PAGE_CACHE_DIR o .cache/pages)
+            max_bytes: Tamaño máximo de las páginas guardadas antes de expulsar
+                las más antiguas
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir or os.getenv('PAGE_CACHE_DIR', os.path.join('.cache', 'pages'))
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+
+    @staticmethod
+    def content_hash(body: str) -> str:
+        """Hash estable del contenido de una página"""
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Devuelve la entrada de la caché para una URL, si existe"""
+        with self._lock:
+            return self._index.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Cabeceras If-None-Match / If-Modified-Since para la siguiente petición.
+
+        Args:
+            url: URL de la página
+
+        Returns:
+            Diccionario de cabeceras (vacío si la URL no está en caché)
+        """
+        entry = self.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, body: str) -> bool:
+        """Indica si el contenido coincide con el último guardado para la URL"""
+        entry = self.get(url)
+        return entry is not None and entry['hash'] == self.content_hash(body)
+
+    def read(self, url: str) -> Optional[str]:
+        """Devuelve el HTML guardado para una URL, si existe"""
+        entry = self.get(url)
+        if not entry:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, entry['file']), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, body: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        """
+        Guarda una página y sus validadores. Debe llamarse solo cuando la
+        página se procesó correctamente, para no ocultar cambios pendientes.
+
+        Args:
+            url: URL de la página
+            body: HTML de la página
+            etag: Cabecera ETag de la respuesta
+            last_modified: Cabecera Last-Modified de la respuesta
+        """
+        file_name = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+        data = body.encode('utf-8')
+
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write_atomic(os.path.join(self.cache_dir, file_name), data)
+
+            self._index[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'hash': hashlib.sha256(data).hexdigest(),
+                'file': file_name,
+                'size': len(data),
+                'stored_at': time.time()
+            }
+            self._evict()
+            self._write_atomic(self.index_path, json.dumps(self._index, indent=2).encode('utf-8'))
+
+    def _evict(self):
+        """Expulsa las páginas guardadas hace más tiempo hasta respetar max_bytes"""
+        total = sum(entry['size'] for entry in self._index.values())
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]['stored_at']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._index[url]
+            self.logger.info(f"Página expulsada de la caché: {url}")
+
+    def _read_index(self) -> Dict:
+        """Carga el índice de la caché desde disco"""
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        """Escribe un archivo de forma atómica (temporal + rename)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
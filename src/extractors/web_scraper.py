@@ -1,55 +1,207 @@
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-from typing import Optional, Dict, List
-from src.loaders.data_loader import PremierLeagueLoader
-from src.loaders.s3_loader import S3Loader
+from typing import Optional, Dict, List, Iterator, Tuple, Callable, TYPE_CHECKING
+from src.extractors.page_cache import PageCache
+from src.utils.seasons import CURRENT_SEASON
+from src.utils.metrics import span
+from src.loaders.sinks import Sink, SinkFanout, PIPELINE_SINKS
+
+# pandas, pyarrow, bs4, boto3 y psycopg2 se importan en las etapas que los
+# usan: una ejecución sin páginas nuevas no llega a cargarlos
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.loaders.s3_loader import S3Loader
+
+LEAGUE_TABLE_URL = 'https://www.bbc.com/sport/football/premier-league/table'
+TOP_SCORERS_URL = 'https://www.worldfootball.net/goalgetter/eng-premier-league-{season}/'
+
+# Correspondencia entre las columnas extraídas y las del loader
+LEAGUE_TABLE_COLUMNS = {
+    'Team': 'team_name',
+    'Position': 'position',
+    'Played': 'played',
+    'Won': 'won',
+    'Drawn': 'drawn',
+    'Lost': 'lost',
+    'Goals For': 'goals_for',
+    'Goals Against': 'goals_against',
+    'Goal Difference': 'goal_difference',
+    'Points': 'points'
+}
+TOP_SCORERS_COLUMNS = {
+    'Jugador': 'name',
+    'Equipo': 'team_name',
+    'País': 'country',
+    'Goles': 'goals',
+    'Penales': 'penalties'
+}
 
 
 class PremierLeagueScraper:
-    def __init__(self):
+    # Timeouts de conexión y lectura (segundos) por petición
+    TIMEOUT = (5, 30)
+    # Descargas simultáneas como máximo
+    MAX_WORKERS = 4
+
+    def __init__(self, season: str = CURRENT_SEASON):
+        """
+        Args:
+            season: Temporada a extraer, p. ej. "2023-2024"
+        """
         self.logger = logging.getLogger(__name__)
+        self.season = season
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.urls = {
-            'league_table': 'https://www.bbc.com/sport/football/premier-league/table',
-            'top_scorers': 'https://www.worldfootball.net/goalgetter/eng-premier-league-2023-2024/'
+            'league_table': LEAGUE_TABLE_URL,
+            'top_scorers': TOP_SCORERS_URL.format(season=season)
         }
-        self.loader = PremierLeagueLoader()
-        self.s3_loader = S3Loader()
 
-    def get_league_table(self) -> Optional[pd.DataFrame]:
-        """Extrae la tabla de posiciones"""
-        try:
-            response = requests.get(self.urls['league_table'], headers=self.headers)
+        # Sesión compartida: reutiliza las conexiones de cada host
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Motor de parseo HTML (None: el más rápido disponible)
+        self.parser_backend: Optional[str] = None
+
+        # Caché de páginas para peticiones condicionales
+        self.page_cache = PageCache()
+        self._pending_pages: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+        # Páginas con algún destino fallido (aunque sea opcional): no se marcan
+        # como procesadas para que la siguiente ejecución vuelva a escribirlas
+        self._failed_sinks: Dict[str, List[str]] = {}
+
+        # Las conexiones a PostgreSQL y S3 salen de src.utils.resources en el
+        # primer uso: cada carga toma su propia conexión del pool
+        self._s3_loader: Optional['S3Loader'] = None
+        # Destinos de cada dataset ('s3', 'postgres'), escritos en paralelo
+        self.sink_names: List[str] = list(PIPELINE_SINKS)
+
+    @property
+    def s3_loader(self) -> 'S3Loader':
+        """Loader de S3 (se crea en el primer uso)"""
+        if self._s3_loader is None:
+            from src.loaders.s3_loader import S3Loader
+            self._s3_loader = S3Loader(partitioned=True)
+        return self._s3_loader
+
+    def fetch_page(self, name: str, use_cache: bool = False) -> Optional[str]:
+        """
+        Descarga una de las páginas configuradas en self.urls.
+
+        Args:
+            name: Clave de la página en self.urls
+            use_cache: Si es True se hace una petición condicional y se devuelve
+                None cuando la página no cambió desde la última carga
+
+        Returns:
+            HTML de la página o None si no hubo cambios
+        """
+        url = self.urls[name]
+        headers = self.page_cache.conditional_headers(url) if use_cache else {}
+
+        with span('fetch', page=name) as fetch:
+            response = self.session.get(url, headers=headers, timeout=self.TIMEOUT)
+            fetch.add(bytes=len(response.content), round_trips=1)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            table = soup.find("table", class_="ssrcss-14j0ip6-Table e3bga5w5")
-
-            if not table:
-                self.logger.error("No se encontró la tabla de posiciones")
+        if use_cache:
+            if response.status_code == 304 or self.page_cache.is_unchanged(url, response.text):
+                self.logger.info(f"Página sin cambios: {url}")
                 return None
+            # Los validadores se guardan cuando la página se procesa correctamente
+            self._pending_pages[name] = (
+                response.text, response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+
+        return response.text
+
+    def mark_processed(self, name: str):
+        """
+        Guarda en la caché la página descargada una vez procesada. Si algún
+        destino falló no se guarda: la siguiente ejecución la descargará de
+        nuevo y reintentará todos los destinos (son idempotentes).
+        """
+        pending = self._pending_pages.pop(name, None)
+        failed = self._failed_sinks.pop(name, None)
+        if failed:
+            self.logger.warning(f"{name} no se marca como procesada (falló {', '.join(failed)}): "
+                                f"se reintentará en la siguiente ejecución")
+            return
+        if pending:
+            self.page_cache.store(self.urls[name], *pending)
+
+    def write_sinks(self, dataset: str, df: 'pd.DataFrame',
+                    load_db: Callable[['pd.DataFrame'], bool]) -> bool:
+        """
+        Escribe un dataset en todos sus destinos a la vez.
+
+        Returns:
+            bool: True si los destinos obligatorios terminaron bien
+        """
+        results = SinkFanout(self.build_sinks(dataset, load_db)).write(df, dataset)
+        failed = SinkFanout.failed_sinks(results)
+        if failed:
+            self._failed_sinks[dataset] = failed
+        else:
+            self._failed_sinks.pop(dataset, None)
+        return SinkFanout.succeeded(results)
+
+    def fetch_pages(self, names: Optional[List[str]] = None,
+                    use_cache: bool = True) -> Iterator[Tuple[str, Optional[str], bool]]:
+        """
+        Descarga en paralelo las páginas configuradas y las devuelve a medida
+        que llegan.
+
+        Args:
+            names: Claves de self.urls a descargar (por defecto todas)
+            use_cache: Usar peticiones condicionales contra la caché de páginas
+
+        Yields:
+            Tuplas (nombre, HTML, ok); ok es False si la descarga falló y el
+            HTML es None si falló o si la página no cambió
+        """
+        names = names or list(self.urls)
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(names))) as executor:
+            futures = {executor.submit(self.fetch_page, name, use_cache): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    yield name, future.result(), True
+                except requests.RequestException as e:
+                    self.logger.error(f"Error al hacer la petición HTTP ({name}): {str(e)}")
+                    yield name, None, False
+
+    def get_league_table(self, html: Optional[str] = None) -> Optional['pd.DataFrame']:
+        """
+        Extrae la tabla de posiciones
+
+        Args:
+            html: HTML ya descargado; si es None se descarga la página
+        """
+        try:
+            if html is None:
+                html = self.fetch_page('league_table')
 
-            # Extraer headers
-            headers = [th.text for th in table.find_all('th')]
-
-            # Extraer datos
-            rows = []
-            for row in table.find_all('tr')[1:]:
-                row_data = [td.text for td in row.find_all('td')]
-                if row_data:
-                    rows.append(row_data)
-
-            # Crear DataFrame
-            df = pd.DataFrame(rows, columns=headers)
+            from src.extractors.html_parser import parse_league_table
+            from src.transformers.data_cleaner import clean_league_table
 
-            # Limpieza básica
-            if 'Form, Last 6 games, Oldest first' in df.columns:
-                df = df.drop(["Form, Last 6 games, Oldest first"], axis=1)
+            with span('parse', page='league_table') as parse:
+                df = parse_league_table(html, self.parser_backend)
+                parse.add(bytes=len(html), rows=0 if df is None else len(df))
+            if df is None:
+                self.logger.error("No se encontró la tabla de posiciones")
+                return None
 
+            with span('transform', page='league_table') as transform:
+                df = clean_league_table(df)
+                transform.add(rows=len(df))
             return df
 
         except requests.RequestException as e:
@@ -59,56 +211,30 @@ class PremierLeagueScraper:
             self.logger.error(f"Error inesperado: {str(e)}")
             return None
 
-    def get_top_scorers(self) -> Optional[pd.DataFrame]:
-        """Extrae la tabla de goleadores"""
+    def get_top_scorers(self, html: Optional[str] = None) -> Optional['pd.DataFrame']:
+        """
+        Extrae la tabla de goleadores
+
+        Args:
+            html: HTML ya descargado; si es None se descarga la página
+        """
         try:
-            response = requests.get(self.urls['top_scorers'], headers=self.headers)
-            response.raise_for_status()
+            if html is None:
+                html = self.fetch_page('top_scorers')
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            table = soup.find("table", class_="standard_tabelle")
+            from src.extractors.html_parser import parse_top_scorers
+            from src.transformers.data_cleaner import clean_top_scorers
 
-            if not table:
+            with span('parse', page='top_scorers') as parse:
+                df = parse_top_scorers(html, self.parser_backend)
+                parse.add(bytes=len(html), rows=0 if df is None else len(df))
+            if df is None:
                 self.logger.error("No se encontró la tabla de goleadores")
                 return None
 
-            # Extraer datos
-            rows = []
-            first_row = True
-
-            for row in table.find_all('tr'):
-                if first_row:
-                    first_row = False
-                    continue
-
-                cells = row.find_all('td')
-                if len(cells) >= 4:
-                    try:
-                        position = cells[0].text.strip().replace('.', '')
-                        player = cells[1].text.strip()
-                        country = cells[3].text.strip()
-                        team = cells[4].text.strip().replace('\n', '').strip()
-                        goals_text = cells[5].text.strip()
-
-                        goals = int(goals_text.split('(')[0].strip())
-                        penalties = 0
-                        if '(' in goals_text:
-                            penalties = int(goals_text.split('(')[1].replace(')', '').strip())
-
-                        rows.append([
-                            position,
-                            player,
-                            country,
-                            team,
-                            goals,
-                            penalties
-                        ])
-                    except Exception as e:
-                        self.logger.warning(f"Error procesando fila: {e}")
-                        continue
-
-            # Crear DataFrame
-            df = pd.DataFrame(rows, columns=['Posición', 'Jugador', 'País', 'Equipo', 'Goles', 'Penales'])
+            with span('transform', page='top_scorers') as transform:
+                df = clean_top_scorers(df)
+                transform.add(rows=len(df))
             return df
 
         except requests.RequestException as e:
@@ -118,98 +244,128 @@ class PremierLeagueScraper:
             self.logger.error(f"Error inesperado: {str(e)}")
             return None
 
-    def extract_and_load_league_table(self) -> bool:
+    def build_sinks(self, dataset: str, load_db: Callable[['pd.DataFrame'], bool]) -> List[Sink]:
+        """
+        Destinos configurados de un dataset. S3 es el archivo histórico y es
+        opcional; PostgreSQL es obligatorio: si falla, la página no se marca
+        como procesada y se vuelve a cargar en la siguiente ejecución.
+
+        Args:
+            dataset: 'league_table' o 'top_scorers'
+            load_db: Función que carga el DataFrame en PostgreSQL
+        """
+        sinks = []
+        if 's3' in self.sink_names:
+            sinks.append(Sink('s3', lambda df: self.s3_loader.save_to_s3(df, dataset, self.season), required=False))
+        if 'postgres' in self.sink_names:
+            sinks.append(Sink('postgres', load_db))
+        return sinks
+
+    def load_league_table_db(self, df: 'pd.DataFrame') -> bool:
+        """Carga la tabla de posiciones en PostgreSQL y refresca current_standings"""
+        from src.loaders.data_loader import PremierLeagueLoader, TEAM_STATS_COLUMNS
+
+        team_stats = df.rename(columns=LEAGUE_TABLE_COLUMNS)[TEAM_STATS_COLUMNS]
+        with PremierLeagueLoader(self.season) as loader:
+            written = loader.load_team_stats_bulk(team_stats)
+            loader.commit()
+            self.logger.info("Tabla de posiciones cargada exitosamente")
+
+            if written and not loader.refresh_current_standings():
+                self.logger.warning("La vista current_standings no se pudo refrescar")
+        return True
+
+    def load_top_scorers_db(self, df: 'pd.DataFrame') -> bool:
+        """Carga la tabla de goleadores en PostgreSQL"""
+        from src.loaders.data_loader import PremierLeagueLoader, PLAYER_STATS_COLUMNS
+
+        player_stats = df.rename(columns=TOP_SCORERS_COLUMNS)[PLAYER_STATS_COLUMNS]
+        with PremierLeagueLoader(self.season) as loader:
+            loader.load_player_stats_bulk(player_stats)
+            loader.commit()
+        self.logger.info("Tabla de goleadores cargada exitosamente")
+        return True
+
+    def extract_and_load_league_table(self, html: Optional[str] = None) -> bool:
         try:
-            df = self.get_league_table()
+            df = self.get_league_table(html)
             if df is None:
                 return False
 
-            # Guardar en S3
-            self.logger.info("Guardando tabla de posiciones en S3...")
-            if self.s3_loader.save_to_s3(df, 'league_table'):
-                self.logger.info("Tabla de posiciones guardada en S3")
-            else:
-                self.logger.error("Error guardando tabla de posiciones en S3")
-
-            # Cargar en PostgreSQL
-            for _, row in df.iterrows():
-                team_stats = {
-                    'team_name': row['Team'],
-                    'position': int(row['Position']),
-                    'played': int(row['Played']),
-                    'won': int(row['Won']),
-                    'drawn': int(row['Drawn']),
-                    'lost': int(row['Lost']),
-                    'goals_for': int(row['Goals For']),
-                    'goals_against': int(row['Goals Against']),
-                    'goal_difference': int(row['Goal Difference']),
-                    'points': int(row['Points'])
-                }
-                self.loader.load_team_stats(team_stats)
-
-            self.loader.commit()
-            self.logger.info("Tabla de posiciones cargada exitosamente")
-            return True
+            # S3 y PostgreSQL se escriben a la vez
+            return self.write_sinks('league_table', df, self.load_league_table_db)
 
         except Exception as e:
             self.logger.error(f"Error procesando tabla de posiciones: {str(e)}")
-            self.loader.rollback()
             return False
 
-    def extract_and_load_top_scorers(self) -> bool:
+    def extract_and_load_top_scorers(self, html: Optional[str] = None) -> bool:
         try:
-            df = self.get_top_scorers()
+            df = self.get_top_scorers(html)
             if df is None:
                 return False
 
-            # Guardar en S3
-            self.logger.info("Guardando tabla de goleadores en S3...")
-            if self.s3_loader.save_to_s3(df, 'top_scorers'):
-                self.logger.info("Tabla de goleadores guardada en S3")
-            else:
-                self.logger.error("Error guardando tabla de goleadores en S3")
-
-            # Cargar en PostgreSQL
-            for _, row in df.iterrows():
-                player_stats = {
-                    'name': row['Jugador'],
-                    'team_name': row['Equipo'],
-                    'country': row['País'],
-                    'goals': int(row['Goles']),
-                    'penalties': int(row['Penales'])
-                }
-                self.loader.load_player_stats(player_stats)
-
-            self.loader.commit()
-            self.logger.info("Tabla de goleadores cargada exitosamente")
-            return True
+            # S3 y PostgreSQL se escriben a la vez
+            return self.write_sinks('top_scorers', df, self.load_top_scorers_db)
 
         except Exception as e:
             self.logger.error(f"Error procesando tabla de goleadores: {str(e)}")
-            self.loader.rollback()
             return False
 
-    def update_all_data(self):
-        """Actualiza todos los datos"""
+    def stages(self) -> Dict[str, Tuple[str, Callable[[Optional[str]], bool]]]:
+        """
+        Etapas del pipeline por página.
+
+        Returns:
+            Diccionario nombre -> (descripción, función de extracción y carga)
+        """
+        return {
+            'league_table': ("tabla de posiciones", self.extract_and_load_league_table),
+            'top_scorers': ("tabla de goleadores", self.extract_and_load_top_scorers),
+        }
+
+    def update_all_data(self) -> bool:
+        """
+        Actualiza todos los datos
+
+        Returns:
+            bool: False si alguna página no se pudo descargar o cargar
+        """
+        stages = self.stages()
+        success = True
+
         try:
             print("Iniciando actualización de datos...")
 
-            print("\n1. Actualizando tabla de posiciones...")
-            if self.extract_and_load_league_table():
-                print("✅ Tabla de posiciones actualizada")
-            else:
-                print("❌ Error actualizando tabla de posiciones")
-
-            print("\n2. Actualizando tabla de goleadores...")
-            if self.extract_and_load_top_scorers():
-                print("✅ Tabla de goleadores actualizada")
-            else:
-                print("❌ Error actualizando tabla de goleadores")
+            # Las páginas se descargan en paralelo y cada una se carga (con su
+            # propia conexión del pool) en cuanto llega
+            with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+                loads = {}
+                for name, html, ok in self.fetch_pages(list(stages)):
+                    label, extract_and_load = stages[name]
+                    if ok and html is None:
+                        print(f"⏭️  {label.capitalize()} sin cambios")
+                    elif ok:
+                        loads[executor.submit(extract_and_load, html)] = name
+                    else:
+                        success = False
+                        print(f"❌ Error actualizando {label}")
+
+                for future in as_completed(loads):
+                    name = loads[future]
+                    label = stages[name][0]
+                    if future.result():
+                        self.mark_processed(name)
+                        print(f"✅ {label.capitalize()} actualizada")
+                    else:
+                        success = False
+                        print(f"❌ Error actualizando {label}")
 
             print("\n✅ Proceso de actualización completado")
+            return success
 
         except Exception as e:
             print(f"\n❌ Error durante la actualización: {str(e)}")
+            return False
         finally:
-            if hasattr(self, 'loader'):
-                self.loader.__exit__(None, None, None)
\ No newline at end of file
+            self.session.close()
@@ -1,38 +1,216 @@
-import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2.extensions import cursor as PgCursor
+from psycopg2.extras import execute_values, Json
+from contextlib import contextmanager
 from datetime import datetime
 import logging
-from typing import List, Dict, Any
-import os
+import threading
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+import pandas as pd
+from src.utils.hashing import frame_hash, keyed_row_hashes
+from src.utils.resources import get_pg_connection, release_pg_connection
+from src.utils.seasons import CURRENT_SEASON
+from src.utils.metrics import Span, span
+from src.utils.query_cache import invalidate_tables, written_table
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Columnas esperadas por las cargas masivas
+TEAM_STATS_COLUMNS = [
+    'team_name', 'position', 'played', 'won', 'drawn', 'lost',
+    'goals_for', 'goals_against', 'goal_difference', 'points'
+]
+PLAYER_STATS_COLUMNS = ['name', 'team_name', 'country', 'goals', 'penalties']
+
+
+class RoundTripCursor(PgCursor):
+    """
+    Cursor que cuenta cada sentencia enviada al servidor (un round-trip) y
+    anota las tablas en las que escribe para invalidar la caché de consultas
+    al confirmar.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.round_trips = 0
+        self.written_tables: Set[str] = set()
+
+    def execute(self, query, vars=None):
+        self.round_trips += 1
+        table = written_table(query)
+        if table:
+            self.written_tables.add(table)
+        return super().execute(query, vars)
+
+
+class IdCache:
+    """
+    Caché de claves naturales -> IDs de equipos y jugadores compartida por
+    todos los loaders del proceso: se carga una vez y sobrevive entre
+    ejecuciones (p. ej. entre sondeos del modo serve). Solo guarda IDs ya
+    confirmados; cada loader mantiene aparte los de su transacción en curso.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.teams: Dict[str, int] = {}
+        self.players: Dict[Tuple[str, int], Tuple[int, str]] = {}
+        self.warm = False
+
+    def load(self, cur):
+        """
+        Carga los IDs existentes con una consulta por tabla (solo la primera vez).
+
+        Args:
+            cur: Cursor con el que consultar
+        """
+        with self._lock:
+            if self.warm:
+                return
+            cur.execute("SELECT name, team_id FROM teams;")
+            teams = dict(cur.fetchall())
+
+            cur.execute("SELECT name, team_id, player_id, country FROM players;")
+            players = {
+                (name, team_id): (player_id, country)
+                for name, team_id, player_id, country in cur.fetchall()
+            }
+
+            self.teams, self.players, self.warm = teams, players, True
+
+    def merge(self, teams: Dict[str, int], players: Dict[Tuple[str, int], Tuple[int, str]]):
+        """Añade los IDs de una transacción ya confirmada"""
+        with self._lock:
+            self.teams.update(teams)
+            self.players.update(players)
+
+    def clear(self):
+        """Descarta la caché (se vuelve a cargar en el siguiente uso)"""
+        with self._lock:
+            self.teams = {}
+            self.players = {}
+            self.warm = False
+
+
+_id_cache = IdCache()
+
+
+def get_id_cache() -> IdCache:
+    """Caché de IDs compartida por todo el proceso"""
+    return _id_cache
+
+
 class PremierLeagueLoader:
     """
     Clase para cargar datos de la Premier League en la base de datos.
     Maneja la inserción y actualización de equipos, jugadores y estadísticas.
     """
 
-    def __init__(self):
-        """Inicializa la conexión a la base de datos"""
-        self.conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-        self.cur = self.conn.cursor()
+    # Filas por sentencia en las cargas masivas con execute_values
+    BULK_PAGE_SIZE = 1000
+
+    def __init__(self, season: str = CURRENT_SEASON):
+        """
+        Toma una conexión del pool compartido. Cada loader es una unidad de
+        trabajo: se confirma con commit() y al salir del contexto se revierte
+        lo que no se haya confirmado y la conexión vuelve al pool.
+
+        Args:
+            season: Temporada a la que se asignan las estadísticas
+        """
+        self.conn = get_pg_connection()
+        self.cur = self.conn.cursor(cursor_factory=RoundTripCursor)
         self.logger = logging.getLogger(__name__)
-        self.season = "2023-2024"  # Temporada actual
+        self.season = season
+
+        # Caché de claves naturales -> IDs del proceso (se carga en el primer
+        # uso) y los IDs de la transacción en curso, que se añaden al confirmar
+        self._ids = get_id_cache()
+        self._new_team_ids: Dict[str, int] = {}
+        self._new_player_ids: Dict[Tuple[str, int], Tuple[int, str]] = {}
+        # Partición de team_stats de la temporada ya creada en esta sesión
+        self._partition_ready = False
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Cierra las conexiones al salir del contexto"""
+        """Devuelve la conexión al pool al salir del contexto"""
+        self.close()
+
+    def close(self):
+        """Cierra el cursor y devuelve la conexión al pool (revirtiendo lo no confirmado)"""
+        if self.conn is None:
+            return
         self.cur.close()
-        self.conn.close()
+        release_pg_connection(self.conn)
+        self.conn = None
+
+    def warm_cache(self):
+        """
+        Carga en la caché del proceso los IDs de equipos y jugadores
+        existentes con una sola consulta por tabla (si no estaba ya cargada).
+        """
+        self._ids.load(self.cur)
+
+    def invalidate_cache(self):
+        """
+        Descarta la caché de IDs de todo el proceso (p. ej. si se borraron
+        equipos o jugadores fuera del pipeline). No hace falta tras un
+        rollback: la caché compartida solo guarda IDs confirmados.
+        """
+        self._new_team_ids = {}
+        self._new_player_ids = {}
+        self._ids.clear()
+
+    def _team_id(self, name: str) -> Optional[int]:
+        """ID conocido de un equipo (de esta transacción o ya confirmado)"""
+        team_id = self._new_team_ids.get(name)
+        return team_id if team_id is not None else self._ids.teams.get(name)
+
+    def _player(self, key: Tuple[str, int]) -> Optional[Tuple[int, str]]:
+        """(ID, país) conocidos de un jugador por (nombre, ID del equipo)"""
+        return self._new_player_ids.get(key) or self._ids.players.get(key)
+
+    @contextmanager
+    def _upsert_span(self, dataset: str) -> Iterator[Span]:
+        """Span 'db_upsert' de una carga con los round-trips de su cursor"""
+        start = getattr(self.cur, 'round_trips', 0)
+        with span('db_upsert', dataset=dataset) as upsert:
+            try:
+                yield upsert
+            finally:
+                upsert.add(round_trips=getattr(self.cur, 'round_trips', 0) - start)
+
+    def ensure_season_partition(self):
+        """Crea la partición de team_stats de la temporada si no existe"""
+        if self._partition_ready:
+            return
+        self.cur.execute("SELECT ensure_team_stats_partition(%s);", (self.season,))
+        self._partition_ready = True
+
+    def refresh_current_standings(self) -> bool:
+        """
+        Refresca la vista materializada current_standings sin bloquear las
+        lecturas y confirma la transacción.
+
+        Returns:
+            bool: True si se refrescó correctamente
+        """
+        try:
+            self.cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY current_standings;")
+            self.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error refrescando current_standings: {str(e)}")
+            self.conn.rollback()
+            self.cur.written_tables.clear()
+            return False
 
     def load_team(self, team_name: str) -> int:
         """
-        Carga o actualiza un equipo y devuelve su ID.
+        Carga un equipo si no existe y devuelve su ID.
 
         Args:
             team_name: Nombre del equipo
@@ -41,17 +219,7 @@ class PremierLeagueLoader:
             ID del equipo en la base de datos
         """
         try:
-            # Intentar insertar el equipo si no existe
-            self.cur.execute("""
-                INSERT INTO teams (name)
-                VALUES (%s)
-                ON CONFLICT (name) DO UPDATE 
-                SET updated_at = CURRENT_TIMESTAMP
-                RETURNING team_id;
-            """, (team_name,))
-
-            team_id = self.cur.fetchone()[0]
-            return team_id
+            return self.load_teams_bulk([team_name])[team_name]
 
         except Exception as e:
             self.logger.error(f"Error cargando equipo {team_name}: {str(e)}")
@@ -73,22 +241,8 @@ class PremierLeagueLoader:
             ID del jugador en la base de datos
         """
         try:
-            # Primero obtener el team_id
-            team_id = self.load_team(player_data['team_name'])
-
-            # Insertar o actualizar jugador
-            self.cur.execute("""
-                INSERT INTO players (name, country, team_id)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (name, team_id) DO UPDATE 
-                SET 
-                    country = EXCLUDED.country,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING player_id;
-            """, (player_data['name'], player_data['country'], team_id))
-
-            player_id = self.cur.fetchone()[0]
-            return player_id
+            key = (player_data['name'], player_data['team_name'])
+            return self._load_players([(*key, player_data['country'])])[key]
 
         except Exception as e:
             self.logger.error(f"Error cargando jugador {player_data['name']}: {str(e)}")
@@ -115,13 +269,14 @@ class PremierLeagueLoader:
         """
         try:
             team_id = self.load_team(stats_data['team_name'])
+            self.ensure_season_partition()
 
             self.cur.execute("""
                 INSERT INTO team_stats 
                 (team_id, season, position, played, won, drawn, lost, 
                  goals_for, goals_against, goal_difference, points)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (team_id, season, updated_at) DO UPDATE 
+                ON CONFLICT (team_id, season, snapshot_date) DO UPDATE 
                 SET 
                     position = EXCLUDED.position,
                     played = EXCLUDED.played,
@@ -187,10 +342,313 @@ class PremierLeagueLoader:
             self.logger.error(f"Error cargando estadísticas del jugador {stats_data['name']}: {str(e)}")
             raise
 
+    def load_teams_bulk(self, team_names: Iterable[str]) -> Dict[str, int]:
+        """
+        Carga en una sola sentencia los equipos que aún no existen.
+
+        Args:
+            team_names: Nombres de los equipos (se ignoran duplicados)
+
+        Returns:
+            Diccionario nombre -> ID del equipo
+        """
+        names = list(dict.fromkeys(team_names))
+        self.warm_cache()
+
+        # Orden fijo: dos cargas en paralelo bloquean las filas en el mismo orden
+        new_names = sorted(name for name in names if self._team_id(name) is None)
+        if new_names:
+            try:
+                rows = execute_values(self.cur, """
+                    INSERT INTO teams (name)
+                    VALUES %s
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING name, team_id;
+                """, [(name,) for name in new_names], page_size=self.BULK_PAGE_SIZE, fetch=True)
+                self._new_team_ids.update(rows)
+
+                # Equipos insertados por otro loader o proceso desde que se cargó la caché
+                missing = [name for name in new_names if self._team_id(name) is None]
+                if missing:
+                    self.cur.execute(
+                        "SELECT name, team_id FROM teams WHERE name = ANY(%s);", (missing,)
+                    )
+                    self._new_team_ids.update(self.cur.fetchall())
+
+            except Exception as e:
+                self.logger.error(f"Error cargando equipos en bloque: {str(e)}")
+                raise
+
+        return {name: self._team_id(name) for name in names}
+
+    def _load_players(self, players: List[tuple]) -> Dict[tuple, int]:
+        """
+        Carga los jugadores nuevos y actualiza el país de los que cambiaron.
+
+        Args:
+            players: Tuplas (nombre, nombre del equipo, país)
+
+        Returns:
+            Diccionario (nombre, nombre del equipo) -> ID del jugador
+        """
+        team_ids = self.load_teams_bulk(team_name for _, team_name, _ in players)
+
+        # Un jugador por (nombre, equipo): la última aparición gana
+        countries = {(name, team_ids[team_name]): country for name, team_name, country in players}
+
+        known = {key: self._player(key) for key in countries}
+        new_players = [
+            (name, country, team_id) for (name, team_id), country in countries.items()
+            if known[(name, team_id)] is None
+        ]
+        changed_players = [
+            (known[key][0], country) for key, country in countries.items()
+            if known[key] is not None and known[key][1] != country
+        ]
+
+        if new_players:
+            rows = execute_values(self.cur, """
+                INSERT INTO players (name, country, team_id)
+                VALUES %s
+                ON CONFLICT (name, team_id) DO UPDATE 
+                SET 
+                    country = EXCLUDED.country,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING name, team_id, player_id, country;
+            """, new_players, page_size=self.BULK_PAGE_SIZE, fetch=True)
+            for name, team_id, player_id, country in rows:
+                self._new_player_ids[(name, team_id)] = (player_id, country)
+
+        if changed_players:
+            execute_values(self.cur, """
+                UPDATE players AS p
+                SET country = v.country
+                FROM (VALUES %s) AS v (player_id, country)
+                WHERE p.player_id = v.player_id;
+            """, changed_players, page_size=self.BULK_PAGE_SIZE)
+            for key, country in countries.items():
+                self._new_player_ids[key] = (self._player(key)[0], country)
+
+        return {
+            (name, team_name): self._player((name, team_ids[team_name]))[0]
+            for name, team_name, _ in players
+        }
+
+    def load_players_bulk(self, df: pd.DataFrame) -> Dict[tuple, int]:
+        """
+        Carga o actualiza varios jugadores (y sus equipos) en bloque.
+
+        Args:
+            df: DataFrame con las columnas 'name', 'team_name' y 'country'
+
+        Returns:
+            Diccionario (nombre, nombre del equipo) -> ID del jugador
+        """
+        if df.empty:
+            return {}
+
+        try:
+            return self._load_players(list(zip(
+                df['name'].tolist(), df['team_name'].tolist(), df['country'].tolist()
+            )))
+
+        except Exception as e:
+            self.logger.error(f"Error cargando jugadores en bloque: {str(e)}")
+            raise
+
+    def _read_load_state(self, dataset: str) -> tuple:
+        """
+        Hash del contenido y de cada fila de la última carga de un dataset.
+
+        Returns:
+            (hash del contenido o None, diccionario clave -> hash de fila)
+        """
+        self.cur.execute("""
+            SELECT content_hash, row_hashes
+            FROM load_state
+            WHERE dataset = %s AND season = %s;
+        """, (dataset, self.season))
+        row = self.cur.fetchone()
+        return (row[0], row[1] or {}) if row else (None, {})
+
+    def _save_load_state(self, dataset: str, content_hash: str, hashes: Dict[str, str]):
+        """Guarda los hashes de la carga actual (en la misma transacción)"""
+        self.cur.execute("""
+            INSERT INTO load_state (dataset, season, content_hash, row_hashes)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (dataset, season) DO UPDATE 
+            SET 
+                content_hash = EXCLUDED.content_hash,
+                row_hashes = EXCLUDED.row_hashes,
+                updated_at = CURRENT_TIMESTAMP;
+        """, (dataset, self.season, content_hash, Json(hashes)))
+
+    def _changed_rows(self, dataset: str, df: pd.DataFrame, key_columns: List[str]) -> tuple:
+        """
+        Compara un DataFrame normalizado con la última carga del dataset.
+
+        Args:
+            dataset: Nombre del dataset en load_state
+            df: DataFrame normalizado (una fila por clave)
+            key_columns: Columnas de la clave natural
+
+        Returns:
+            (filas nuevas o modificadas, hash del contenido, hashes por fila)
+        """
+        content_hash = frame_hash(df)
+        previous_hash, previous_rows = self._read_load_state(dataset)
+        if content_hash == previous_hash:
+            return df.iloc[0:0], content_hash, previous_rows
+
+        hashes = keyed_row_hashes(df, key_columns)
+        changed = [previous_rows.get(key) != row_hash for key, row_hash in hashes.items()]
+        return df[changed], content_hash, hashes
+
+    def load_team_stats_bulk(self, df: pd.DataFrame, skip_unchanged: bool = True) -> int:
+        """
+        Carga o actualiza las estadísticas de todos los equipos de un DataFrame
+        con unas pocas sentencias multi-fila en lugar de una por fila.
+
+        Args:
+            df: DataFrame con las columnas de TEAM_STATS_COLUMNS
+            skip_unchanged: Escribir solo las filas que cambiaron desde la
+                última carga de la temporada
+
+        Returns:
+            Número de filas enviadas a la base de datos
+        """
+        if df.empty:
+            return 0
+
+        with self._upsert_span('team_stats') as upsert:
+            try:
+                df = df[TEAM_STATS_COLUMNS].drop_duplicates(subset='team_name', keep='last')
+                df = df.astype({col: int for col in TEAM_STATS_COLUMNS[1:]})
+
+                if skip_unchanged:
+                    df, content_hash, hashes = self._changed_rows('team_stats', df, ['team_name'])
+                    if df.empty:
+                        self.logger.info("Tabla de posiciones sin cambios: no se escribe nada")
+                        return 0
+
+                team_ids = self.load_teams_bulk(df['team_name'].tolist())
+                self.ensure_season_partition()
+
+                columns = [df[col].tolist() for col in TEAM_STATS_COLUMNS[1:]]
+                rows = [
+                    (team_ids[team_name], self.season, *stats)
+                    for team_name, *stats in zip(df['team_name'].tolist(), *columns)
+                ]
+
+                execute_values(self.cur, """
+                    INSERT INTO team_stats 
+                    (team_id, season, position, played, won, drawn, lost, 
+                     goals_for, goals_against, goal_difference, points)
+                    VALUES %s
+                    ON CONFLICT (team_id, season, snapshot_date) DO UPDATE 
+                    SET 
+                        position = EXCLUDED.position,
+                        played = EXCLUDED.played,
+                        won = EXCLUDED.won,
+                        drawn = EXCLUDED.drawn,
+                        lost = EXCLUDED.lost,
+                        goals_for = EXCLUDED.goals_for,
+                        goals_against = EXCLUDED.goals_against,
+                        goal_difference = EXCLUDED.goal_difference,
+                        points = EXCLUDED.points,
+                        updated_at = CURRENT_TIMESTAMP;
+                """, rows, page_size=self.BULK_PAGE_SIZE)
+
+                if skip_unchanged:
+                    self._save_load_state('team_stats', content_hash, hashes)
+
+                upsert.add(rows=len(rows))
+                return len(rows)
+
+            except Exception as e:
+                self.logger.error(f"Error cargando estadísticas de equipos en bloque: {str(e)}")
+                raise
+
+    def load_player_stats_bulk(self, df: pd.DataFrame, skip_unchanged: bool = True) -> int:
+        """
+        Carga o actualiza las estadísticas de todos los jugadores de un DataFrame
+        resolviendo equipos, jugadores y estadísticas con sentencias multi-fila.
+
+        Args:
+            df: DataFrame con las columnas de PLAYER_STATS_COLUMNS
+            skip_unchanged: Escribir solo las filas que cambiaron desde la
+                última carga de la temporada
+
+        Returns:
+            Número de filas enviadas a la base de datos
+        """
+        if df.empty:
+            return 0
+
+        with self._upsert_span('player_stats') as upsert:
+            try:
+                # Una fila por jugador: la última aparición gana
+                df = df[PLAYER_STATS_COLUMNS].drop_duplicates(subset=['name', 'team_name'], keep='last')
+                df = df.astype({'goals': int, 'penalties': int})
+
+                if skip_unchanged:
+                    df, content_hash, hashes = self._changed_rows('player_stats', df, ['name', 'team_name'])
+                    if df.empty:
+                        self.logger.info("Tabla de goleadores sin cambios: no se escribe nada")
+                        return 0
+
+                player_ids = self.load_players_bulk(df)
+
+                stats = {}
+                for name, team_name, goals, penalties in zip(
+                    df['name'].tolist(), df['team_name'].tolist(),
+                    df['goals'].tolist(), df['penalties'].tolist()
+                ):
+                    player_id = player_ids[(name, team_name)]
+                    stats[player_id] = (player_id, self.season, goals, penalties)
+
+                execute_values(self.cur, """
+                    INSERT INTO player_stats 
+                    (player_id, season, goals, penalties)
+                    VALUES %s
+                    ON CONFLICT (player_id, season) DO UPDATE 
+                    SET 
+                        goals = EXCLUDED.goals,
+                        penalties = EXCLUDED.penalties,
+                        updated_at = CURRENT_TIMESTAMP;
+                """, list(stats.values()), page_size=self.BULK_PAGE_SIZE)
+
+                if skip_unchanged:
+                    self._save_load_state('player_stats', content_hash, hashes)
+
+                upsert.add(rows=len(stats))
+                return len(stats)
+
+            except Exception as e:
+                self.logger.error(f"Error cargando estadísticas de jugadores en bloque: {str(e)}")
+                raise
+
     def commit(self):
-        """Confirma los cambios en la base de datos"""
+        """
+        Confirma los cambios en la base de datos e invalida en la caché de
+        consultas los resultados de las tablas modificadas.
+        """
         self.conn.commit()
+        # Los IDs de la transacción ya son visibles para el resto de loaders
+        if self._new_team_ids or self._new_player_ids:
+            self._ids.merge(self._new_team_ids, self._new_player_ids)
+            self._new_team_ids = {}
+            self._new_player_ids = {}
+        if self.cur.written_tables:
+            invalidate_tables(self.cur.written_tables)
+            self.cur.written_tables.clear()
 
     def rollback(self):
         """Revierte los cambios en caso de error"""
-        self.conn.rollback()
\ No newline at end of file
+        self.conn.rollback()
+        self.cur.written_tables.clear()
+        # Los IDs insertados en la transacción revertida ya no existen; los de
+        # la caché compartida estaban confirmados y otros loaders los usan
+        self._new_team_ids = {}
+        self._new_player_ids = {}
+        self._partition_ready = False
\ No newline at end of file
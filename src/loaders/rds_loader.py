@@ -1,7 +1,42 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text, inspect
+from psycopg2 import sql
+from contextlib import contextmanager
+from io import StringIO
+import json
 import logging
-from typing import Optional
+import uuid
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple, Union
+from src.utils.resources import get_engine
+from src.utils.query_cache import get_query_cache
+
+# Filas por lote en las lecturas en streaming
+DEFAULT_CHUNK_ROWS = 50000
+
+# Tipo Arrow de cada OID de PostgreSQL, con la conversión previa del valor que
+# devuelve psycopg2 si hace falta. Los tipos no listados se guardan como texto
+_ARROW_TYPES: Dict[int, Tuple[pa.DataType, Optional[Callable[[Any], Any]]]] = {
+    16: (pa.bool_(), None),                       # boolean
+    20: (pa.int64(), None),                       # bigint
+    21: (pa.int16(), None),                       # smallint
+    23: (pa.int32(), None),                       # integer
+    26: (pa.int64(), None),                       # oid
+    700: (pa.float32(), None),                    # real
+    701: (pa.float64(), None),                    # double precision
+    1700: (pa.float64(), float),                  # numeric
+    19: (pa.string(), None),                      # name
+    25: (pa.string(), None),                      # text
+    1042: (pa.string(), None),                    # char
+    1043: (pa.string(), None),                    # varchar
+    1082: (pa.date32(), None),                    # date
+    1083: (pa.time64('us'), None),                # time
+    1114: (pa.timestamp('us'), None),             # timestamp
+    1184: (pa.timestamp('us', tz='UTC'), None),   # timestamptz
+    114: (pa.string(), json.dumps),               # json
+    3802: (pa.string(), json.dumps),              # jsonb
+}
 
 
 class RDSLoader:
@@ -19,21 +54,38 @@ class RDSLoader:
         """
         self.logger = logging.getLogger(__name__)
         self.connection_string = connection_string
-        self.engine = create_engine(connection_string)
+        # Engine compartido: las instancias con la misma URL reutilizan su pool
+        self.engine = get_engine(connection_string)
+        # Resultados de execute_query compartidos por todo el proceso
+        self.query_cache = get_query_cache()
 
-    def upload_to_rds(self, df: pd.DataFrame, table_name: str, if_exists: str = 'replace') -> bool:
+    def upload_to_rds(self, df: pd.DataFrame, table_name: str, if_exists: str = 'replace',
+                      method: Optional[str] = None, conflict_keys: Optional[List[str]] = None) -> bool:
         """
         Carga un DataFrame a una tabla en RDS.
 
         Args:
             df: DataFrame a cargar
             table_name: Nombre de la tabla
-            if_exists: Comportamiento si la tabla existe ('fail', 'replace', 'append')
+            if_exists: Comportamiento si la tabla existe ('fail', 'replace', 'append').
+                Se ignora con method='copy'
+            method: None para INSERT vía SQLAlchemy o 'copy' para cargar con
+                COPY FROM STDIN a una tabla temporal y fusionar con un único
+                INSERT ... ON CONFLICT
+            conflict_keys: Columnas de la clave única usada en ON CONFLICT
+                (solo con method='copy'; sin ellas se hace un INSERT simple).
+                Si la clave se repite en el DataFrame gana la última fila
 
         Returns:
             bool: True si la carga fue exitosa, False en caso contrario
         """
         try:
+            if method == 'copy':
+                rows = self._copy_upsert(df, table_name, conflict_keys or [])
+                self.query_cache.invalidate_tables([table_name])
+                self.logger.info(f"{rows} filas fusionadas en la tabla {table_name} vía COPY")
+                return True
+
             # Crear conexión
             with self.engine.connect() as connection:
                 # Cargar datos
@@ -43,6 +95,7 @@ class RDSLoader:
                     if_exists=if_exists,
                     index=False
                 )
+            self.query_cache.invalidate_tables([table_name])
 
             self.logger.info(f"Datos cargados exitosamente en la tabla {table_name}")
             return True
@@ -51,20 +104,233 @@ class RDSLoader:
             self.logger.error(f"Error cargando datos en la tabla {table_name}: {str(e)}")
             return False
 
-    def execute_query(self, query: str) -> Optional[pd.DataFrame]:
+    def _copy_upsert(self, df: pd.DataFrame, table_name: str, conflict_keys: List[str]) -> int:
+        """
+        Vuelca el DataFrame a una tabla temporal con COPY (CSV en memoria) y lo
+        fusiona en la tabla destino dentro de una misma transacción.
+
+        Returns:
+            Número de filas insertadas o actualizadas
+        """
+        columns = [str(col) for col in df.columns]
+        staging = f"{table_name}_staging"
+
+        # ON CONFLICT DO UPDATE no puede tocar dos veces la misma fila en una
+        # sentencia: con la clave repetida se conserva la última aparición
+        if conflict_keys:
+            duplicated = df.duplicated(conflict_keys, keep='last')
+            if duplicated.any():
+                self.logger.warning(f"{int(duplicated.sum())} filas con la clave "
+                                    f"({', '.join(conflict_keys)}) repetida en {table_name}: "
+                                    f"se conserva la última")
+                df = df[~duplicated]
+
+        with self.engine.begin() as connection:
+            # Si la tabla no existe se crea vacía con la clave de conflicto
+            create_table = not inspect(connection).has_table(table_name)
+            if create_table:
+                df.head(0).to_sql(name=table_name, con=connection, index=False)
+
+            cur = connection.connection.cursor()
+            try:
+                if create_table and conflict_keys:
+                    cur.execute(sql.SQL("CREATE UNIQUE INDEX {} ON {} ({})").format(
+                        sql.Identifier(f"{table_name}_{'_'.join(conflict_keys)}_key"),
+                        sql.Identifier(table_name),
+                        sql.SQL(', ').join(map(sql.Identifier, conflict_keys))
+                    ))
+
+                cur.execute(sql.SQL(
+                    "CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+                ).format(sql.Identifier(staging), sql.Identifier(table_name)))
+
+                buffer = StringIO()
+                df.to_csv(buffer, index=False, header=False)
+                buffer.seek(0)
+
+                column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+                cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                    sql.Identifier(staging), column_list
+                ), buffer)
+
+                merge = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                    sql.Identifier(table_name), column_list, column_list, sql.Identifier(staging)
+                )
+                if conflict_keys:
+                    updates = [col for col in columns if col not in conflict_keys]
+                    merge += sql.SQL(" ON CONFLICT ({}) ").format(
+                        sql.SQL(', ').join(map(sql.Identifier, conflict_keys))
+                    )
+                    if updates:
+                        merge += sql.SQL("DO UPDATE SET ") + sql.SQL(', ').join(
+                            sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(col), sql.Identifier(col))
+                            for col in updates
+                        )
+                    else:
+                        merge += sql.SQL("DO NOTHING")
+
+                cur.execute(merge)
+                return cur.rowcount
+            finally:
+                cur.close()
+
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                      use_cache: bool = True) -> Optional[pd.DataFrame]:
         """
         Ejecuta una consulta SQL y retorna los resultados.
 
+        Los resultados se guardan en la caché de consultas del proceso hasta
+        que caducan o hasta que una carga (PremierLeagueLoader.commit o
+        upload_to_rds) escribe en alguna de las tablas que leen.
+
         Args:
             query: Consulta SQL a ejecutar
+            params: Parámetros enlazados (:nombre en la consulta)
+            use_cache: Si es False se consulta siempre la base de datos
 
         Returns:
             DataFrame con los resultados o None si hay error
         """
-        try:
+        def run_query() -> pd.DataFrame:
             with self.engine.connect() as connection:
-                result = pd.read_sql_query(text(query), connection)
-            return result
+                return pd.read_sql_query(text(query), connection, params=params)
+
+        try:
+            if not use_cache:
+                return run_query()
+            key = self.query_cache.make_key(self.connection_string, query, params)
+            return self.query_cache.get_or_load(key, run_query)
         except Exception as e:
             self.logger.error(f"Error ejecutando query: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    @contextmanager
+    def _server_cursor(self, query: str, params: Optional[Dict[str, Any]] = None) -> Iterator:
+        """
+        Cursor con nombre (del lado del servidor) sobre una conexión del pool:
+        las filas se quedan en PostgreSQL hasta que se piden con fetchmany.
+
+        Args:
+            query: Consulta SQL (parámetros como :nombre, igual que execute_query)
+            params: Parámetros enlazados
+        """
+        # SQLAlchemy traduce :nombre al estilo del driver (%(nombre)s)
+        compiled = text(query).compile(dialect=self.engine.dialect)
+        bound = {**compiled.params, **(params or {})}
+
+        connection = self.engine.raw_connection()
+        try:
+            cur = connection.cursor(name=f"iter_{uuid.uuid4().hex}")
+            try:
+                cur.execute(str(compiled), bound)
+                yield cur
+            finally:
+                cur.close()
+        finally:
+            # Solo se lee: se termina la transacción y la conexión vuelve al pool
+            connection.rollback()
+            connection.close()
+
+    @staticmethod
+    def _arrow_schema(description) -> pa.Schema:
+        """Esquema Arrow a partir de cursor.description (estable entre lotes)"""
+        return pa.schema([
+            (column.name, _ARROW_TYPES.get(column.type_code, (pa.string(), None))[0])
+            for column in description
+        ])
+
+    @staticmethod
+    def _to_record_batch(rows: List[tuple], description, schema: pa.Schema) -> pa.RecordBatch:
+        """Convierte un lote de filas en un RecordBatch con el esquema dado"""
+        arrays = []
+        for index, (column, field) in enumerate(zip(description, schema)):
+            values = [row[index] for row in rows]
+            known = _ARROW_TYPES.get(column.type_code)
+            convert = known[1] if known else str
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def iter_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                   chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                   as_arrow: bool = False) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+        """
+        Ejecuta una consulta y devuelve el resultado por lotes con un cursor
+        del lado del servidor: en memoria nunca hay más de chunk_rows filas,
+        sea cual sea el tamaño del resultado. No pasa por la caché de consultas.
+
+        Args:
+            query: Consulta SQL a ejecutar
+            params: Parámetros enlazados (:nombre en la consulta)
+            chunk_rows: Filas por lote
+            as_arrow: Devolver pyarrow.RecordBatch (con el esquema derivado de
+                los tipos de PostgreSQL) en lugar de DataFrames
+
+        Yields:
+            DataFrames o RecordBatches de hasta chunk_rows filas
+        """
+        with self._server_cursor(query, params) as cur:
+            schema = None
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                if as_arrow:
+                    schema = schema or self._arrow_schema(cur.description)
+                    yield self._to_record_batch(rows, cur.description, schema)
+                else:
+                    yield pd.DataFrame.from_records(rows, columns=[column.name for column in cur.description])
+
+    def query_to_parquet(self, query: str, destination: str, params: Optional[Dict[str, Any]] = None,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS, compression: str = 'snappy') -> Optional[int]:
+        """
+        Vuelca el resultado de una consulta a un archivo Parquet local o en S3
+        (s3://bucket/clave) en streaming: cada lote se escribe como un row
+        group y en S3 se sube por partes, así que la memoria no crece con el
+        tamaño del resultado.
+
+        Args:
+            query: Consulta SQL a ejecutar
+            destination: Ruta local o URI s3://bucket/clave
+            params: Parámetros enlazados (:nombre en la consulta)
+            chunk_rows: Filas por lote (y por row group)
+            compression: Compresión Parquet
+
+        Returns:
+            Número de filas escritas o None si hay error
+        """
+        sink = None
+        try:
+            if destination.startswith('s3://'):
+                from src.loaders.s3_loader import S3MultipartWriter, get_s3_client
+
+                bucket, _, key = destination[len('s3://'):].partition('/')
+                sink = S3MultipartWriter(get_s3_client(), bucket, key)
+                target = pa.PythonFile(sink, mode='w')
+            else:
+                target = destination
+
+            rows = 0
+            with self._server_cursor(query, params) as cur:
+                # Un cursor con nombre no tiene description hasta el primer
+                # fetch. El esquema sale de los tipos de las columnas, así que
+                # vale también para un resultado vacío
+                batch = cur.fetchmany(chunk_rows)
+                schema = self._arrow_schema(cur.description)
+                with pq.ParquetWriter(target, schema, compression=compression) as writer:
+                    while batch:
+                        writer.write_batch(self._to_record_batch(batch, cur.description, schema))
+                        rows += len(batch)
+                        batch = cur.fetchmany(chunk_rows)
+
+            if sink is not None:
+                sink.close()
+            self.logger.info(f"{rows} filas guardadas en {destination}")
+            return rows
+
+        except Exception as e:
+            if sink is not None and not sink.closed:
+                sink.abort()
+            self.logger.error(f"Error guardando la consulta en {destination}: {str(e)}")
+            return None
@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Union
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from src.loaders.s3_loader import S3Loader
+
+
+class S3ReadCache:
+    """
+    Espejo local de los snapshots Parquet de S3 (caché de lectura).
+
+    Las claves premier_league/... se guardan con la misma ruta bajo el
+    directorio de la caché, se validan por ETag y se expulsan por LRU cuando se
+    supera el tamaño máximo. Los archivos se leen con memory map y solo con
+    las columnas pedidas.
+    """
+
+    # Tamaño de los bloques al descargar
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, s3_loader: Optional[S3Loader] = None, cache_dir: Optional[str] = None,
+                 max_bytes: int = 1024 * 1024 * 1024, validate: bool = False):
+        """
+        Args:
+            s3_loader: Loader con el cliente y el bucket (por defecto uno nuevo)
+            cache_dir: Directorio de la caché (por defecto S3_CACHE_DIR o .cache/s3)
+            max_bytes: Tamaño máximo de la caché
+            validate: Comprobar el ETag con un HEAD en cada lectura. Los
+                snapshots nunca se reescriben con la misma clave, así que por
+                defecto se confía en la copia local
+        """
+        self.logger = logging.getLogger(__name__)
+        self.s3_loader = s3_loader or S3Loader(partitioned=True)
+        self.s3_client = self.s3_loader.s3_client
+        self.bucket_name = self.s3_loader.bucket_name
+        self.cache_dir = cache_dir or os.getenv('S3_CACHE_DIR', os.path.join('.cache', 's3'))
+        self.max_bytes = max_bytes
+        self.validate = validate
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+
+    def local_path(self, key: str) -> str:
+        """Ruta local que refleja una clave de S3"""
+        return os.path.join(self.cache_dir, *key.split('/'))
+
+    def fetch(self, key: str, etag: Optional[str] = None) -> str:
+        """
+        Devuelve la ruta local de una clave, descargándola si no está en caché
+        o si su ETag ya no coincide.
+
+        Args:
+            key: Clave del objeto en S3
+            etag: ETag esperado (p. ej. de un listado); si es None y validate
+                está activo se consulta con un HEAD
+
+        Returns:
+            Ruta del archivo local
+        """
+        path = self.local_path(key)
+
+        if etag is None and self.validate:
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)['ETag']
+
+        with self._lock:
+            entry = self._index.get(key)
+            cached = entry is not None and os.path.exists(path) and (etag is None or entry['etag'] == etag)
+            if cached:
+                # La fecha de modificación marca el último acceso (LRU)
+                os.utime(path)
+                return path
+
+        # Un único GET en streaming: el ETag llega en la misma respuesta
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        with open(tmp_path, 'wb') as f:
+            for chunk in response['Body'].iter_chunks(self.CHUNK_SIZE):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        etag = response['ETag']
+
+        with self._lock:
+            self._index[key] = {'etag': etag, 'size': os.path.getsize(path)}
+            self._evict(keep=key)
+            self._write_index()
+
+        return path
+
+    def read_table(self, key: str, columns: Optional[List[str]] = None,
+                   etag: Optional[str] = None) -> pa.Table:
+        """
+        Lee un snapshot desde la caché local con memory map.
+
+        Args:
+            key: Clave del objeto en S3
+            columns: Columnas a leer (por defecto todas)
+            etag: ETag esperado
+
+        Returns:
+            Tabla Arrow
+        """
+        return pq.read_table(self.fetch(key, etag), columns=columns, memory_map=True)
+
+    def read_snapshots(self, data_type: str, season: Optional[str] = None,
+                       since: Optional[Union[str, datetime]] = None,
+                       until: Optional[Union[str, datetime]] = None,
+                       columns: Optional[List[str]] = None,
+                       refresh_manifest: bool = True) -> Optional[pa.Table]:
+        """
+        Lee el histórico de snapshots de un tipo de datos (según el
+        manifiesto) desde la caché local, con una columna snapshot_ts. Los
+        meses compactados se leen de sus archivos compactados.
+
+        Args:
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada, p. ej. "2023-2024"
+            since: Fecha/hora mínima del snapshot (incluida)
+            until: Fecha/hora máxima del snapshot (incluida)
+            columns: Columnas a leer (por defecto todas)
+            refresh_manifest: Leer el manifiesto de S3 (un GET). Con False se
+                usa la última copia local y la lectura no hace ninguna petición
+
+        Returns:
+            Tabla Arrow con todos los snapshots o None si no hay ninguno
+        """
+        if isinstance(since, str):
+            since = datetime.fromisoformat(since)
+        if isinstance(until, str):
+            until = datetime.fromisoformat(until)
+        manifest = self._manifest(data_type, refresh_manifest)
+
+        tables = []
+        for entry in self.s3_loader.find_snapshots(data_type, season=season, since=since,
+                                                   until=until, manifest=manifest):
+            if 'files' in entry:
+                tables += [self._read_compacted(key, columns, since, until) for key in entry['files']]
+                continue
+
+            table = self.read_table(entry['key'], columns)
+            snapshot_ts = datetime.fromisoformat(entry['snapshot_ts'])
+            tables.append(table.append_column(
+                'snapshot_ts', pa.array([snapshot_ts] * table.num_rows, type=pa.timestamp('ms'))
+            ))
+
+        return pa.concat_tables(tables) if tables else None
+
+    def _read_compacted(self, key: str, columns: Optional[List[str]], since: Optional[datetime],
+                        until: Optional[datetime]) -> pa.Table:
+        """Lee un archivo compactado (ya trae snapshot_ts) con solo los snapshots del rango"""
+        table = self.read_table(key, None if columns is None else list(columns) + ['snapshot_ts'])
+        if since is not None:
+            table = table.filter(pc.greater_equal(table['snapshot_ts'], pa.scalar(since, pa.timestamp('ms'))))
+        if until is not None:
+            table = table.filter(pc.less_equal(table['snapshot_ts'], pa.scalar(until, pa.timestamp('ms'))))
+        return table
+
+    def _manifest(self, data_type: str, refresh: bool) -> Dict:
+        """Manifiesto de snapshots, desde S3 o desde la copia local"""
+        path = os.path.join(self.cache_dir, '_manifests', f"{data_type}.json")
+        if not refresh:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        manifest = self.s3_loader.read_manifest(data_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+        return manifest
+
+    def _evict(self, keep: Optional[str] = None):
+        """Expulsa los archivos usados hace más tiempo hasta respetar max_bytes"""
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_access(key: str) -> float:
+            try:
+                return os.path.getmtime(self.local_path(key))
+            except OSError:
+                return 0.0
+
+        for key in sorted(self._index, key=last_access):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.local_path(key))
+            except OSError:
+                pass
+            total -= self._index.pop(key)['size']
+            self.logger.info(f"Snapshot expulsado de la caché local: {key}")
+
+    def _read_index(self) -> Dict:
+        """Carga el índice de la caché desde disco"""
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        """Guarda el índice de la caché de forma atómica"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,214 @@
+import logging
+import re
+import uuid
+from datetime import datetime
+from io import BytesIO
+from typing import Optional, List, Dict, Any
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.loaders.s3_loader import S3Loader, S3MultipartWriter, SCHEMAS, DICTIONARY_COLUMNS
+
+# premier_league/{data_type}/season=.../snapshot_date=YYYY-MM-DD/part-HHMMSS-xxxx.parquet
+_SNAPSHOT_KEY = re.compile(r'snapshot_date=(\d{4}-\d{2}-\d{2})/part-(\d{6})-[^/]*\.parquet$')
+
+
+class S3Compactor:
+    """
+    Compacta los snapshots del dataset particionado de S3: une todos los
+    archivos pequeños de una temporada y mes en pocos archivos grandes con una
+    columna snapshot_ts, los escribe antes de borrar los originales y lleva un
+    manifiesto de los archivos compactados.
+
+    Los archivos compactados viven en su propio dataset:
+    premier_league/compacted/{data_type}/season=.../month=YYYY-MM/part-*.parquet
+    y cada mes compactado sustituye a sus snapshots en el manifiesto de
+    snapshots del loader (ver S3Loader.compacted_entry).
+    """
+
+    # Filas máximas por archivo compactado
+    MAX_ROWS_PER_FILE = 1_000_000
+
+    def __init__(self, s3_loader: Optional[S3Loader] = None):
+        """
+        Args:
+            s3_loader: Loader con el cliente y el bucket (por defecto uno nuevo)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.s3_loader = s3_loader or S3Loader(partitioned=True)
+        self.s3_client = self.s3_loader.s3_client
+        self.bucket_name = self.s3_loader.bucket_name
+
+    @staticmethod
+    def compacted_prefix(data_type: str) -> str:
+        """Prefijo del dataset compactado de un tipo de datos"""
+        return S3Loader.compacted_prefix(data_type)
+
+    def manifest_key(self, data_type: str) -> str:
+        """Clave del manifiesto de compactación"""
+        return f"{self.compacted_prefix(data_type)}_manifest.json"
+
+    def read_manifest(self, data_type: str) -> Dict[str, Any]:
+        """
+        Lee el manifiesto de compactación.
+
+        Returns:
+            Diccionario {'partitions': {'season/month': entrada}}
+        """
+        return self.s3_loader.get_json(self.manifest_key(data_type), {'partitions': {}})[0]
+
+    def _delete_objects(self, keys: List[str]):
+        """Borra objetos en lotes de 1000 (el máximo de delete_objects)"""
+        for offset in range(0, len(keys), 1000):
+            self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys[offset:offset + 1000]]}
+            )
+
+    def snapshot_keys(self, data_type: str, season: str, month: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Agrupa por mes las claves de snapshots sin compactar de una temporada.
+
+        Args:
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada, p. ej. "2023-2024"
+            month: Mes 'YYYY-MM' (por defecto todos)
+
+        Returns:
+            Diccionario mes -> claves
+        """
+        months: Dict[str, List[str]] = {}
+        prefix = f"premier_league/{data_type}/season={season}/"
+        for obj in self.s3_loader.iter_objects(prefix):
+            match = _SNAPSHOT_KEY.search(obj['Key'])
+            if not match:
+                continue
+            key_month = match.group(1)[:7]
+            if month is None or key_month == month:
+                months.setdefault(key_month, []).append(obj['Key'])
+        return months
+
+    def _read_snapshot(self, key: str, data_type: str) -> pa.Table:
+        """Lee un snapshot y le añade la columna snapshot_ts tomada de su clave"""
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+        table = pq.read_table(BytesIO(body))
+
+        schema = SCHEMAS.get(data_type)
+        if schema is not None:
+            table = table.select(schema.names).cast(schema)
+
+        match = _SNAPSHOT_KEY.search(key)
+        snapshot_ts = datetime.strptime(match.group(1) + match.group(2), '%Y-%m-%d%H%M%S')
+        return table.append_column(
+            'snapshot_ts', pa.array([snapshot_ts] * table.num_rows, type=pa.timestamp('ms'))
+        )
+
+    def _read_compacted(self, key: str) -> pa.Table:
+        """Lee un archivo compactado existente"""
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+        return pq.read_table(BytesIO(body))
+
+    def compact(self, data_type: str, season: str, month: str) -> Optional[Dict[str, Any]]:
+        """
+        Compacta los snapshots de una temporada y mes.
+
+        Si el mes ya estaba compactado, los archivos compactados previos se
+        incluyen en la nueva versión.
+
+        Args:
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada, p. ej. "2023-2024"
+            month: Mes 'YYYY-MM'
+
+        Returns:
+            Entrada del manifiesto o None si no había nada que compactar
+        """
+        source_keys = self.snapshot_keys(data_type, season, month).get(month, [])
+        if not source_keys:
+            self.logger.info(f"Sin snapshots que compactar para {data_type} {season} {month}")
+            return None
+
+        partition = f"{season}/{month}"
+        previous = self.read_manifest(data_type)['partitions'].get(partition, {})
+
+        tables = [self._read_compacted(key) for key in previous.get('files', [])]
+        tables += [self._read_snapshot(key, data_type) for key in sorted(source_keys)]
+        table = pa.concat_tables(tables).sort_by('snapshot_ts')
+
+        # 1. Escribir los archivos nuevos
+        run_id = uuid.uuid4().hex[:8]
+        prefix = f"{self.compacted_prefix(data_type)}season={season}/month={month}/"
+        files = []
+        for index, offset in enumerate(range(0, table.num_rows, self.MAX_ROWS_PER_FILE)):
+            key = f"{prefix}part-{run_id}-{index:05d}.parquet"
+            sink = S3MultipartWriter(self.s3_client, self.bucket_name, key, S3Loader.PART_SIZE)
+            try:
+                with pa.PythonFile(sink, mode='w') as stream:
+                    pq.write_table(
+                        table.slice(offset, self.MAX_ROWS_PER_FILE),
+                        stream,
+                        row_group_size=S3Loader.ROW_GROUP_SIZE,
+                        use_dictionary=DICTIONARY_COLUMNS.get(data_type, True),
+                        compression=self.s3_loader.compression
+                    )
+            except Exception:
+                sink.abort()
+                raise
+            files.append(key)
+
+        # 2. Publicar la nueva versión en el manifiesto
+        entry = {
+            'season': season,
+            'month': month,
+            'files': files,
+            'rows': table.num_rows,
+            'snapshots': previous.get('snapshots', 0) + len(source_keys),
+            'first_snapshot': table.column('snapshot_ts')[0].as_py().isoformat(timespec='seconds'),
+            'last_snapshot': table.column('snapshot_ts')[-1].as_py().isoformat(timespec='seconds'),
+            'compacted_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+        def publish(manifest: Dict[str, Any]):
+            # Si otra compactación del mismo mes terminó antes, sus archivos
+            # no se han incluido en estos: se abandona para no perderlos
+            current = manifest['partitions'].get(partition, {})
+            if current.get('files', []) != previous.get('files', []):
+                raise RuntimeError(f"Otra compactación de {data_type} {partition} terminó mientras tanto")
+            manifest['partitions'][partition] = entry
+
+        try:
+            # Escritura condicional: las compactaciones de otros meses que
+            # terminen a la vez se conservan
+            self.s3_loader.update_json(self.manifest_key(data_type), publish, {'partitions': {}})
+        except Exception:
+            self._delete_objects(files)
+            raise
+
+        # 3. Sustituir los originales por el mes compactado en el manifiesto
+        # de snapshots (el que usan find_snapshots y S3ReadCache) y borrarlos
+        # junto con la versión compactada anterior
+        self.s3_loader.replace_snapshots(data_type, source_keys,
+                                         [S3Loader.compacted_entry(data_type, entry)])
+        self._delete_objects(sorted(source_keys) + previous.get('files', []))
+
+        self.logger.info(
+            f"Compactados {len(source_keys)} snapshots de {data_type} {season} {month} "
+            f"en {len(files)} archivo(s) ({table.num_rows} filas)"
+        )
+        return entry
+
+    def compact_season(self, data_type: str, season: str, month: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Compacta todos los meses (o uno) de una temporada.
+
+        Returns:
+            Entradas del manifiesto de los meses compactados
+        """
+        entries = []
+        for key_month in sorted(self.snapshot_keys(data_type, season, month)):
+            try:
+                entry = self.compact(data_type, season, key_month)
+                if entry:
+                    entries.append(entry)
+            except Exception as e:
+                self.logger.error(f"Error compactando {data_type} {season} {key_month}: {str(e)}")
+        return entries
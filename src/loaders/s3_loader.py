@@ -1,70 +1,454 @@
-import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from io import BytesIO
+import hashlib
+import json
 import logging
+import re
+import time
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional, Iterator, Iterable, Dict, Any, List, Union, Tuple
 import os
 from dotenv import load_dotenv
+from src.utils.hashing import frame_hash
+from src.utils.resources import get_aws_client
+from src.utils.metrics import get_metrics, span
 
 load_dotenv()
 
+# Esquemas explícitos de cada tipo de datos (dataset particionado)
+SCHEMAS = {
+    'league_table': pa.schema([
+        ('Position', pa.int16()),
+        ('Team', pa.string()),
+        ('Played', pa.int16()),
+        ('Won', pa.int16()),
+        ('Drawn', pa.int16()),
+        ('Lost', pa.int16()),
+        ('Goals For', pa.int16()),
+        ('Goals Against', pa.int16()),
+        ('Goal Difference', pa.int16()),
+        ('Points', pa.int16()),
+    ]),
+    'top_scorers': pa.schema([
+        ('Posición', pa.int16()),
+        ('Jugador', pa.string()),
+        ('País', pa.string()),
+        ('Equipo', pa.string()),
+        ('Goles', pa.int16()),
+        ('Penales', pa.int16()),
+    ]),
+}
+
+# Enteros de Arrow -> enteros nullable de pandas (ver parquet_frame_hash)
+_NULLABLE_INTEGERS = {
+    pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype(),
+}
+
+# Intentos de actualizar el manifiesto cuando otro proceso lo cambia a la vez
+MANIFEST_RETRIES = int(os.getenv('S3_MANIFEST_RETRIES', '5'))
+# Errores de una escritura condicional cuyo objeto cambió desde que se leyó
+_MANIFEST_CONFLICTS = ('PreconditionFailed', 'ConditionalRequestConflict', 'NoSuchKey')
+
+# Subidas con upload_fileobj: partes de 8 MB con hasta 8 hilos
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+
+def get_s3_client():
+    """Cliente de S3 compartido por todo el proceso (ver src.utils.resources)"""
+    return get_aws_client('s3')
+
+
+class S3MultipartWriter:
+    """
+    Archivo de solo escritura que sube a S3 por partes (multipart upload) a
+    medida que se escribe, de modo que en memoria nunca hay más de una parte.
+    Si el total no llega a una parte, se sube con un único put_object.
+    """
+
+    # S3 exige al menos 5 MB por parte (salvo la última)
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, s3_client, bucket: str, key: str, part_size: int = 8 * 1024 * 1024,
+                 content_type: str = 'application/vnd.apache.parquet'):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.content_type = content_type
+        self.closed = False
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+        # Tiempo y peticiones a S3 (para separar la subida de la serialización)
+        self.upload_seconds = 0.0
+        self.requests = 0
+
+    def _request(self, method, **kwargs):
+        """Llama al cliente de S3 contabilizando tiempo y peticiones"""
+        start = time.perf_counter()
+        try:
+            return method(**kwargs)
+        finally:
+            self.upload_seconds += time.perf_counter() - start
+            self.requests += 1
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 de todo lo escrito"""
+        return self._hash.hexdigest()
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.size
+
+    def flush(self):
+        pass
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast('B')
+        self._buffer += data
+        self._hash.update(data)
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes):
+        if self._upload_id is None:
+            self._upload_id = self._request(
+                self.s3_client.create_multipart_upload,
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        number = len(self._parts) + 1
+        response = self._request(
+            self.s3_client.upload_part,
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=number, Body=body
+        )
+        self._parts.append({'PartNumber': number, 'ETag': response['ETag']})
+
+    def close(self):
+        """Sube lo pendiente y completa la subida"""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self._upload_id is None:
+            self._request(
+                self.s3_client.put_object,
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), ContentType=self.content_type
+            )
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self._request(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts}
+            )
+        self._buffer = bytearray()
+
+    def abort(self):
+        """Cancela la subida y descarta las partes ya enviadas"""
+        self.closed = True
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+# Claves de snapshots: particionadas o planas con timestamp
+_PARTITIONED_KEY = re.compile(r'season=([^/]+)/snapshot_date=(\d{4}-\d{2}-\d{2})/part-(\d{6})-[^/]*\.parquet$')
+_FLAT_KEY = re.compile(r'/(\d{8}_\d{6})\.parquet$')
+
+# Columnas de texto muy repetidas que se guardan con codificación de diccionario
+DICTIONARY_COLUMNS = {
+    'league_table': ['Team'],
+    'top_scorers': ['Jugador', 'País', 'Equipo'],
+}
+
 
 class S3Loader:
     """
     Clase para cargar DataFrames en formato Parquet a Amazon S3.
     """
 
-    def __init__(self):
-        """Inicializa el cliente de S3 y configura el logger"""
+    # Filas por row group en los archivos Parquet particionados
+    ROW_GROUP_SIZE = 128 * 1024
+
+    # Tamaño de cada parte en las subidas en streaming
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, partitioned: bool = False, compression: Optional[str] = None):
+        """
+        Configura el loader; el cliente de S3 se crea en el primer uso
+
+        Args:
+            partitioned: Guardar como dataset particionado estilo Hive
+                (season=.../snapshot_date=.../part-*.parquet) en lugar de un
+                archivo por timestamp bajo el prefijo del tipo de datos
+            compression: Compresión Parquet del dataset particionado
+                ('snappy', 'zstd'...; por defecto S3_COMPRESSION o 'snappy')
+        """
         self.logger = logging.getLogger(__name__)
-        self.s3_client = boto3.client(
-            's3',
-            region_name=os.getenv('AWS_REGION'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
+        self.partitioned = partitioned
+        self.compression = compression or os.getenv('S3_COMPRESSION', 'snappy')
         self.bucket_name = os.getenv('AWS_BUCKET_NAME')
 
-    def save_to_s3(self, df: pd.DataFrame, data_type: str) -> bool:
+    @property
+    def s3_client(self):
+        """Cliente de S3 compartido (se crea en el primer uso)"""
+        return get_s3_client()
+
+    def save_to_s3(self, df: pd.DataFrame, data_type: str, season: Optional[str] = None,
+                   skip_unchanged: bool = True) -> bool:
         """
         Guarda un DataFrame como archivo Parquet en S3.
 
         Args:
             df: DataFrame a guardar
             data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada de los datos (necesaria en modo particionado)
+            skip_unchanged: No subir nada si el contenido coincide con el
+                último snapshot de la temporada según el manifiesto
+
+        Returns:
+            bool: True si la carga fue exitosa (o no hacía falta), False en
+            caso contrario
+        """
+        try:
+            now = datetime.now()
+            # Hash de lo que se guarda: en modo particionado, las columnas del
+            # esquema y en su orden (así rebuild_manifest lo puede recalcular)
+            schema = SCHEMAS.get(data_type) if self.partitioned else None
+            df_hash = frame_hash(df if schema is None else df[schema.names])
+
+            current = None
+            if skip_unchanged:
+                # Si no se puede leer el manifiesto no se sabe si hay cambios:
+                # se sube igualmente (un snapshot repetido es inofensivo)
+                try:
+                    current = self._get_manifest(data_type)
+                except Exception as e:
+                    self.logger.warning(f"No se pudo comprobar si {data_type} tiene cambios "
+                                        f"(manifiesto ilegible): se sube igualmente. {str(e)}")
+                if current is not None:
+                    previous = [e for e in current[0]['snapshots'] if e['season'] == season]
+                    latest = max(previous, key=lambda e: e['snapshot_ts'], default=None)
+                    if latest is not None and latest.get('frame_hash') == df_hash:
+                        self.logger.info(f"{data_type} sin cambios desde {latest['key']}: no se sube nada")
+                        return True
+
+            if self.partitioned:
+                if season is None:
+                    raise ValueError("Se requiere la temporada para guardar en modo particionado")
+                s3_key = self.partition_key(data_type, season, now)
+                size, content_hash = self._stream_parquet([df], data_type, s3_key)
+            else:
+                # Crear nombre de archivo con timestamp
+                timestamp = now.strftime('%Y%m%d_%H%M%S')
+                s3_key = f"premier_league/{data_type}/{timestamp}.parquet"
+
+                # Convertir DataFrame a formato Parquet en memoria
+                with span('s3_serialize', dataset=data_type) as serialize:
+                    table = pa.Table.from_pandas(df)
+                    buffer = BytesIO()
+                    pq.write_table(table, buffer)
+                    buffer.seek(0)
+
+                    size = buffer.getbuffer().nbytes
+                    content_hash = hashlib.sha256(buffer.getbuffer()).hexdigest()
+                    serialize.add(bytes=size, rows=len(df))
+
+                # Subir a S3 (upload_fileobj divide en partes a partir de 8 MB)
+                with span('s3_upload', dataset=data_type) as upload:
+                    self.s3_client.upload_fileobj(
+                        buffer,
+                        self.bucket_name,
+                        s3_key,
+                        ExtraArgs={'ContentType': 'application/vnd.apache.parquet'},
+                        Config=TRANSFER_CONFIG
+                    )
+                    upload.add(bytes=size, round_trips=max(1, -(-size // TRANSFER_CONFIG.multipart_chunksize)))
+
+            self.logger.info(f"Archivo guardado exitosamente en s3://{self.bucket_name}/{s3_key}")
+
+            # Registrar el snapshot en el manifiesto
+            try:
+                self._record_snapshots(data_type, [{
+                    'key': s3_key,
+                    'season': season,
+                    'snapshot_ts': now.isoformat(timespec='seconds'),
+                    'rows': len(df),
+                    'bytes': size,
+                    'content_hash': content_hash,
+                    'frame_hash': df_hash
+                }], current)
+            except Exception as e:
+                self.logger.warning(f"No se pudo actualizar el manifiesto de {data_type}: {str(e)}")
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error guardando archivo en S3: {str(e)}")
+            return False
+
+    @staticmethod
+    def partition_key(data_type: str, season: str, snapshot: datetime) -> str:
+        """Clave de un archivo del dataset particionado"""
+        return (
+            f"premier_league/{data_type}/season={season}/"
+            f"snapshot_date={snapshot.strftime('%Y-%m-%d')}/"
+            f"part-{snapshot.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        )
+
+    @staticmethod
+    def to_arrow(df: pd.DataFrame, data_type: str) -> pa.Table:
+        """
+        Convierte un DataFrame a una tabla Arrow con el esquema explícito del
+        tipo de datos (o inferido si el tipo no tiene esquema).
+
+        Args:
+            df: DataFrame a convertir
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+
+        Returns:
+            Tabla Arrow con las columnas del esquema
+        """
+        schema = SCHEMAS.get(data_type)
+        if schema is None:
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+        missing = [name for name in schema.names if name not in df.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas para {data_type}: {missing}")
+
+        arrays = []
+        for field in schema:
+            column = df[field.name]
+            if pa.types.is_integer(field.type) and not pd.api.types.is_numeric_dtype(column):
+                column = pd.to_numeric(column, errors='coerce')
+            arrays.append(pa.array(column, type=field.type, from_pandas=True))
+
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _stream_parquet(self, chunks: Iterable[pd.DataFrame], data_type: str, s3_key: str) -> Tuple[int, str]:
+        """
+        Escribe los DataFrames como row groups de un Parquet que se sube a S3
+        por partes mientras se genera, sin serializar el archivo completo en
+        memoria.
+
+        Returns:
+            (bytes escritos, SHA-256 del archivo)
+        """
+        sink = S3MultipartWriter(self.s3_client, self.bucket_name, s3_key, self.PART_SIZE)
+        writer = None
+        rows = 0
+        start = time.perf_counter()
+        try:
+            for chunk in chunks:
+                rows += len(chunk)
+                table = self.to_arrow(chunk, data_type)
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        pa.PythonFile(sink, mode='w'),
+                        table.schema,
+                        compression=self.compression,
+                        use_dictionary=DICTIONARY_COLUMNS.get(data_type, True)
+                    )
+                writer.write_table(table, row_group_size=self.ROW_GROUP_SIZE)
+
+            if writer is None:
+                raise ValueError("No hay datos que guardar")
+            writer.close()
+            sink.close()
+
+            # Serialización y subida van intercaladas: se separan con el
+            # tiempo que el sink pasó esperando a S3
+            metrics = get_metrics()
+            elapsed = time.perf_counter() - start
+            metrics.record('s3_serialize', elapsed - sink.upload_seconds, {'dataset': data_type},
+                           bytes=sink.size, rows=rows)
+            metrics.record('s3_upload', sink.upload_seconds, {'dataset': data_type},
+                           bytes=sink.size, round_trips=sink.requests)
+            return sink.size, sink.content_hash
+
+        except Exception:
+            sink.abort()
+            raise
+
+    def save_stream_to_s3(self, chunks: Iterable[pd.DataFrame], data_type: str, season: str) -> bool:
+        """
+        Guarda una secuencia de DataFrames (p. ej. una carga histórica grande)
+        como un único snapshot particionado, subiéndolo por partes a medida
+        que se escribe: el pico de memoria es del orden de una parte.
+
+        Args:
+            chunks: DataFrames con el mismo esquema
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada de los datos
 
         Returns:
             bool: True si la carga fue exitosa, False en caso contrario
         """
         try:
-            # Crear nombre de archivo con timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            s3_key = f"premier_league/{data_type}/{timestamp}.parquet"
-
-            # Convertir DataFrame a formato Parquet en memoria
-            table = pa.Table.from_pandas(df)
-            buffer = BytesIO()
-            pq.write_table(table, buffer)
-            buffer.seek(0)
-
-            # Subir a S3
-            self.s3_client.upload_fileobj(
-                buffer,
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={'ContentType': 'application/vnd.apache.parquet'}
-            )
+            now = datetime.now()
+            s3_key = self.partition_key(data_type, season, now)
+
+            rows = 0
 
+            def counted(frames):
+                nonlocal rows
+                for frame in frames:
+                    rows += len(frame)
+                    yield frame
+
+            size, content_hash = self._stream_parquet(counted(chunks), data_type, s3_key)
             self.logger.info(f"Archivo guardado exitosamente en s3://{self.bucket_name}/{s3_key}")
+
+            self._record_snapshots(data_type, [{
+                'key': s3_key,
+                'season': season,
+                'snapshot_ts': now.isoformat(timespec='seconds'),
+                'rows': rows,
+                'bytes': size,
+                'content_hash': content_hash
+            }])
             return True
 
         except Exception as e:
             self.logger.error(f"Error guardando archivo en S3: {str(e)}")
             return False
 
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre todos los objetos bajo un prefijo, paginando list_objects_v2.
+
+        Args:
+            prefix: Prefijo de las claves
+
+        Yields:
+            Diccionarios de objeto de S3 (Key, Size, ETag, LastModified...)
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield from page.get('Contents', [])
+
     def list_files(self, data_type: str) -> Optional[list]:
         """
         Lista los archivos disponibles para un tipo de datos.
@@ -76,15 +460,336 @@ class S3Loader:
             Lista de archivos o None si hay error
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=f"premier_league/{data_type}/"
-            )
-
-            if 'Contents' in response:
-                return [obj['Key'] for obj in response['Contents']]
-            return []
+            return [
+                obj['Key'] for obj in self.iter_objects(f"premier_league/{data_type}/")
+                if obj['Key'].endswith('.parquet')
+            ]
 
         except Exception as e:
             self.logger.error(f"Error listando archivos en S3: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def manifest_key(data_type: str) -> str:
+        """Clave del manifiesto de snapshots de un tipo de datos"""
+        return f"premier_league/{data_type}/_manifest.json"
+
+    def read_manifest(self, data_type: str) -> Dict[str, Any]:
+        """
+        Lee el manifiesto de snapshots con un único GET.
+
+        Returns:
+            Diccionario {'data_type', 'updated_at', 'snapshots': [entradas]}
+        """
+        return self._get_manifest(data_type)[0]
+
+    def _get_manifest(self, data_type: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Lee el manifiesto y su ETag (None si aún no existe)"""
+        return self.get_json(self.manifest_key(data_type),
+                             {'data_type': data_type, 'updated_at': None, 'snapshots': []})
+
+    def _write_manifest(self, data_type: str, manifest: Dict[str, Any], etag: Optional[str] = None,
+                        conditional: bool = True):
+        """
+        Guarda el manifiesto de snapshots.
+
+        Args:
+            data_type: Tipo de datos
+            manifest: Manifiesto completo
+            etag: ETag de la versión leída (None: el manifiesto no existía)
+            conditional: Escribir solo si nadie lo ha cambiado desde que se
+                leyó (ver put_json)
+        """
+        manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        self.put_json(self.manifest_key(data_type), manifest, etag, conditional)
+
+    def _update_manifest(self, data_type: str, change: Callable[[Dict[str, Any]], None],
+                         current: Optional[Tuple[Dict[str, Any], Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Modifica el manifiesto de snapshots con update_json.
+
+        Args:
+            data_type: Tipo de datos
+            change: Función que modifica el manifiesto en sitio
+            current: (manifiesto, ETag) ya leídos para el primer intento
+
+        Returns:
+            Manifiesto guardado
+        """
+        def stamped(manifest: Dict[str, Any]):
+            change(manifest)
+            manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+
+        return self.update_json(self.manifest_key(data_type), stamped,
+                                {'data_type': data_type, 'updated_at': None, 'snapshots': []}, current)
+
+    def get_json(self, key: str, default: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Lee un objeto JSON y su ETag.
+
+        Args:
+            key: Clave del objeto
+            default: Contenido si el objeto no existe (se devuelve una copia)
+
+        Returns:
+            (contenido, ETag); el ETag es None si el objeto no existe
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return json.loads(response['Body'].read()), response['ETag']
+        except self.s3_client.exceptions.NoSuchKey:
+            return json.loads(json.dumps(default)), None
+
+    def put_json(self, key: str, data: Dict[str, Any], etag: Optional[str] = None,
+                 conditional: bool = True):
+        """
+        Guarda un objeto JSON.
+
+        Args:
+            key: Clave del objeto
+            data: Contenido
+            etag: ETag de la versión leída (None: el objeto no existía)
+            conditional: Escribir solo si nadie lo ha cambiado desde que se
+                leyó (If-Match / If-None-Match); si no, S3 rechaza la escritura
+        """
+        preconditions = {}
+        if conditional:
+            preconditions = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=json.dumps(data, indent=2).encode('utf-8'),
+            ContentType='application/json',
+            **preconditions
+        )
+
+    def update_json(self, key: str, change: Callable[[Dict[str, Any]], None], default: Dict[str, Any],
+                    current: Optional[Tuple[Dict[str, Any], Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Lee, modifica y guarda un objeto JSON (un manifiesto) con una escritura
+        condicional. Si otro proceso lo cambió entremedias, se vuelve a leer y
+        se repite el cambio sobre la versión nueva: ninguna entrada se pierde.
+
+        Args:
+            key: Clave del objeto
+            change: Función que modifica el contenido en sitio; puede lanzar
+                una excepción para abandonar la actualización
+            default: Contenido si el objeto no existe
+            current: (contenido, ETag) ya leídos para el primer intento
+
+        Returns:
+            Contenido guardado
+        """
+        for attempt in range(1, MANIFEST_RETRIES + 1):
+            data, etag = current if current is not None else self.get_json(key, default)
+            current = None
+            change(data)
+            try:
+                self.put_json(key, data, etag)
+                return data
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in _MANIFEST_CONFLICTS:
+                    raise
+                self.logger.info(f"{key} cambió mientras se actualizaba (intento {attempt}/{MANIFEST_RETRIES})")
+                time.sleep(0.1 * attempt)
+        raise RuntimeError(f"{key} cambió en {MANIFEST_RETRIES} intentos seguidos")
+
+    def _record_snapshots(self, data_type: str, entries: List[Dict[str, Any]],
+                          current: Optional[Tuple[Dict[str, Any], Optional[str]]] = None):
+        """Añade (o reemplaza) entradas en el manifiesto (leído si no se pasa con su ETag)"""
+        keys = {entry['key'] for entry in entries}
+
+        def change(manifest: Dict[str, Any]):
+            manifest['snapshots'] = [e for e in manifest['snapshots'] if e['key'] not in keys] + entries
+
+        self._update_manifest(data_type, change, current)
+
+    def remove_from_manifest(self, data_type: str, keys: List[str]):
+        """Quita del manifiesto snapshots que ya no existen"""
+        self.replace_snapshots(data_type, keys, [])
+
+    def replace_snapshots(self, data_type: str, keys: List[str], entries: List[Dict[str, Any]]):
+        """
+        Sustituye en una sola escritura unas entradas del manifiesto por otras
+        (p. ej. los snapshots de un mes por su archivo compactado). Una entrada
+        nueva sin frame_hash hereda el de la entrada sustituida con su mismo
+        snapshot_ts, así la deduplicación de save_to_s3 sigue funcionando.
+
+        Args:
+            data_type: Tipo de datos
+            keys: Claves de las entradas que se quitan
+            entries: Entradas que se añaden (o reemplazan por clave)
+        """
+        keys = set(keys) | {entry['key'] for entry in entries}
+
+        def change(manifest: Dict[str, Any]):
+            removed = {(e['season'], e['snapshot_ts']): e for e in manifest['snapshots']
+                       if e['key'] in keys and e.get('frame_hash')}
+            for entry in entries:
+                previous = removed.get((entry['season'], entry['snapshot_ts']))
+                if 'frame_hash' not in entry and previous is not None:
+                    entry['frame_hash'] = previous['frame_hash']
+            manifest['snapshots'] = [e for e in manifest['snapshots'] if e['key'] not in keys] + entries
+
+        self._update_manifest(data_type, change)
+
+    @staticmethod
+    def compacted_prefix(data_type: str) -> str:
+        """Prefijo del dataset compactado de un tipo de datos (ver S3Compactor)"""
+        return f"premier_league/compacted/{data_type}/"
+
+    @classmethod
+    def compacted_entry(cls, data_type: str, partition: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Entrada del manifiesto de snapshots para un mes compactado. Cubre
+        todos los snapshots del mes: snapshot_ts es el último, first_snapshot_ts
+        el primero y files los archivos, que ya traen la columna snapshot_ts.
+
+        Args:
+            data_type: Tipo de datos
+            partition: Entrada del manifiesto de compactación
+        """
+        return {
+            'key': f"{cls.compacted_prefix(data_type)}season={partition['season']}/month={partition['month']}/",
+            'season': partition['season'],
+            'snapshot_ts': partition['last_snapshot'],
+            'first_snapshot_ts': partition['first_snapshot'],
+            'rows': partition['rows'],
+            'snapshots': partition['snapshots'],
+            'files': partition['files']
+        }
+
+    def find_snapshots(self, data_type: str, season: Optional[str] = None,
+                       since: Optional[Union[str, datetime]] = None,
+                       until: Optional[Union[str, datetime]] = None,
+                       manifest: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Busca snapshots en el manifiesto (un GET, sin listar el bucket). Los
+        meses compactados son una sola entrada con 'files' que se devuelve si
+        alguno de sus snapshots cae en el rango: quien la lea debe filtrar por
+        la columna snapshot_ts.
+
+        Args:
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+            season: Temporada, p. ej. "2023-2024"
+            since: Fecha/hora mínima del snapshot (incluida)
+            until: Fecha/hora máxima del snapshot (incluida)
+            manifest: Manifiesto ya leído (si es None se lee de S3)
+
+        Returns:
+            Entradas del manifiesto ordenadas por snapshot_ts
+        """
+        if isinstance(since, str):
+            since = datetime.fromisoformat(since)
+        if isinstance(until, str):
+            until = datetime.fromisoformat(until)
+
+        snapshots = []
+        if manifest is None:
+            manifest = self.read_manifest(data_type)
+
+        for entry in manifest['snapshots']:
+            last_ts = datetime.fromisoformat(entry['snapshot_ts'])
+            first_ts = datetime.fromisoformat(entry.get('first_snapshot_ts', entry['snapshot_ts']))
+            if season is not None and entry['season'] != season:
+                continue
+            if (since is not None and last_ts < since) or (until is not None and first_ts > until):
+                continue
+            snapshots.append(entry)
+
+        return sorted(snapshots, key=lambda entry: entry['snapshot_ts'])
+
+    @staticmethod
+    def parse_snapshot_key(key: str) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        Extrae la temporada y la fecha del snapshot de una clave.
+
+        Returns:
+            (temporada, fecha); la temporada es None en claves planas y ambos
+            son None si la clave no es un snapshot
+        """
+        match = _PARTITIONED_KEY.search(key)
+        if match:
+            return match.group(1), datetime.strptime(match.group(2) + match.group(3), '%Y-%m-%d%H%M%S')
+
+        match = _FLAT_KEY.search(key)
+        if match:
+            return None, datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+
+        return None, None
+
+    @staticmethod
+    def parquet_frame_hash(body: bytes) -> str:
+        """
+        frame_hash de un snapshot ya subido: el mismo que save_to_s3 calculó
+        con el DataFrame original (frame_hash no distingue el ancho de los
+        enteros ni categorías de texto; los enteros se leen como nullable
+        para que los nulos no los conviertan en float).
+        """
+        table = pq.read_table(BytesIO(body))
+        return frame_hash(table.to_pandas(types_mapper=_NULLABLE_INTEGERS.get))
+
+    def rebuild_manifest(self, data_type: str) -> Dict[str, Any]:
+        """
+        Reconstruye el manifiesto listando todo el prefijo (con paginación) y
+        leyendo cada snapshot. Es la ruta lenta de respaldo.
+
+        Se guarda con una escritura condicional: las entradas que otro proceso
+        añada mientras tanto se conservan si su archivo existe.
+
+        Args:
+            data_type: Tipo de datos ('league_table' o 'top_scorers')
+
+        Returns:
+            Manifiesto reconstruido
+        """
+        snapshots = []
+        for obj in self.iter_objects(f"premier_league/{data_type}/"):
+            season, snapshot_ts = self.parse_snapshot_key(obj['Key'])
+            if snapshot_ts is None:
+                continue
+
+            body = self.s3_client.get_object(Bucket=self.bucket_name, Key=obj['Key'])['Body'].read()
+            snapshots.append({
+                'key': obj['Key'],
+                'season': season,
+                'snapshot_ts': snapshot_ts.isoformat(timespec='seconds'),
+                'rows': pq.ParquetFile(BytesIO(body)).metadata.num_rows,
+                'bytes': obj['Size'],
+                'content_hash': hashlib.sha256(body).hexdigest(),
+                'frame_hash': self.parquet_frame_hash(body)
+            })
+
+        # Los meses compactados viven en otro prefijo: se toman de su manifiesto
+        partitions = self.get_json(f"{self.compacted_prefix(data_type)}_manifest.json",
+                                   {'partitions': {}})[0]['partitions']
+        snapshots += [self.compacted_entry(data_type, partition) for partition in partitions.values()]
+
+        rebuilt = {entry['key'] for entry in snapshots}
+        exists: Dict[str, bool] = {}
+
+        def replace(manifest: Dict[str, Any]):
+            # Snapshots subidos después de listar su partición
+            added = []
+            for entry in manifest['snapshots']:
+                if entry['key'] in rebuilt or 'files' in entry:
+                    continue
+                if entry['key'] not in exists:
+                    exists[entry['key']] = self._object_exists(entry['key'])
+                if exists[entry['key']]:
+                    added.append(entry)
+            manifest['snapshots'] = snapshots + added
+
+        manifest = self._update_manifest(data_type, replace)
+        self.logger.info(f"Manifiesto de {data_type} reconstruido con {len(manifest['snapshots'])} snapshots")
+        return manifest
+
+    def _object_exists(self, key: str) -> bool:
+        """Comprueba con un HEAD si existe un objeto"""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
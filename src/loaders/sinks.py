@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Callable, Dict, List, Optional, Set, TYPE_CHECKING
+from src.utils.metrics import span
+from src.utils.resources import on_close
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Segundos que se espera a cada destino por defecto
+SINK_TIMEOUT = float(os.getenv('SINK_TIMEOUT', '300'))
+# Destinos de cada dataset (separados por comas)
+PIPELINE_SINKS = [name.strip() for name in os.getenv('PIPELINE_SINKS', 's3,postgres').split(',') if name.strip()]
+# Segundos que se espera, antes de cerrar los recursos compartidos, a las
+# escrituras que superaron su timeout y siguen en curso
+SINK_DRAIN_TIMEOUT = float(os.getenv('SINK_DRAIN_TIMEOUT', '60'))
+
+logger = logging.getLogger(__name__)
+
+# Escrituras que superaron su timeout y siguen en curso
+_pending_lock = threading.Lock()
+_pending: Set[Future] = set()
+
+
+def _track(future: Future):
+    """Anota una escritura abandonada hasta que termine"""
+    with _pending_lock:
+        _pending.add(future)
+
+    def forget(done: Future):
+        with _pending_lock:
+            _pending.discard(done)
+
+    future.add_done_callback(forget)
+
+
+def drain_pending(timeout: float = SINK_DRAIN_TIMEOUT) -> bool:
+    """
+    Espera a las escrituras que superaron su timeout. close_all() la llama
+    antes de cerrar el pool de PostgreSQL y los clientes de AWS que usan.
+
+    Args:
+        timeout: Segundos de espera como máximo
+
+    Returns:
+        bool: True si no queda ninguna escritura en curso
+    """
+    with _pending_lock:
+        pending = set(_pending)
+    if not pending:
+        return True
+
+    logger.info(f"Esperando a {len(pending)} escritura(s) que superaron su timeout...")
+    _, not_done = wait(pending, timeout=timeout)
+    if not_done:
+        logger.warning(f"{len(not_done)} escritura(s) siguen en curso tras {timeout:g} s: "
+                       f"se cierran los recursos igualmente")
+        return False
+    return True
+
+
+on_close(drain_pending)
+
+
+class Sink:
+    """
+    Destino al que se escribe un DataFrame (S3, PostgreSQL...).
+
+    Política ante fallos parciales: un dataset se considera cargado si todos
+    los destinos obligatorios (required) terminan bien dentro de su timeout;
+    el fallo de un destino opcional solo se registra. Los destinos son
+    idempotentes (snapshots deduplicados por hash, upserts), así que
+    reintentar el dataset completo en la siguiente ejecución es seguro.
+    """
+
+    def __init__(self, name: str, write: Callable[['pd.DataFrame'], bool],
+                 timeout: Optional[float] = SINK_TIMEOUT, required: bool = True):
+        """
+        Args:
+            name: Nombre del destino, p. ej. 's3'
+            write: Función que escribe el DataFrame; devuelve False o lanza
+                una excepción si falla
+            timeout: Segundos que se espera al destino (None: sin límite)
+            required: Si su fallo hace fallar la carga del dataset
+        """
+        self.name = name
+        self.write = write
+        self.timeout = timeout
+        self.required = required
+
+
+class SinkResult:
+    """Resultado de la escritura en un destino"""
+
+    def __init__(self, name: str, ok: bool, seconds: float, required: bool,
+                 error: Optional[str] = None, timed_out: bool = False):
+        self.name = name
+        self.ok = ok
+        self.seconds = seconds
+        self.required = required
+        self.error = error
+        self.timed_out = timed_out
+
+
+class SinkFanout:
+    """
+    Escribe un DataFrame en todos los destinos a la vez, cada uno en su
+    hilo: la carga de un dataset dura lo que el destino más lento y no la
+    suma de todos.
+
+    Un hilo no se puede interrumpir: un destino que supera su timeout se da
+    por fallido, pero su escritura sigue en segundo plano. Esas escrituras se
+    anotan y close_all() las espera (hasta SINK_DRAIN_TIMEOUT) antes de
+    cerrar las conexiones y clientes que usan.
+    """
+
+    def __init__(self, sinks: List[Sink]):
+        """
+        Args:
+            sinks: Destinos configurados
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sinks = sinks
+
+    def write(self, df: 'pd.DataFrame', dataset: str) -> Dict[str, SinkResult]:
+        """
+        Escribe el DataFrame en todos los destinos.
+
+        Args:
+            df: Datos a escribir (los destinos no deben modificarlo)
+            dataset: Nombre del dataset, p. ej. 'league_table'
+
+        Returns:
+            Diccionario nombre del destino -> resultado
+        """
+        if not self.sinks:
+            return {}
+
+        def run(sink: Sink) -> float:
+            with span('sink', dataset=dataset, sink=sink.name):
+                start = time.perf_counter()
+                if sink.write(df) is False:
+                    raise RuntimeError("la escritura devolvió False")
+                return time.perf_counter() - start
+
+        executor = ThreadPoolExecutor(max_workers=len(self.sinks), thread_name_prefix=f"sink-{dataset}")
+        try:
+            started = time.monotonic()
+            futures = [(sink, executor.submit(run, sink)) for sink in self.sinks]
+
+            results = {}
+            for sink, future in futures:
+                # Los timeouts cuentan desde que empezaron todos los destinos
+                remaining = None
+                if sink.timeout is not None:
+                    remaining = max(0.0, started + sink.timeout - time.monotonic())
+                try:
+                    seconds = future.result(timeout=remaining)
+                    results[sink.name] = SinkResult(sink.name, True, seconds, sink.required)
+                except FutureTimeoutError:
+                    _track(future)
+                    results[sink.name] = SinkResult(sink.name, False, time.monotonic() - started, sink.required,
+                                                    error=f"sin respuesta en {sink.timeout:g} s", timed_out=True)
+                except Exception as e:
+                    results[sink.name] = SinkResult(sink.name, False, time.monotonic() - started, sink.required,
+                                                    error=str(e))
+        finally:
+            # No se espera a los destinos que superaron su timeout
+            executor.shutdown(wait=False)
+
+        for result in results.values():
+            if result.ok:
+                self.logger.info(f"{dataset} -> {result.name}: guardado en {result.seconds:.2f} s")
+            else:
+                log = self.logger.error if result.required else self.logger.warning
+                log(f"Error guardando {dataset} en {result.name}: {result.error}")
+        return results
+
+    @staticmethod
+    def succeeded(results: Dict[str, SinkResult]) -> bool:
+        """True si todos los destinos obligatorios terminaron bien"""
+        return all(result.ok for result in results.values() if result.required)
+
+    @staticmethod
+    def failed_sinks(results: Dict[str, SinkResult]) -> List[str]:
+        """Destinos (obligatorios u opcionales) que no terminaron bien"""
+        return [name for name, result in results.items() if not result.ok]
@@ -5,8 +5,12 @@ import sys
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
 
-from src.extractors.web_scraper import PremierLeagueScraper
+import argparse
 import logging
+from src.utils.resources import close_all
+
+# Los módulos de cada comando (y con ellos pandas, pyarrow, boto3, bs4,
+# psycopg2 y SQLAlchemy) se importan dentro de la función que lo ejecuta
 
 # Configurar logging
 logging.basicConfig(
@@ -15,18 +19,188 @@ logging.basicConfig(
 )
 
 
-def main():
-    """Función principal que ejecuta el pipeline de datos"""
+def parse_args(argv=None) -> argparse.Namespace:
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Pipeline de datos de la Premier League")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Muestra el coste de importación de cada módulo (-X importtime)")
+    parser.add_argument('--profile', choices=['cpu', 'mem'], default=os.getenv('PIPELINE_PROFILE') or None,
+                        help="Perfila cada etapa con cProfile (cpu) o tracemalloc (mem). "
+                             "Con mem las etapas se ejecutan de una en una (tracemalloc y su pico "
+                             "son globales al proceso) y cada una toma dos instantáneas de la "
+                             "memoria: la ejecución es bastante más lenta")
+    parser.add_argument('--profile-dir', default=os.getenv('PROFILE_DIR', '.'),
+                        help="Directorio de los informes de --profile (por defecto el de los logs)")
+    parser.add_argument('--report', default=os.getenv('RUN_REPORT_PATH'),
+                        help="Guarda un informe JSON con los tiempos de cada etapa")
+    parser.add_argument('--prometheus', default=os.getenv('PROMETHEUS_TEXTFILE'),
+                        help="Guarda las métricas de cada etapa para el textfile collector de Prometheus")
+    subparsers = parser.add_subparsers(dest='command')
+
+    subparsers.add_parser('run', help="Actualiza la temporada en curso (por defecto)")
+
+    backfill = subparsers.add_parser('backfill', help="Carga histórica de varias temporadas")
+    backfill.add_argument('--from', dest='from_year', type=int, required=True,
+                          help="Año de inicio de la primera temporada, p. ej. 1992")
+    backfill.add_argument('--to', dest='to_year', type=int, required=True,
+                          help="Año de inicio de la última temporada, p. ej. 2023")
+    backfill.add_argument('--workers', type=int, default=4,
+                          help="Descargas simultáneas como máximo")
+    backfill.add_argument('--checkpoint', default=None,
+                          help="Archivo de checkpoint para retomar la carga")
+    backfill.add_argument('--min-interval', type=float, default=1.0,
+                          help="Segundos mínimos entre peticiones al mismo host")
+    backfill.add_argument('--skip-s3', action='store_true',
+                          help="No guardar las temporadas en S3")
+
+    compact = subparsers.add_parser('compact', help="Compacta los snapshots de S3 de una temporada")
+    compact.add_argument('--data-type', choices=['league_table', 'top_scorers'], required=True)
+    compact.add_argument('--season', required=True, help="Temporada, p. ej. 2023-2024")
+    compact.add_argument('--month', default=None, help="Mes YYYY-MM (por defecto todos)")
+
+    serve = subparsers.add_parser('serve', help="Proceso continuo que sondea las páginas y carga los cambios")
+    serve.add_argument('--fast-interval', type=float, default=120,
+                       help="Segundos entre sondeos durante los partidos")
+    serve.add_argument('--slow-interval', type=float, default=1800,
+                       help="Segundos entre sondeos fuera de los partidos")
+    serve.add_argument('--max-backoff', type=float, default=3600,
+                       help="Espera máxima tras errores consecutivos")
+
+    migrate = subparsers.add_parser('migrate', help="Aplica las migraciones pendientes del esquema")
+    migrate.add_argument('--target', type=int, default=None, help="Última versión a aplicar")
+    migrate.add_argument('--status', action='store_true',
+                         help="Muestra el estado de las migraciones sin aplicar nada")
+
+    return parser.parse_args(argv)
+
+
+def run_backfill(args: argparse.Namespace) -> bool:
+    """
+    Ejecuta la carga histórica de temporadas
+
+    Returns:
+        bool: False si alguna temporada no se pudo cargar
+    """
+    from src.backfill import SeasonBackfill
+
+    backfill = SeasonBackfill(
+        args.from_year, args.to_year,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        min_interval=args.min_interval,
+        save_to_s3=not args.skip_s3
+    )
+    summary = backfill.run()
+
+    print(f"✅ Temporadas cargadas: {len(summary['loaded'])}")
+    print(f"⏭️  Temporadas ya cargadas: {len(summary['skipped'])}")
+    if summary['failed']:
+        print(f"❌ Temporadas con error: {', '.join(sorted(summary['failed']))}")
+    return not summary['failed']
+
+
+def run_compaction(args: argparse.Namespace):
+    """Compacta los snapshots de S3 de una temporada"""
+    from src.loaders.s3_compactor import S3Compactor
+
+    entries = S3Compactor().compact_season(args.data_type, args.season, args.month)
+
+    for entry in entries:
+        print(f"✅ {entry['season']} {entry['month']}: {entry['snapshots']} snapshots -> "
+              f"{len(entry['files'])} archivo(s), {entry['rows']} filas")
+    if not entries:
+        print("⏭️  No había snapshots que compactar")
+
+
+def run_scheduler(args: argparse.Namespace):
+    """Ejecuta el planificador hasta recibir SIGINT o SIGTERM"""
+    import signal
+    from src.scheduler import PipelineScheduler
+
+    scheduler = PipelineScheduler(
+        fast_interval=args.fast_interval,
+        slow_interval=args.slow_interval,
+        max_backoff=args.max_backoff,
+        report_path=args.report,
+        prometheus_path=args.prometheus
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: scheduler.stop())
+
+    scheduler.serve()
+
+
+def run_migrations(args: argparse.Namespace):
+    """Aplica (o lista) las migraciones del esquema"""
+    from src.utils.migrations import MigrationRunner
+
+    runner = MigrationRunner()
+
+    if args.status:
+        for migration, applied, checksum_ok in runner.status():
+            mark = '✅' if applied else '⏳'
+            note = '' if checksum_ok else ' (modificada después de aplicarse)'
+            print(f"{mark} {migration}{note}")
+        return
+
+    applied = runner.migrate(args.target)
+    for migration in applied:
+        print(f"✅ {migration}")
+    if not applied:
+        print("⏭️  El esquema ya está actualizado")
+
+
+def main(argv=None) -> int:
+    """
+    Función principal que ejecuta el pipeline de datos
+
+    Returns:
+        Código de salida: 1 si el comando falló (para que el workflow lo detecte)
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parse_args(argv)
+
+    if args.profile_startup:
+        from src.utils.startup_profile import run_with_importtime
+        sys.exit(run_with_importtime(os.path.abspath(__file__),
+                                     [arg for arg in argv if arg != '--profile-startup']))
+
+    profiler = None
+    if args.profile:
+        from src.utils.profiling import start_profiler
+        profiler = start_profiler(args.profile, args.profile_dir)
+
     try:
+        if args.command == 'backfill':
+            return 0 if run_backfill(args) else 1
+        if args.command == 'compact':
+            run_compaction(args)
+            return 0
+        if args.command == 'serve':
+            run_scheduler(args)
+            return 0
+        if args.command == 'migrate':
+            run_migrations(args)
+            return 0
+
         # Inicializar el scraper
+        from src.extractors.web_scraper import PremierLeagueScraper
         scraper = PremierLeagueScraper()
 
         # Ejecutar la actualización
-        scraper.update_all_data()
+        return 0 if scraper.update_all_data() else 1
 
     except Exception as e:
         logging.error(f"Error en el pipeline: {str(e)}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        close_all()
+        if args.report or args.prometheus:
+            from src.utils.metrics import export
+            export(args.report, args.prometheus)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
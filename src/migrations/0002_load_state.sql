@@ -0,0 +1,9 @@
+-- Hashes de la última carga de cada dataset (para omitir datos sin cambios)
+CREATE TABLE IF NOT EXISTS load_state (
+    dataset VARCHAR(50) NOT NULL,
+    season VARCHAR(9) NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    row_hashes JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dataset, season)
+);
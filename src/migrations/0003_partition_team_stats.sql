@@ -0,0 +1,99 @@
+-- team_stats particionada por temporada, con un snapshot por equipo y día.
+-- Si la tabla anterior (sin particionar) existe, se aparta y su histórico se
+-- copia a la nueva conservando el snapshot más reciente de cada día
+
+DO $$
+DECLARE
+    con RECORD;
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema() AND c.relname = 'team_stats' AND c.relkind = 'r'
+    ) THEN
+        ALTER TABLE team_stats RENAME TO team_stats_legacy;
+
+        -- Los nombres de constraints y secuencias no cambian con la tabla
+        FOR con IN
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = 'team_stats_legacy'::regclass AND conname LIKE 'team_stats%'
+        LOOP
+            EXECUTE format('ALTER TABLE team_stats_legacy RENAME CONSTRAINT %I TO %I',
+                           con.conname, 'team_stats_legacy' || substr(con.conname, 11));
+        END LOOP;
+        ALTER SEQUENCE IF EXISTS team_stats_stat_id_seq RENAME TO team_stats_legacy_stat_id_seq;
+    END IF;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS team_stats (
+    stat_id SERIAL,
+    team_id INTEGER REFERENCES teams(team_id),
+    season VARCHAR(9) NOT NULL,  -- e.g., "2023-2024"
+    position INTEGER,
+    played INTEGER,
+    won INTEGER,
+    drawn INTEGER,
+    lost INTEGER,
+    goals_for INTEGER,
+    goals_against INTEGER,
+    goal_difference INTEGER,
+    points INTEGER,
+    snapshot_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stat_id, season),
+    UNIQUE(team_id, season, snapshot_date)
+) PARTITION BY RANGE (season);
+
+-- Crea (si no existe) la partición de team_stats de una temporada
+CREATE OR REPLACE FUNCTION ensure_team_stats_partition(p_season TEXT)
+RETURNS VOID AS $$
+DECLARE
+    next_season TEXT := split_part(p_season, '-', 2) || '-' ||
+                        (split_part(p_season, '-', 2)::INTEGER + 1);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF team_stats FOR VALUES FROM (%L) TO (%L)',
+        'team_stats_' || replace(p_season, '-', '_'), p_season, next_season
+    );
+END;
+$$ language 'plpgsql';
+
+-- Particiones desde la primera temporada de la Premier League
+SELECT ensure_team_stats_partition(year || '-' || (year + 1))
+FROM generate_series(1992, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER) AS year;
+
+DO $$
+BEGIN
+    IF to_regclass('team_stats_legacy') IS NOT NULL THEN
+        PERFORM ensure_team_stats_partition(season)
+        FROM (SELECT DISTINCT season FROM team_stats_legacy WHERE season IS NOT NULL) AS seasons;
+
+        INSERT INTO team_stats
+        (team_id, season, position, played, won, drawn, lost, goals_for,
+         goals_against, goal_difference, points, snapshot_date, created_at, updated_at)
+        SELECT DISTINCT ON (team_id, season, updated_at::DATE)
+            team_id, season, position, played, won, drawn, lost, goals_for,
+            goals_against, goal_difference, points, updated_at::DATE AS snapshot_date,
+            created_at, updated_at
+        FROM team_stats_legacy
+        WHERE season IS NOT NULL AND updated_at IS NOT NULL
+        ORDER BY team_id, season, updated_at::DATE, updated_at DESC;
+
+        DROP TABLE team_stats_legacy;
+    END IF;
+END;
+$$;
+
+-- Último snapshot de cada equipo en una temporada. Los índices de tablas
+-- particionadas no admiten CONCURRENTLY; la tabla es nueva en esta migración
+CREATE INDEX IF NOT EXISTS idx_team_stats_latest
+    ON team_stats (season, team_id, updated_at DESC);
+
+DROP TRIGGER IF EXISTS update_team_stats_modtime ON team_stats;
+CREATE TRIGGER update_team_stats_modtime
+    BEFORE UPDATE ON team_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
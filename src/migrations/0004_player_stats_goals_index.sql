@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Ranking de goleadores por temporada, creado sin bloquear las escrituras en
+-- player_stats. Si un intento anterior falló queda un índice INVALID con el
+-- mismo nombre: se elimina antes de volver a crearlo
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_player_stats_season_goals;
+
+CREATE INDEX CONCURRENTLY idx_player_stats_season_goals
+    ON player_stats (season, goals DESC);
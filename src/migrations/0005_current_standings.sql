@@ -0,0 +1,27 @@
+-- Tabla de posiciones actual: último snapshot de cada equipo por
+-- temporada. El pipeline la refresca (CONCURRENTLY) después de cada carga
+CREATE MATERIALIZED VIEW IF NOT EXISTS current_standings AS
+SELECT DISTINCT ON (ts.season, ts.team_id)
+    ts.season,
+    ts.team_id,
+    t.name AS team_name,
+    ts.position,
+    ts.played,
+    ts.won,
+    ts.drawn,
+    ts.lost,
+    ts.goals_for,
+    ts.goals_against,
+    ts.goal_difference,
+    ts.points,
+    ts.snapshot_date,
+    ts.updated_at
+FROM team_stats ts
+JOIN teams t ON t.team_id = ts.team_id
+ORDER BY ts.season, ts.team_id, ts.updated_at DESC;
+
+-- REFRESH ... CONCURRENTLY necesita un índice único
+CREATE UNIQUE INDEX IF NOT EXISTS idx_current_standings_team
+    ON current_standings (season, team_id);
+CREATE INDEX IF NOT EXISTS idx_current_standings_position
+    ON current_standings (season, position);
@@ -0,0 +1,174 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import requests
+from src.extractors.web_scraper import PremierLeagueScraper
+from src.utils.seasons import CURRENT_SEASON
+from src.utils.metrics import export
+
+try:
+    from zoneinfo import ZoneInfo
+    MATCH_TIMEZONE = ZoneInfo('Europe/London')
+except Exception:  # Sin base de datos de zonas horarias: se usa UTC
+    MATCH_TIMEZONE = timezone.utc
+
+# Franjas con partidos (hora de Londres): (día de la semana, hora inicio, hora
+# fin). Incluyen margen tras el último partido para que las webs se actualicen
+MATCH_WINDOWS: List[Tuple[int, int, int]] = [
+    (0, 19, 24),  # lunes
+    (1, 19, 24),  # martes
+    (2, 19, 24),  # miércoles
+    (3, 19, 24),  # jueves
+    (4, 19, 24),  # viernes
+    (5, 12, 22),  # sábado
+    (6, 13, 21),  # domingo
+]
+
+
+def in_match_window(now: Optional[datetime] = None,
+                    windows: List[Tuple[int, int, int]] = MATCH_WINDOWS) -> bool:
+    """
+    Indica si una fecha cae dentro de una franja con partidos.
+
+    Args:
+        now: Fecha a comprobar (por defecto ahora)
+        windows: Franjas (día de la semana, hora inicio, hora fin)
+
+    Returns:
+        bool: True si hay partidos en juego o acaban de terminar
+    """
+    local = (now or datetime.now(timezone.utc)).astimezone(MATCH_TIMEZONE)
+    return any(local.weekday() == day and start <= local.hour < end for day, start, end in windows)
+
+
+class SourceState:
+    """Estado de sondeo de una página"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.next_run = 0.0
+        self.errors = 0
+        self.last_change: Optional[datetime] = None
+
+
+class PipelineScheduler:
+    """
+    Proceso de larga duración que sondea cada página con su propio intervalo
+    y solo carga cuando el contenido cambió.
+
+    El scraper (sesión HTTP, caché de páginas), el pool de PostgreSQL y los
+    clientes de S3 se mantienen en memoria entre sondeos. El intervalo es
+    corto durante las franjas con partidos y largo el resto del tiempo, con
+    jitter para no sondear a intervalos fijos y backoff exponencial tras
+    errores.
+    """
+
+    def __init__(self, season: str = CURRENT_SEASON, fast_interval: float = 120,
+                 slow_interval: float = 1800, max_backoff: float = 3600,
+                 jitter: float = 0.1, windows: List[Tuple[int, int, int]] = MATCH_WINDOWS,
+                 report_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        """
+        Args:
+            season: Temporada a actualizar
+            fast_interval: Segundos entre sondeos durante los partidos
+            slow_interval: Segundos entre sondeos fuera de los partidos
+            max_backoff: Espera máxima tras errores consecutivos
+            jitter: Variación aleatoria relativa del intervalo (0.1 = ±10 %)
+            windows: Franjas con partidos
+            report_path: Informe JSON de métricas que se reescribe tras cada sondeo
+            prometheus_path: Textfile de Prometheus que se reescribe tras cada sondeo
+        """
+        self.logger = logging.getLogger(__name__)
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.windows = windows
+        self.report_path = report_path
+        self.prometheus_path = prometheus_path
+
+        self.scraper = PremierLeagueScraper(season)
+        self.sources: Dict[str, SourceState] = {name: SourceState(name) for name in self.scraper.urls}
+        self._stop = threading.Event()
+
+    def interval(self, state: SourceState, now: Optional[datetime] = None) -> float:
+        """
+        Segundos hasta el siguiente sondeo de una página.
+
+        Args:
+            state: Estado de la página
+            now: Fecha actual (por defecto ahora)
+        """
+        base = self.fast_interval if in_match_window(now, self.windows) else self.slow_interval
+        if state.errors:
+            base = min(base * 2 ** state.errors, self.max_backoff)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def poll(self, state: SourceState) -> bool:
+        """
+        Sondea una página y la carga si cambió.
+
+        Returns:
+            bool: False si la descarga o la carga fallaron
+        """
+        label, extract_and_load = self.scraper.stages()[state.name]
+
+        try:
+            html = self.scraper.fetch_page(state.name, use_cache=True)
+        except requests.RequestException as e:
+            self.logger.error(f"Error al hacer la petición HTTP ({state.name}): {str(e)}")
+            return False
+
+        if html is None:
+            return True
+
+        if not extract_and_load(html):
+            self.logger.error(f"Error actualizando {label}")
+            return False
+
+        self.scraper.mark_processed(state.name)
+        state.last_change = datetime.now()
+        self.logger.info(f"{label.capitalize()} actualizada")
+        return True
+
+    def run_pending(self) -> float:
+        """
+        Sondea las páginas cuyo turno ha llegado.
+
+        Returns:
+            Segundos hasta el siguiente sondeo
+        """
+        polled = False
+        for state in self.sources.values():
+            if time.monotonic() < state.next_run:
+                continue
+
+            state.errors = 0 if self.poll(state) else state.errors + 1
+            delay = self.interval(state)
+            state.next_run = time.monotonic() + delay
+            polled = True
+            self.logger.debug(f"Próximo sondeo de {state.name} en {delay:.0f} s")
+
+        if polled:
+            # Las métricas se acumulan durante toda la vida del proceso
+            export(self.report_path, self.prometheus_path)
+
+        return max(0.0, min(state.next_run for state in self.sources.values()) - time.monotonic())
+
+    def serve(self):
+        """Bucle principal: se detiene con stop() (p. ej. desde un manejador de señales)"""
+        self.logger.info(f"Sondeando {', '.join(self.sources)} "
+                         f"(partidos: {self.fast_interval:.0f} s, resto: {self.slow_interval:.0f} s)")
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(self.run_pending())
+        finally:
+            self.scraper.session.close()
+            self.logger.info("Planificador detenido")
+
+    def stop(self):
+        """Pide al bucle principal que termine tras el sondeo en curso"""
+        self._stop.set()
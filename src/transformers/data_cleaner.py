@@ -0,0 +1,88 @@
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columnas numéricas de la tabla de posiciones y su tipo compacto
+LEAGUE_TABLE_DTYPES = {
+    'Position': 'int16',
+    'Played': 'int16',
+    'Won': 'int16',
+    'Drawn': 'int16',
+    'Lost': 'int16',
+    'Goals For': 'int16',
+    'Goals Against': 'int16',
+    'Goal Difference': 'int16',
+    'Points': 'int16',
+}
+LEAGUE_TABLE_REQUIRED = ['Team'] + list(LEAGUE_TABLE_DTYPES)
+
+TOP_SCORERS_REQUIRED = ['Posición', 'Jugador', 'País', 'Equipo', 'Goles']
+
+# '27 (7)' -> goles=27, penales=7 ; '12' -> goles=12, penales=NaN
+_GOALS_PATTERN = r'^\s*(?P<goals>\d+)\s*(?:\(\s*(?P<penalties>\d+)\s*\))?\s*$'
+
+
+def _validate_columns(df: pd.DataFrame, required: list, name: str):
+    """Comprueba que el DataFrame tenga las columnas esperadas"""
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en {name}: {missing}")
+
+
+def clean_league_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipa la tabla de posiciones extraída con operaciones vectorizadas.
+
+    Args:
+        df: DataFrame con los textos de cada celda
+
+    Returns:
+        DataFrame con enteros int16 y el equipo como categoría
+    """
+    _validate_columns(df, LEAGUE_TABLE_REQUIRED, 'la tabla de posiciones')
+
+    df = df[LEAGUE_TABLE_REQUIRED].copy()
+    df['Team'] = df['Team'].str.strip().astype('category')
+
+    numeric = df[list(LEAGUE_TABLE_DTYPES)].apply(lambda col: pd.to_numeric(col.str.strip(), errors='coerce'))
+    invalid = numeric.isna().any()
+    if invalid.any():
+        raise ValueError(f"Valores no numéricos en la tabla de posiciones: {list(invalid[invalid].index)}")
+
+    df[list(LEAGUE_TABLE_DTYPES)] = numeric.astype(LEAGUE_TABLE_DTYPES)
+    return df.reset_index(drop=True)
+
+
+def clean_top_scorers(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipa la tabla de goleadores extraída con operaciones vectorizadas:
+    separa goles y penales con str.extract y descarta las filas inválidas.
+
+    Args:
+        df: DataFrame con los textos de cada celda ('Goles' como '27 (7)')
+
+    Returns:
+        DataFrame con Posición (Int16, vacía en empates), Jugador, País y
+        Equipo (categorías), Goles y Penales (int16)
+    """
+    _validate_columns(df, TOP_SCORERS_REQUIRED, 'la tabla de goleadores')
+
+    goals = df['Goles'].str.extract(_GOALS_PATTERN)
+    valid = goals['goals'].notna()
+    if not valid.all():
+        logger.warning(f"Filas de goleadores descartadas por goles inválidos: {int((~valid).sum())}")
+
+    df = df[valid]
+    goals = goals[valid]
+
+    return pd.DataFrame({
+        'Posición': pd.to_numeric(
+            df['Posición'].str.strip().str.replace('.', '', regex=False), errors='coerce'
+        ).astype('Int16'),
+        'Jugador': df['Jugador'].str.strip(),
+        'País': df['País'].str.strip().astype('category'),
+        'Equipo': df['Equipo'].str.replace('\n', '', regex=False).str.strip().astype('category'),
+        'Goles': goals['goals'].astype('int16'),
+        'Penales': goals['penalties'].fillna(0).astype('int16'),
+    }).reset_index(drop=True)
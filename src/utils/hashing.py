@@ -0,0 +1,48 @@
+import hashlib
+from typing import Dict, List
+import pandas as pd
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Hash estable (uint64) de cada fila de un DataFrame, independiente del índice.
+
+    Args:
+        df: DataFrame normalizado
+
+    Returns:
+        Serie con un hash por fila
+    """
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    Hash estable de un DataFrame completo (columnas, orden y valores).
+
+    Args:
+        df: DataFrame normalizado
+
+    Returns:
+        Hash SHA-256 en hexadecimal
+    """
+    digest = hashlib.sha256('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(row_hashes(df).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def keyed_row_hashes(df: pd.DataFrame, key_columns: List[str]) -> Dict[str, str]:
+    """
+    Hash de cada fila indexado por su clave natural.
+
+    Args:
+        df: DataFrame normalizado
+        key_columns: Columnas que identifican la fila
+
+    Returns:
+        Diccionario clave ('a|b') -> hash en hexadecimal
+    """
+    keys = df[key_columns[0]].astype(str).str.cat(
+        [df[col].astype(str) for col in key_columns[1:]], sep='|'
+    )
+    return dict(zip(keys.tolist(), (format(h, '016x') for h in row_hashes(df).tolist())))
@@ -1,6 +1,7 @@
 import psycopg2
 from dotenv import load_dotenv
 import os
+from src.utils.migrations import MigrationRunner
 
 # Cargar variables de entorno
 load_dotenv()
@@ -8,111 +9,26 @@ load_dotenv()
 
 def create_tables():
     """
-    Crea las tablas necesarias en la base de datos usando un esquema normalizado.
+    Crea o actualiza el esquema normalizado aplicando las migraciones
+    pendientes de src/migrations.
     """
-    create_tables_sql = """
-    -- Tabla de equipos
-    CREATE TABLE IF NOT EXISTS teams (
-        team_id SERIAL PRIMARY KEY,
-        name VARCHAR(100) UNIQUE NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-
-    -- Tabla de jugadores
-    CREATE TABLE IF NOT EXISTS players (
-        player_id SERIAL PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        country VARCHAR(100),
-        team_id INTEGER REFERENCES teams(team_id),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(name, team_id)
-    );
-
-    -- Tabla de estadísticas de equipos (tabla de posiciones)
-    CREATE TABLE IF NOT EXISTS team_stats (
-        stat_id SERIAL PRIMARY KEY,
-        team_id INTEGER REFERENCES teams(team_id),
-        season VARCHAR(9),  -- e.g., "2023-2024"
-        position INTEGER,
-        played INTEGER,
-        won INTEGER,
-        drawn INTEGER,
-        lost INTEGER,
-        goals_for INTEGER,
-        goals_against INTEGER,
-        goal_difference INTEGER,
-        points INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(team_id, season, updated_at)
-    );
-
-    -- Tabla de estadísticas de goleadores
-    CREATE TABLE IF NOT EXISTS player_stats (
-        stat_id SERIAL PRIMARY KEY,
-        player_id INTEGER REFERENCES players(player_id),
-        season VARCHAR(9),
-        goals INTEGER DEFAULT 0,
-        penalties INTEGER DEFAULT 0,
-        assists INTEGER DEFAULT 0,
-        minutes_played INTEGER DEFAULT 0,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(player_id, season)
-    );
-
-    -- Función para actualizar el timestamp
-    CREATE OR REPLACE FUNCTION update_updated_at_column()
-    RETURNS TRIGGER AS $$
-    BEGIN
-        NEW.updated_at = CURRENT_TIMESTAMP;
-        RETURN NEW;
-    END;
-    $$ language 'plpgsql';
-
-    -- Triggers para actualizar timestamps
-    CREATE TRIGGER update_teams_modtime
-        BEFORE UPDATE ON teams
-        FOR EACH ROW
-        EXECUTE FUNCTION update_updated_at_column();
-
-    CREATE TRIGGER update_players_modtime
-        BEFORE UPDATE ON players
-        FOR EACH ROW
-        EXECUTE FUNCTION update_updated_at_column();
-
-    CREATE TRIGGER update_team_stats_modtime
-        BEFORE UPDATE ON team_stats
-        FOR EACH ROW
-        EXECUTE FUNCTION update_updated_at_column();
-
-    CREATE TRIGGER update_player_stats_modtime
-        BEFORE UPDATE ON player_stats
-        FOR EACH ROW
-        EXECUTE FUNCTION update_updated_at_column();
-    """
-
     try:
-        # Conectar a la base de datos
-        print("Conectando a la base de datos...")
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-
-        # Crear un cursor y ejecutar el SQL
-        print("Creando tablas...")
-        cur = conn.cursor()
-        cur.execute(create_tables_sql)
-
-        # Confirmar los cambios
-        conn.commit()
-        print("✅ Tablas creadas exitosamente")
+        # Aplicar las migraciones
+        print("Aplicando migraciones...")
+        applied = MigrationRunner().migrate()
+        for migration in applied:
+            print(f"- {migration}")
+        print(f"✅ Esquema actualizado ({len(applied)} migraciones aplicadas)")
 
         # Verificar las tablas creadas
+        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+        cur = conn.cursor()
         cur.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
+            SELECT table_name
+            FROM information_schema.tables
             WHERE table_schema = 'public'
+            -- Las particiones de team_stats no se listan
+            AND table_name::regclass NOT IN (SELECT inhrelid FROM pg_inherits)
             ORDER BY table_name;
         """)
 
@@ -129,4 +45,4 @@ def create_tables():
 
 
 if __name__ == "__main__":
-    create_tables()
\ No newline at end of file
+    create_tables()
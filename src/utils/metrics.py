@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, ExitStack
+from datetime import datetime
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+# Prefijo de las métricas exportadas a Prometheus
+METRIC_PREFIX = 'premier_league'
+# Spans individuales que se conservan para el informe (el resto se agrega)
+MAX_RECENT_SPANS = 1000
+
+# Contadores que puede acumular cada span
+COUNTERS = ('bytes', 'rows', 'round_trips')
+
+
+class Span:
+    """Etapa cronometrada del pipeline con sus contadores"""
+
+    def __init__(self, stage: str, labels: Dict[str, str]):
+        self.stage = stage
+        self.labels = labels
+        self.started_at = datetime.now()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+
+    def add(self, **counters: int):
+        """Suma bytes, filas o round-trips al span"""
+        for name, value in counters.items():
+            self.counters[name] += int(value)
+
+    def to_dict(self) -> Dict:
+        return {
+            'stage': self.stage,
+            'labels': self.labels,
+            'started_at': self.started_at.isoformat(),
+            'duration_s': round(self.duration, 6),
+            'error': self.error,
+            **self.counters,
+        }
+
+
+class RunMetrics:
+    """
+    Métricas de una ejecución: agrega los spans por etapa y etiquetas
+    (llamadas, segundos totales y máximos, bytes, filas y round-trips) y
+    conserva los últimos spans. Es seguro entre hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+        self._stages: Dict[Tuple[str, Tuple], Dict] = {}
+        self._recent = deque(maxlen=MAX_RECENT_SPANS)
+
+    @contextmanager
+    def span(self, stage: str, **labels: str) -> Iterator[Span]:
+        """
+        Cronometra un bloque como una etapa.
+
+        Args:
+            stage: Etapa ('fetch', 'parse', 'transform', 's3_serialize',
+                's3_upload', 'db_upsert'...)
+            labels: Etiquetas, p. ej. page='league_table'
+        """
+        span = Span(stage, {key: str(value) for key, value in labels.items()})
+        if _span_hooks:
+            with ExitStack() as stack:
+                for hook in list(_span_hooks):
+                    stack.enter_context(hook(span))
+                with self._timed(span):
+                    yield span
+        else:
+            with self._timed(span):
+                yield span
+
+    @contextmanager
+    def _timed(self, span: Span) -> Iterator[Span]:
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            self._record(span)
+
+    def record(self, stage: str, duration: float, labels: Optional[Dict[str, str]] = None,
+               **counters: int) -> Span:
+        """Registra un span ya medido (p. ej. el tiempo de subida dentro de otra etapa)"""
+        span = Span(stage, {key: str(value) for key, value in (labels or {}).items()})
+        span.duration = duration
+        span.add(**counters)
+        self._record(span)
+        return span
+
+    def _record(self, span: Span):
+        key = (span.stage, tuple(sorted(span.labels.items())))
+        with self._lock:
+            stats = self._stages.setdefault(key, {
+                'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                **{name: 0 for name in COUNTERS}
+            })
+            stats['calls'] += 1
+            stats['errors'] += span.error is not None
+            stats['seconds'] += span.duration
+            stats['max_seconds'] = max(stats['max_seconds'], span.duration)
+            for name in COUNTERS:
+                stats[name] += span.counters[name]
+            self._recent.append(span)
+            self.updated_at = time.time()
+
+    def report(self) -> Dict:
+        """Informe de la ejecución como diccionario serializable"""
+        with self._lock:
+            stages = [
+                {'stage': stage, 'labels': dict(labels), **stats}
+                for (stage, labels), stats in sorted(self._stages.items())
+            ]
+            spans = [span.to_dict() for span in self._recent]
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'updated_at': datetime.fromtimestamp(self.updated_at).isoformat(),
+            'duration_s': round(self.updated_at - self.started_at, 3),
+            'stages': stages,
+            'spans': spans,
+        }
+
+    def write_json(self, path: str):
+        """Guarda el informe de la ejecución en JSON"""
+        _atomic_write(path, json.dumps(self.report(), indent=2, ensure_ascii=False))
+
+    def prometheus_text(self) -> str:
+        """Métricas en el formato de texto de Prometheus (textfile collector)"""
+        metrics = {
+            'stage_calls_total': ('counter', 'Ejecuciones de la etapa', 'calls'),
+            'stage_errors_total': ('counter', 'Ejecuciones de la etapa con error', 'errors'),
+            'stage_seconds_total': ('counter', 'Segundos acumulados en la etapa', 'seconds'),
+            'stage_seconds_max': ('gauge', 'Duración máxima de la etapa', 'max_seconds'),
+            'stage_bytes_total': ('counter', 'Bytes procesados en la etapa', 'bytes'),
+            'stage_rows_total': ('counter', 'Filas procesadas en la etapa', 'rows'),
+            'stage_round_trips_total': ('counter', 'Round-trips de red de la etapa', 'round_trips'),
+        }
+
+        with self._lock:
+            stages = sorted(self._stages.items())
+            started_at, updated_at = self.started_at, self.updated_at
+
+        lines = []
+        for name, (kind, help_text, field) in metrics.items():
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for (stage, labels), stats in stages:
+                label_text = ','.join(
+                    f'{key}="{_escape(value)}"' for key, value in (('stage', stage),) + labels
+                )
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {stats[field]:g}")
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_start_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_start_timestamp_seconds {started_at:.3f}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_last_update_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_last_update_timestamp_seconds {updated_at:.3f}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Guarda las métricas para el textfile collector de node_exporter"""
+        _atomic_write(path, self.prometheus_text())
+
+
+def _escape(value: str) -> str:
+    """Escapa un valor de etiqueta de Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _atomic_write(path: str, content: str):
+    """Escribe un archivo de forma atómica (los lectores nunca ven uno a medias)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+_metrics = RunMetrics()
+# Context managers que envuelven cada span (p. ej. los perfiladores); sin
+# ninguno registrado un span no hace nada más que cronometrar
+_span_hooks: List[Callable[[Span], ContextManager]] = []
+
+
+def get_metrics() -> RunMetrics:
+    """Métricas de la ejecución en curso"""
+    return _metrics
+
+
+def reset_metrics() -> RunMetrics:
+    """Empieza una ejecución nueva y devuelve sus métricas"""
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
+
+
+def add_span_hook(hook: Callable[[Span], ContextManager]):
+    """
+    Registra un hook que envuelve cada span de todas las ejecuciones.
+
+    Args:
+        hook: Función que recibe el span y devuelve un context manager
+    """
+    _span_hooks.append(hook)
+
+
+def remove_span_hook(hook: Callable[[Span], ContextManager]):
+    """Elimina un hook registrado con add_span_hook"""
+    if hook in _span_hooks:
+        _span_hooks.remove(hook)
+
+
+def span(stage: str, **labels: str):
+    """Atajo de get_metrics().span(...)"""
+    return get_metrics().span(stage, **labels)
+
+
+def export(report_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+    """Exporta las métricas de la ejecución a los destinos indicados"""
+    if report_path:
+        get_metrics().write_json(report_path)
+    if prometheus_path:
+        get_metrics().write_prometheus(prometheus_path)
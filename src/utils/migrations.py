@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional
+import psycopg2
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Directorio con las migraciones: NNNN_descripcion.sql
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Clave del advisory lock que serializa las ejecuciones del runner
+MIGRATION_LOCK_ID = 4_815_162_342
+
+# Marca (en la primera línea) de las migraciones que no pueden ir en una
+# transacción, p. ej. CREATE INDEX CONCURRENTLY
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.sql$')
+_STATEMENT_END = re.compile(r';\s*$', re.MULTILINE)
+
+
+class Migration:
+    """Migración SQL versionada leída de MIGRATIONS_DIR"""
+
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+        self.transactional = not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    def statements(self) -> List[str]:
+        """
+        Sentencias de la migración, una a una. Solo se usa en las migraciones
+        sin transacción, que no pueden contener cuerpos de función ni DO.
+        """
+        lines = [line for line in self.sql.splitlines() if not line.strip().startswith('--')]
+        return [stmt.strip() for stmt in _STATEMENT_END.split('\n'.join(lines)) if stmt.strip()]
+
+    def __repr__(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations(migrations_dir: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Lee las migraciones del directorio ordenadas por versión.
+
+    Args:
+        migrations_dir: Directorio con los archivos NNNN_descripcion.sql
+
+    Returns:
+        Lista de migraciones
+    """
+    migrations = []
+    for filename in sorted(os.listdir(migrations_dir)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2),
+                                        os.path.join(migrations_dir, filename)))
+
+    versions = [m.version for m in migrations]
+    duplicated = sorted({v for v in versions if versions.count(v) > 1})
+    if duplicated:
+        raise ValueError(f"Versiones de migración duplicadas: {duplicated}")
+    return migrations
+
+
+class MigrationRunner:
+    """
+    Aplica las migraciones pendientes y registra las versiones aplicadas en
+    la tabla schema_migrations.
+
+    Cada migración se aplica en su propia transacción junto con su registro,
+    salvo las marcadas con NO_TRANSACTION_MARKER, que se ejecutan sentencia a
+    sentencia en autocommit (deben ser idempotentes). Un advisory lock evita
+    que dos ejecuciones migren a la vez.
+    """
+
+    def __init__(self, database_url: Optional[str] = None, migrations_dir: str = MIGRATIONS_DIR):
+        """
+        Args:
+            database_url: URL de conexión (por defecto DATABASE_URL)
+            migrations_dir: Directorio de las migraciones
+        """
+        self.logger = logging.getLogger(__name__)
+        self.database_url = database_url or os.getenv('DATABASE_URL')
+        self.migrations = load_migrations(migrations_dir)
+
+    def _ensure_table(self, cur):
+        """Crea la tabla de versiones si no existe"""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                duration_ms INTEGER,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+    def applied(self, cur) -> Dict[int, str]:
+        """
+        Versiones aplicadas en la base de datos.
+
+        Returns:
+            Diccionario versión -> checksum
+        """
+        cur.execute("SELECT version, checksum FROM schema_migrations;")
+        return dict(cur.fetchall())
+
+    def status(self) -> List[tuple]:
+        """
+        Estado de cada migración conocida.
+
+        Returns:
+            Lista de (migración, aplicada, checksum_coincide)
+        """
+        conn = psycopg2.connect(self.database_url)
+        try:
+            with conn.cursor() as cur:
+                self._ensure_table(cur)
+                applied = self.applied(cur)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return [
+            (m, m.version in applied, applied.get(m.version, m.checksum) == m.checksum)
+            for m in self.migrations
+        ]
+
+    def migrate(self, target: Optional[int] = None) -> List[Migration]:
+        """
+        Aplica en orden las migraciones pendientes.
+
+        Args:
+            target: Última versión a aplicar (por defecto todas)
+
+        Returns:
+            Migraciones aplicadas en esta ejecución
+        """
+        conn = psycopg2.connect(self.database_url)
+        conn.autocommit = True
+        applied_now = []
+
+        try:
+            with conn.cursor() as cur:
+                # Lock de sesión: se mantiene entre las transacciones de cada migración
+                cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+                try:
+                    self._ensure_table(cur)
+                    applied = self.applied(cur)
+
+                    for migration in self.migrations:
+                        if migration.version in applied:
+                            if applied[migration.version] != migration.checksum:
+                                self.logger.warning(f"La migración {migration} cambió después de aplicarse")
+                            continue
+                        if target is not None and migration.version > target:
+                            break
+
+                        self._apply(conn, cur, migration)
+                        applied_now.append(migration)
+                finally:
+                    cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+        finally:
+            conn.close()
+
+        return applied_now
+
+    def _apply(self, conn, cur, migration: Migration):
+        """Aplica una migración y registra su versión"""
+        self.logger.info(f"Aplicando migración {migration}...")
+        start = time.perf_counter()
+
+        try:
+            if migration.transactional:
+                conn.autocommit = False
+                cur.execute(migration.sql)
+            else:
+                for statement in migration.statements():
+                    cur.execute(statement)
+                conn.autocommit = False
+
+            cur.execute("""
+                INSERT INTO schema_migrations (version, name, checksum, duration_ms)
+                VALUES (%s, %s, %s, %s);
+            """, (migration.version, migration.name, migration.checksum,
+                  int((time.perf_counter() - start) * 1000)))
+            conn.commit()
+
+        except Exception as e:
+            self.logger.error(f"Error aplicando la migración {migration}: {str(e)}")
+            conn.rollback()
+            raise
+        finally:
+            conn.autocommit = True
+
+        self.logger.info(f"Migración {migration} aplicada")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for migration in MigrationRunner().migrate():
+        print(f"✅ {migration}")
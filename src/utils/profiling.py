@@ -0,0 +1,293 @@
+import cProfile
+import io
+from abc import ABC, abstractmethod
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import ContextManager, Dict, Iterator, List, Tuple
+from src.utils.metrics import Span, add_span_hook, remove_span_hook
+
+# Funciones (cpu) o líneas (mem) que se muestran por etapa
+TOP_ENTRIES = 25
+# Marcos que tracemalloc guarda por asignación (más marcos, más coste)
+TRACEMALLOC_FRAMES = 1
+
+
+class StageProfiler(ABC):
+    """
+    Perfilador por etapa del pipeline: se engancha a los spans de
+    src.utils.metrics, así que mide las etapas en el hilo en que se ejecutan
+    (las descargas y las cargas van en hilos del ThreadPoolExecutor).
+
+    Si no se usa no cuesta nada: este módulo solo se importa con --profile.
+    """
+
+    mode = ''
+
+    def __init__(self, output_dir: str = '.'):
+        """
+        Args:
+            output_dir: Directorio de los informes (el de los logs de la ejecución)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = output_dir
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        # Los spans anidados en un mismo hilo se atribuyen al exterior
+        self._local = threading.local()
+
+    def start(self):
+        add_span_hook(self._hook)
+        self.logger.info(f"Perfilado '{self.mode}' activado")
+
+    def stop(self) -> List[str]:
+        """
+        Deja de perfilar y escribe los informes.
+
+        Returns:
+            Rutas de los archivos generados
+        """
+        remove_span_hook(self._hook)
+        try:
+            paths = self.write()
+        except Exception as e:
+            self.logger.error(f"Error escribiendo el perfil: {str(e)}")
+            return []
+
+        for path in paths:
+            self.logger.info(f"Perfil guardado en {path}")
+        return paths
+
+    def _path(self, suffix: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = self.started_at.strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, f"profile_{self.mode}_{timestamp}{suffix}")
+
+    @staticmethod
+    def _stage_key(span: Span) -> str:
+        labels = ','.join(f"{key}={value}" for key, value in sorted(span.labels.items()))
+        return f"{span.stage}[{labels}]" if labels else span.stage
+
+    @contextmanager
+    def _hook(self, span: Span) -> Iterator[None]:
+        if getattr(self._local, 'active', False):
+            yield
+            return
+
+        self._local.active = True
+        try:
+            with self.profile_stage(self._stage_key(span)):
+                yield
+        finally:
+            self._local.active = False
+
+    @abstractmethod
+    def profile_stage(self, stage: str) -> ContextManager[None]:
+        """Context manager que perfila una ejecución de la etapa"""
+
+    @abstractmethod
+    def write(self) -> List[str]:
+        """Escribe los informes y devuelve sus rutas"""
+
+
+class CpuProfiler(StageProfiler):
+    """
+    cProfile por etapa. Cada span tiene su propio perfilador en su hilo y los
+    resultados se acumulan por etapa: un .prof por etapa (para snakeviz o
+    pstats) y un resumen en texto.
+    """
+
+    mode = 'cpu'
+
+    def __init__(self, output_dir: str = '.'):
+        super().__init__(output_dir)
+        self._stats: Dict[str, pstats.Stats] = {}
+
+    @contextmanager
+    def profile_stage(self, stage: str) -> Iterator[None]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Desde Python 3.12 solo puede haber un perfilador activo a la vez
+            self.logger.debug(f"Etapa {stage} sin perfilar: ya hay otro perfilador activo")
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.create_stats()
+            with self._lock:
+                if stage in self._stats:
+                    self._stats[stage].add(profiler)
+                else:
+                    self._stats[stage] = pstats.Stats(profiler)
+
+    def write(self) -> List[str]:
+        paths = []
+        report = io.StringIO()
+        report.write(f"Perfil de CPU por etapa ({self.started_at.isoformat()})\n")
+
+        with self._lock:
+            stages = sorted(self._stats.items(), key=lambda item: item[1].total_tt, reverse=True)
+            for stage, stats in stages:
+                safe_name = stage.replace('[', '_').replace(']', '').replace('=', '-').replace(',', '_')
+                prof_path = self._path(f"_{safe_name}.prof")
+                stats.dump_stats(prof_path)
+                paths.append(prof_path)
+
+                report.write(f"\n=== {stage}: {stats.total_tt:.3f} s ===\n")
+                stats.stream = report
+                stats.sort_stats('cumulative').print_stats(TOP_ENTRIES)
+
+        if not stages:
+            report.write("\nNo se ejecutó ninguna etapa\n")
+
+        log_path = self._path('.log')
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        return [log_path] + paths
+
+
+class MemoryProfiler(StageProfiler):
+    """
+    tracemalloc por etapa: memoria que cada etapa deja asignada al terminar
+    (comparando instantáneas al entrar y al salir del span, cuando las
+    variables locales como el buffer de Parquet siguen vivas) y pico durante
+    la etapa.
+
+    tracemalloc es global al proceso (incluido el pico), así que con este
+    perfilador las etapas se ejecutan de una en una aunque vayan en hilos
+    distintos: la ejecución es más lenta y sus tiempos no son representativos,
+    pero las asignaciones y el pico de cada etapa son solo suyos. Además cada
+    etapa toma dos instantáneas completas de la memoria trazada.
+    Las etapas no deben esperar a etapas de otros hilos.
+    """
+
+    mode = 'mem'
+
+    def __init__(self, output_dir: str = '.'):
+        super().__init__(output_dir)
+        self._was_tracing = False
+        # Etapa -> (línea -> (bytes, asignaciones)), llamadas y pico máximo
+        self._allocations: Dict[str, Dict[str, Tuple[int, int]]] = defaultdict(dict)
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._peaks: Dict[str, int] = defaultdict(int)
+        # Una sola etapa medida a la vez en todo el proceso
+        self._serial = threading.Lock()
+
+    def start(self):
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        super().start()
+
+    def stop(self) -> List[str]:
+        try:
+            return super().stop()
+        finally:
+            if not self._was_tracing:
+                tracemalloc.stop()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    @contextmanager
+    def profile_stage(self, stage: str) -> Iterator[None]:
+        with self._serial:
+            with self._measure(stage):
+                yield
+
+    @contextmanager
+    def _measure(self, stage: str) -> Iterator[None]:
+        before = self._snapshot()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            differences = self._snapshot().compare_to(before, 'lineno')
+
+            with self._lock:
+                self._calls[stage] += 1
+                self._peaks[stage] = max(self._peaks[stage], peak - start_memory)
+                allocations = self._allocations[stage]
+                for stat in differences:
+                    if stat.size_diff <= 0:
+                        continue
+                    frame = stat.traceback[0]
+                    line = f"{frame.filename}:{frame.lineno}"
+                    size, count = allocations.get(line, (0, 0))
+                    allocations[line] = (size + stat.size_diff, count + stat.count_diff)
+
+    def write(self) -> List[str]:
+        report = io.StringIO()
+        report.write(f"Perfil de memoria por etapa ({self.started_at.isoformat()})\n")
+
+        with self._lock:
+            stages = sorted(self._peaks, key=self._peaks.get, reverse=True)
+            for stage in stages:
+                allocations = self._allocations[stage]
+                retained = sum(size for size, _ in allocations.values())
+                report.write(f"\n=== {stage}: {self._calls[stage]} ejecución(es), "
+                             f"pico {_format_size(self._peaks[stage])}, "
+                             f"retenido al salir {_format_size(retained)} ===\n")
+
+                top = sorted(allocations.items(), key=lambda item: item[1][0], reverse=True)
+                for line, (size, count) in top[:TOP_ENTRIES]:
+                    report.write(f"{_format_size(size):>12}{count:>10}  {line}\n")
+
+        current, _ = tracemalloc.get_traced_memory()
+        report.write(f"\nMemoria trazada al terminar: {_format_size(current)}\n")
+        if not stages:
+            report.write("No se ejecutó ninguna etapa\n")
+
+        log_path = self._path('.log')
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        return [log_path]
+
+
+def _format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+PROFILERS = {
+    'cpu': CpuProfiler,
+    'mem': MemoryProfiler,
+}
+
+
+def start_profiler(mode: str, output_dir: str = '.') -> StageProfiler:
+    """
+    Empieza a perfilar las etapas del pipeline.
+
+    Args:
+        mode: 'cpu' (cProfile) o 'mem' (tracemalloc)
+        output_dir: Directorio de los informes
+
+    Returns:
+        Perfilador en marcha (hay que llamar a stop() para escribir los informes)
+    """
+    profiler = PROFILERS[mode](output_dir)
+    profiler.start()
+    return profiler
@@ -0,0 +1,216 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Segundos que vive un resultado: acota lo desfasado que puede estar frente a
+# cargas hechas desde otro proceso (las del propio proceso invalidan al momento)
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '300'))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '256'))
+QUERY_CACHE_MAX_MB = float(os.getenv('QUERY_CACHE_MAX_MB', '64'))
+
+# Etiqueta de las consultas en las que no se reconoce ninguna tabla: se
+# invalidan con cualquier escritura
+ANY_TABLE = '*'
+
+# Literales entre comillas (se respetan al normalizar) o espacios en blanco
+_WHITESPACE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+_IDENTIFIER = r'((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)'
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+' + _IDENTIFIER, re.IGNORECASE)
+_WRITE_TABLES = re.compile(
+    r'^\s*(?:INSERT\s+INTO|UPDATE(?:\s+ONLY)?|DELETE\s+FROM(?:\s+ONLY)?|TRUNCATE(?:\s+TABLE)?(?:\s+ONLY)?'
+    r'|REFRESH\s+MATERIALIZED\s+VIEW(?:\s+CONCURRENTLY)?|COPY)\s+' + _IDENTIFIER,
+    re.IGNORECASE
+)
+# Basta con el principio de la sentencia (execute_values envía todo el VALUES)
+_STATEMENT_HEAD = 256
+
+
+def normalize_sql(query: str) -> str:
+    """Colapsa los espacios fuera de los literales y quita el ';' final"""
+    normalized = _WHITESPACE.sub(lambda m: m.group(1) or ' ', query).strip()
+    return normalized.rstrip(';').rstrip()
+
+
+def _table_name(identifier: str) -> str:
+    """Nombre de la tabla sin esquema ni comillas, en minúsculas"""
+    name = re.split(r'\s*\.\s*', identifier)[-1]
+    return name.strip('"').lower()
+
+
+def referenced_tables(query: str) -> FrozenSet[str]:
+    """
+    Tablas que lee una consulta (las que siguen a FROM y JOIN).
+
+    Returns:
+        Conjunto de nombres; ANY_TABLE si no se reconoce ninguna
+    """
+    tables = frozenset(_table_name(match) for match in _READ_TABLES.findall(query))
+    return tables or frozenset([ANY_TABLE])
+
+
+def written_table(query) -> Optional[str]:
+    """
+    Tabla que modifica una sentencia (INSERT, UPDATE, DELETE, TRUNCATE, COPY
+    o REFRESH MATERIALIZED VIEW), o None si no escribe.
+
+    Args:
+        query: Sentencia como str, bytes o psycopg2.sql.Composable ya renderizada
+    """
+    if isinstance(query, bytes):
+        query = query[:_STATEMENT_HEAD].decode('utf-8', errors='ignore')
+    elif not isinstance(query, str):
+        return None
+    match = _WRITE_TABLES.match(query[:_STATEMENT_HEAD])
+    return _table_name(match.group(1)) if match else None
+
+
+class QueryCache:
+    """
+    Caché de resultados de consultas por SQL normalizado y parámetros, con
+    TTL y expulsión LRU por número de entradas y por memoria. Cada entrada
+    guarda las tablas que lee para invalidarla cuando se escribe en ellas.
+    Es segura entre hilos.
+    """
+
+    def __init__(self, ttl: float = QUERY_CACHE_TTL, max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+                 max_bytes: int = int(QUERY_CACHE_MAX_MB * 1024 * 1024)):
+        """
+        Args:
+            ttl: Segundos que vive un resultado (0 desactiva la caché)
+            max_entries: Resultados que se conservan como máximo
+            max_bytes: Memoria máxima de los DataFrames guardados
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Clave -> (caducidad, tablas, tamaño, DataFrame), del menos al más reciente
+        self._entries: 'OrderedDict[Tuple, Tuple[float, FrozenSet[str], int, pd.DataFrame]]' = OrderedDict()
+        self._bytes = 0
+        # Cambia con cada invalidación: un resultado leído antes de una
+        # escritura no se guarda si la escritura terminó mientras tanto
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(namespace: str, query: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """
+        Clave de una consulta.
+
+        Args:
+            namespace: Base de datos (las consultas de distintas URLs no se mezclan)
+            query: SQL de la consulta
+            params: Parámetros enlazados
+        """
+        frozen_params = tuple(sorted((str(name), repr(value)) for name, value in (params or {}).items()))
+        return namespace, normalize_sql(query), frozen_params
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], 'pd.DataFrame']) -> 'pd.DataFrame':
+        """
+        Devuelve el resultado guardado o lo calcula con loader() y lo guarda.
+        El llamador recibe siempre una copia: modificarla no altera la caché.
+
+        Args:
+            key: Clave creada con make_key
+            loader: Función que ejecuta la consulta contra la base de datos
+        """
+        if self.ttl <= 0:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3].copy()
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            generation = self._generation
+
+        result = loader()
+        size = int(result.memory_usage(index=True, deep=True).sum())
+
+        with self._lock:
+            if generation == self._generation and size <= self.max_bytes:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (time.monotonic() + self.ttl, referenced_tables(key[1]), size, result.copy())
+                self._bytes += size
+                self._evict()
+        return result
+
+    def _remove(self, key: Tuple):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Descarta los resultados que leen alguna de las tablas.
+
+        Returns:
+            Número de resultados descartados
+        """
+        tables = {_table_name(table) for table in tables}
+        if not tables:
+            return 0
+
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, read, _, _) in self._entries.items()
+                     if ANY_TABLE in read or not read.isdisjoint(tables)]
+            for key in stale:
+                self._remove(key)
+
+        if stale:
+            logger.debug(f"{len(stale)} resultados invalidados por escrituras en {', '.join(sorted(tables))}")
+        return len(stale)
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Aciertos, fallos, expulsiones, entradas y bytes ocupados"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+_query_cache = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    """Caché de consultas compartida por todo el proceso"""
+    return _query_cache
+
+
+def invalidate_tables(tables: Iterable[str]) -> int:
+    """Invalida en la caché compartida los resultados que leen esas tablas"""
+    return _query_cache.invalidate_tables(tables)
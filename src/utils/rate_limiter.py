@@ -0,0 +1,32 @@
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Limita la frecuencia de peticiones por host de forma segura entre hilos:
+    dos peticiones al mismo host quedan separadas al menos min_interval segundos.
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        """
+        Args:
+            min_interval: Segundos mínimos entre peticiones al mismo host
+        """
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """Bloquea hasta que se pueda hacer una petición a la URL"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
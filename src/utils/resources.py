@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TYPE_CHECKING
+from dotenv import load_dotenv
+
+# psycopg2, SQLAlchemy y boto3 se importan al crear cada recurso: importar
+# este módulo no cuesta nada si la ejecución no llega a usarlos
+if TYPE_CHECKING:
+    from psycopg2.pool import ThreadedConnectionPool
+    from sqlalchemy.engine import Engine
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Conexiones del pool de PostgreSQL: psycopg2 abre PG_POOL_MIN al crearlo y
+# solo mantiene abiertas esas al devolverlas (el resto se cierran)
+PG_POOL_MIN = int(os.getenv('PG_POOL_MIN', '2'))
+PG_POOL_MAX = int(os.getenv('PG_POOL_MAX', '4'))
+# Conexiones simultáneas de cada cliente de boto3
+AWS_MAX_POOL_CONNECTIONS = 10
+
+_lock = threading.Lock()
+# psycopg2 falla si el pool está agotado: con el semáforo se espera un hueco
+_pg_slots = threading.BoundedSemaphore(PG_POOL_MAX)
+_pg_pool: Optional['ThreadedConnectionPool'] = None
+_engines: Dict[str, 'Engine'] = {}
+_aws_clients: Dict[str, object] = {}
+# Funciones que close_all ejecuta antes de cerrar nada (p. ej. esperar a las
+# escrituras que siguen en curso en segundo plano)
+_before_close: List[Callable[[], None]] = []
+
+
+def get_pg_pool() -> 'ThreadedConnectionPool':
+    """
+    Pool de conexiones psycopg2 compartido por todo el proceso. Se crea en el
+    primer uso; por encima de PG_POOL_MIN las conexiones se abren bajo demanda
+    hasta PG_POOL_MAX.
+    """
+    global _pg_pool
+    with _lock:
+        if _pg_pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            _pg_pool = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, os.getenv('DATABASE_URL'))
+        return _pg_pool
+
+
+def get_pg_connection():
+    """
+    Toma una conexión del pool, esperando si están todas en uso (hay que
+    devolverla con release_pg_connection).
+    """
+    _pg_slots.acquire()
+    try:
+        return get_pg_pool().getconn()
+    except Exception:
+        _pg_slots.release()
+        raise
+
+
+def release_pg_connection(conn):
+    """
+    Devuelve una conexión al pool, revirtiendo antes la transacción que haya
+    quedado abierta para que el siguiente uso empiece limpio.
+    """
+    from psycopg2 import extensions
+
+    try:
+        if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    finally:
+        try:
+            get_pg_pool().putconn(conn, close=bool(conn.closed))
+        finally:
+            _pg_slots.release()
+
+
+@contextmanager
+def pg_connection() -> Iterator:
+    """
+    Conexión del pool como unidad de trabajo: se confirma al salir del bloque
+    sin errores y se revierte si hay una excepción.
+    """
+    conn = get_pg_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_pg_connection(conn)
+
+
+def get_engine(connection_string: Optional[str] = None) -> 'Engine':
+    """
+    Engine de SQLAlchemy compartido por URL de conexión (cada engine mantiene
+    su propio pool acotado).
+
+    Args:
+        connection_string: URL de conexión (por defecto DATABASE_URL)
+    """
+    connection_string = connection_string or os.getenv('DATABASE_URL')
+    with _lock:
+        engine = _engines.get(connection_string)
+        if engine is None:
+            from sqlalchemy import create_engine
+            engine = create_engine(
+                connection_string,
+                pool_size=PG_POOL_MAX,
+                max_overflow=0,
+                pool_pre_ping=True
+            )
+            _engines[connection_string] = engine
+        return engine
+
+
+def get_aws_client(service: str):
+    """
+    Cliente de boto3 compartido por todo el proceso (los clientes son seguros
+    entre hilos; crearlos no es barato). Se crea en el primer uso.
+
+    Args:
+        service: Servicio de AWS, p. ej. 's3'
+    """
+    with _lock:
+        client = _aws_clients.get(service)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            client = boto3.client(
+                service,
+                region_name=os.getenv('AWS_REGION'),
+                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                config=Config(max_pool_connections=AWS_MAX_POOL_CONNECTIONS)
+            )
+            _aws_clients[service] = client
+        return client
+
+
+def on_close(callback: Callable[[], None]):
+    """
+    Registra una función que close_all ejecuta antes de cerrar los recursos.
+
+    Args:
+        callback: Función sin argumentos
+    """
+    if callback not in _before_close:
+        _before_close.append(callback)
+
+
+def close_all():
+    """
+    Cierra el pool de PostgreSQL, los engines y los clientes de AWS, después
+    de ejecutar las funciones registradas con on_close.
+    """
+    global _pg_pool
+    for callback in list(_before_close):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error antes de cerrar los recursos: {str(e)}")
+
+    with _lock:
+        if _pg_pool is None and not _engines and not _aws_clients:
+            return
+        if _pg_pool is not None:
+            _pg_pool.closeall()
+            _pg_pool = None
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _aws_clients.clear()
+    logger.info("Recursos compartidos cerrados")
@@ -0,0 +1,3 @@
+# Temporada que actualiza el pipeline por defecto. Vive en un módulo sin
+# dependencias para que importarla no cargue pandas ni psycopg2
+CURRENT_SEASON = "2023-2024"
@@ -0,0 +1,69 @@
+import os
+import re
+import subprocess
+import sys
+from typing import List, Iterable, Tuple
+
+# Línea de -X importtime: "import time: self [us] | cumulative | imported package"
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(lines: Iterable[str]) -> List[Tuple[str, int, int, int]]:
+    """
+    Extrae los tiempos de importación de la salida de -X importtime.
+
+    Args:
+        lines: Líneas de stderr del proceso
+
+    Returns:
+        Lista de (módulo, propio en µs, acumulado en µs, profundidad)
+    """
+    entries = []
+    for line in lines:
+        match = _IMPORT_TIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def print_report(entries: List[Tuple[str, int, int, int]], top: int = 25):
+    """Imprime los módulos de primer nivel más costosos y el total"""
+    roots = [entry for entry in entries if entry[3] == 0]
+    total_ms = sum(cumulative for _, _, cumulative, _ in roots) / 1000
+
+    print(f"\n⏱️  Importaciones: {len(entries)} módulos, {total_ms:.1f} ms en total", file=sys.stderr)
+    print(f"{'Módulo':<50}{'Propio (ms)':>14}{'Acumulado (ms)':>16}", file=sys.stderr)
+    for module, self_us, cumulative_us, _ in sorted(roots, key=lambda e: e[2], reverse=True)[:top]:
+        print(f"{module:<50}{self_us / 1000:>14.1f}{cumulative_us / 1000:>16.1f}", file=sys.stderr)
+
+
+def run_with_importtime(script: str, argv: List[str], top: int = 25) -> int:
+    """
+    Vuelve a ejecutar el script con -X importtime (incluye las importaciones
+    diferidas de cada etapa) y al terminar imprime el informe. El resto de
+    stderr (logs) se reenvía tal cual.
+
+    Args:
+        script: Ruta del script a ejecutar
+        argv: Argumentos del script (sin --profile-startup)
+        top: Módulos a mostrar en el informe
+
+    Returns:
+        Código de salida del proceso
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', script, *argv],
+        stderr=subprocess.PIPE, text=True, env=os.environ.copy()
+    )
+
+    import_lines = []
+    for line in process.stderr:
+        if line.startswith('import time:'):
+            import_lines.append(line)
+        else:
+            sys.stderr.write(line)
+    returncode = process.wait()
+
+    print_report(parse_importtime(import_lines), top)
+    return returncode
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+# Credenciales falsas: las pruebas de S3 usan moto y nunca llegan a AWS
+os.environ.update(AWS_BUCKET_NAME='premier-league-tests', AWS_REGION='us-east-1',
+                  AWS_DEFAULT_REGION='us-east-1', AWS_ACCESS_KEY_ID='testing',
+                  AWS_SECRET_ACCESS_KEY='testing')
+
+
+@pytest.fixture
+def s3_loader():
+    """S3Loader particionado contra un bucket simulado con moto"""
+    moto = pytest.importorskip('moto')
+    from src.loaders.s3_loader import S3Loader
+    from src.utils.resources import close_all
+
+    with moto.mock_aws():
+        loader = S3Loader(partitioned=True)
+        loader.s3_client.create_bucket(Bucket=loader.bucket_name)
+        try:
+            yield loader
+        finally:
+            close_all()
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    """DATABASE_URL o, si no hay, un PostgreSQL temporal con pgserver"""
+    url = os.getenv('DATABASE_URL')
+    if url:
+        yield url
+        return
+
+    pgserver = pytest.importorskip('pgserver', reason="Sin DATABASE_URL ni pgserver")
+    server = pgserver.get_server(tempfile.mkdtemp(prefix='pl-tests-pg-'), cleanup_mode='delete')
+    try:
+        yield server.get_uri()
+    finally:
+        server.cleanup()
+
+
+@pytest.fixture
+def empty_database(database_url):
+    """Base de datos vacía y temporal en el servidor de pruebas"""
+    psycopg2 = pytest.importorskip('psycopg2')
+    from sqlalchemy.engine import make_url
+
+    name = f"pl_tests_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(database_url)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{name}";')
+    except psycopg2.Error as e:
+        admin.close()
+        pytest.skip(f"No se pudo crear la base de datos de pruebas: {str(e)}")
+
+    try:
+        yield make_url(database_url).set(database=name).render_as_string(hide_password=False)
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE);')
+        admin.close()
+
+
+@pytest.fixture
+def pipeline_database(empty_database, monkeypatch):
+    """Base de datos temporal migrada, usada por el pool compartido (DATABASE_URL)"""
+    from src.loaders.data_loader import get_id_cache
+    from src.utils.migrations import MigrationRunner
+    from src.utils.query_cache import get_query_cache
+    from src.utils.resources import close_all
+
+    MigrationRunner(empty_database).migrate()
+    monkeypatch.setenv('DATABASE_URL', empty_database)
+    close_all()
+    get_id_cache().clear()
+    get_query_cache().clear()
+    try:
+        yield empty_database
+    finally:
+        close_all()
+        get_id_cache().clear()
+        get_query_cache().clear()
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+from src.transformers.data_cleaner import LEAGUE_TABLE_DTYPES, clean_league_table, clean_top_scorers
+
+
+def league_rows(*rows):
+    columns = ['Position', 'Team', 'Played', 'Won', 'Drawn', 'Lost', 'Goals For',
+               'Goals Against', 'Goal Difference', 'Points']
+    return pd.DataFrame([dict(zip(columns, row)) for row in rows])
+
+
+def scorer_rows(*rows):
+    return pd.DataFrame(rows, columns=['Posición', 'Jugador', 'País', 'Equipo', 'Goles'])
+
+
+def test_clean_league_table():
+    df = league_rows(
+        ('1', ' Arsenal ', '38', '28', '5', '5', '91', '29', '62', '89'),
+        ('2', 'Manchester City', '38', '28', '7', '3', '96', '34', '62', '91 '),
+    )
+    clean = clean_league_table(df)
+
+    assert clean['Team'].dtype == 'category'
+    assert clean['Team'].tolist() == ['Arsenal', 'Manchester City']
+    assert {column: str(dtype) for column, dtype in clean[list(LEAGUE_TABLE_DTYPES)].dtypes.items()} == \
+        LEAGUE_TABLE_DTYPES
+    assert clean.loc[1, 'Points'] == 91
+    assert clean.loc[0, 'Goal Difference'] == 62
+    # El DataFrame de entrada no se modifica
+    assert df.loc[0, 'Team'] == ' Arsenal '
+
+
+def test_clean_league_table_negative_goal_difference():
+    clean = clean_league_table(league_rows(('20', 'Sheffield United', '38', '3', '7', '28', '35', '104', '-69', '16')))
+    assert clean.loc[0, 'Goal Difference'] == -69
+
+
+def test_non_numeric_league_cell_raises():
+    df = league_rows(
+        ('1', 'Arsenal', '38', '28', '5', '5', '91', '29', '62', '89'),
+        ('2', 'Chelsea', '38', 'x', '9', '11', '77', '63', '14', '63'),
+    )
+    with pytest.raises(ValueError, match=r"Valores no numéricos .*\['Won'\]"):
+        clean_league_table(df)
+
+
+def test_missing_league_column_raises():
+    with pytest.raises(ValueError, match="Faltan columnas en la tabla de posiciones"):
+        clean_league_table(league_rows(('1', 'Arsenal')))
+
+
+def test_clean_top_scorers_goals_and_penalties():
+    clean = clean_top_scorers(scorer_rows(
+        ('1.', 'Erling Haaland ', ' Norway', ' Manchester City\n', '27 (7)'),
+        ('2.', 'Cole Palmer', 'England', 'Chelsea', ' 10 (2) '),
+        ('', 'Ollie Watkins', 'England', 'Aston Villa', '10'),
+    ))
+
+    assert clean['Goles'].tolist() == [27, 10, 10]
+    assert clean['Penales'].tolist() == [7, 2, 0]
+    assert str(clean['Goles'].dtype) == str(clean['Penales'].dtype) == 'int16'
+    # Empate: la posición queda vacía
+    assert clean['Posición'].tolist()[:2] == [1, 2]
+    assert pd.isna(clean.loc[2, 'Posición'])
+    assert clean['Jugador'].tolist()[0] == 'Erling Haaland'
+    assert clean['Equipo'].tolist()[0] == 'Manchester City'
+    assert clean['País'].dtype == 'category' and clean['Equipo'].dtype == 'category'
+
+
+def test_malformed_scorer_row_is_dropped(caplog):
+    clean = clean_top_scorers(scorer_rows(
+        ('1.', 'Erling Haaland', 'Norway', 'Manchester City', '27 (7)'),
+        ('2.', 'Cole Palmer', 'England', 'Chelsea', 'n/d'),
+        ('3.', 'Alexander Isak', 'Sweden', 'Newcastle United', '21 (4'),
+        ('4.', 'Phil Foden', 'England', 'Manchester City', '19'),
+    ))
+
+    assert clean['Jugador'].tolist() == ['Erling Haaland', 'Phil Foden']
+    assert clean.index.tolist() == [0, 1]
+    assert "descartadas por goles inválidos: 2" in caplog.text
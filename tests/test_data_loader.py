@@ -0,0 +1,51 @@
+import pandas as pd
+from src.loaders.data_loader import PremierLeagueLoader, get_id_cache
+
+SEASON = '2023-2024'
+
+
+def test_rollback_keeps_shared_id_cache_for_other_loaders(pipeline_database):
+    with PremierLeagueLoader(SEASON) as writer:
+        team_ids = writer.load_teams_bulk(['Arsenal', 'Chelsea'])
+        writer.commit()
+
+    reader = PremierLeagueLoader(SEASON)
+    failed = PremierLeagueLoader(SEASON)
+    try:
+        # El lector ya pasó por warm_cache() cuando otro loader revierte
+        reader.warm_cache()
+        assert failed.load_teams_bulk(['Liverpool'])['Liverpool'] is not None
+        failed.rollback()
+
+        assert get_id_cache().warm
+        assert failed._team_id('Liverpool') is None
+        assert reader._team_id('Arsenal') == team_ids['Arsenal']
+
+        player_ids = reader.load_players_bulk(pd.DataFrame({
+            'name': ['Bukayo Saka', 'Cole Palmer'],
+            'team_name': ['Arsenal', 'Chelsea'],
+            'country': ['England', 'England'],
+        }))
+        reader.commit()
+        assert all(player_id is not None for player_id in player_ids.values())
+
+        reader.cur.execute("SELECT count(*) FROM players WHERE team_id IS NULL;")
+        assert reader.cur.fetchone()[0] == 0
+        reader.cur.execute("SELECT count(*) FROM teams WHERE name = 'Liverpool';")
+        assert reader.cur.fetchone()[0] == 0
+    finally:
+        failed.close()
+        reader.close()
+
+
+def test_ids_of_a_transaction_are_shared_only_after_commit(pipeline_database):
+    with PremierLeagueLoader(SEASON) as first:
+        first.load_teams_bulk(['Arsenal'])
+        assert 'Arsenal' not in get_id_cache().teams
+        first.commit()
+    assert 'Arsenal' in get_id_cache().teams
+
+    with PremierLeagueLoader(SEASON) as second:
+        second.invalidate_cache()
+        assert not get_id_cache().warm
+        assert second.load_teams_bulk(['Arsenal'])['Arsenal'] == get_id_cache().teams['Arsenal']
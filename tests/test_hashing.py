@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from src.utils.hashing import frame_hash, keyed_row_hashes, row_hashes
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        'Position': [1, 2, 3],
+        'Team': ['Arsenal', 'Liverpool', 'Chelsea'],
+        'Points': [80, 78, 70],
+    })
+
+
+@pytest.mark.parametrize('dtype', ['int16', 'int32', 'Int16', 'Int64'])
+def test_frame_hash_ignores_integer_width(table, dtype):
+    # data_cleaner pasa a tipos compactos: no debe verse como un cambio
+    compact = table.astype({'Position': dtype, 'Points': dtype})
+    assert frame_hash(compact) == frame_hash(table)
+
+
+@pytest.mark.parametrize('dtype', ['category', 'string'])
+def test_frame_hash_ignores_string_storage(table, dtype):
+    assert frame_hash(table.astype({'Team': dtype})) == frame_hash(table)
+
+
+def test_frame_hash_is_index_independent(table):
+    shuffled_index = table.set_axis([10, 20, 30])
+    assert frame_hash(shuffled_index) == frame_hash(table)
+    assert row_hashes(shuffled_index).tolist() == row_hashes(table).tolist()
+
+
+def test_frame_hash_is_deterministic(table):
+    assert frame_hash(table.copy()) == frame_hash(table)
+    assert len(frame_hash(table)) == 64
+
+
+def test_frame_hash_detects_changes(table):
+    changed = table.copy()
+    changed.loc[2, 'Points'] = 71
+    assert frame_hash(changed) != frame_hash(table)
+    assert frame_hash(table.iloc[::-1]) != frame_hash(table)
+    assert frame_hash(table.rename(columns={'Points': 'Pts'})) != frame_hash(table)
+    assert frame_hash(table.astype({'Points': 'float64'})) != frame_hash(table)
+
+
+def test_keyed_row_hashes(table):
+    hashes = keyed_row_hashes(table, ['Position', 'Team'])
+    assert list(hashes) == ['1|Arsenal', '2|Liverpool', '3|Chelsea']
+    assert all(len(value) == 16 for value in hashes.values())
+
+    changed = table.copy()
+    changed.loc[1, 'Points'] = 79
+    changed_hashes = keyed_row_hashes(changed.astype({'Points': 'int16'}), ['Position', 'Team'])
+    assert [key for key in hashes if hashes[key] != changed_hashes[key]] == ['2|Liverpool']
@@ -0,0 +1,84 @@
+import pytest
+from src.benchmarks.fixtures import TEAMS, league_table_html, load_fixture
+from src.extractors.html_parser import (LEAGUE_TABLE_CLASS, TOP_SCORERS_CLASS, TOP_SCORERS_HEADERS,
+                                        find_table_fragment, lxml_html, parse_league_table,
+                                        parse_top_scorers)
+from src.transformers.data_cleaner import clean_league_table, clean_top_scorers
+
+BACKENDS = ['bs4', pytest.param('lxml', marks=pytest.mark.skipif(lxml_html is None, reason="Sin lxml"))]
+
+
+@pytest.fixture(scope='module')
+def league_html():
+    html = load_fixture('league_table')
+    assert html is not None, "Falta src/benchmarks/fixtures/league_table.html"
+    return html
+
+
+@pytest.fixture(scope='module')
+def scorers_html():
+    html = load_fixture('top_scorers')
+    assert html is not None, "Falta src/benchmarks/fixtures/top_scorers.html"
+    return html
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_parse_league_table_fixture(league_html, backend):
+    df = parse_league_table(league_html, backend)
+
+    assert list(df.columns) == ['Position', 'Team', 'Played', 'Won', 'Drawn', 'Lost', 'Goals For',
+                                'Goals Against', 'Goal Difference', 'Points']
+    assert df['Team'].tolist() == TEAMS
+    assert df['Position'].tolist() == [str(i) for i in range(1, 21)]
+
+    clean = clean_league_table(df)
+    assert (clean['Played'] == clean['Won'] + clean['Drawn'] + clean['Lost']).all()
+    assert (clean['Goal Difference'] == clean['Goals For'] - clean['Goals Against']).all()
+    assert (clean['Points'] == 3 * clean['Won'] + clean['Drawn']).all()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_parse_top_scorers_fixture(scorers_html, backend):
+    df = parse_top_scorers(scorers_html, backend)
+
+    assert list(df.columns) == TOP_SCORERS_HEADERS
+    assert len(df) == 300
+    assert df.loc[0, 'Posición'] == '1.'
+    assert df.loc[0, 'Jugador'] == 'Player 1'
+
+    clean = clean_top_scorers(df)
+    assert len(clean) == 300
+    assert clean['Posición'].tolist()[:3] == [1, 2, 3]
+    assert (clean['Penales'] <= clean['Goles']).all()
+    assert clean['Equipo'].isin(TEAMS).all()
+
+
+def test_backends_agree(league_html, scorers_html):
+    if lxml_html is None:
+        pytest.skip("Sin lxml")
+    assert parse_league_table(league_html, 'lxml').equals(parse_league_table(league_html, 'bs4'))
+    assert parse_top_scorers(scorers_html, 'lxml').equals(parse_top_scorers(scorers_html, 'bs4'))
+
+
+def test_find_table_fragment_skips_other_and_nested_tables(scorers_html):
+    fragment = find_table_fragment(scorers_html, TOP_SCORERS_CLASS)
+    assert fragment.startswith('<table class="standard_tabelle"')
+    assert fragment.endswith('</table>')
+    assert 'auswahlbox' not in fragment
+
+    nested = '<table class="a b"><tr><td><table><tr><td>x</td></tr></table></td></tr></table><p>fin</p>'
+    assert find_table_fragment(nested, 'b') == nested[:-len('<p>fin</p>')]
+
+
+def test_missing_table_returns_none():
+    html = '<html><body><table class="other"><tr><td>1</td></tr></table></body></html>'
+    assert parse_league_table(html) is None
+    assert parse_top_scorers(html) is None
+    assert find_table_fragment(html, LEAGUE_TABLE_CLASS) is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_malformed_league_row_raises(backend):
+    html = league_table_html(n_rows=3, filler_kb=1).replace('<td><span class="pos">2</span></td>', '', 1)
+    with pytest.raises(ValueError, match="Se esperaban 11 columnas"):
+        parse_league_table(html, backend)
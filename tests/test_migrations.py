@@ -0,0 +1,71 @@
+import pytest
+from src.utils.migrations import MIGRATIONS_DIR, Migration, MigrationRunner, load_migrations
+
+
+def write_migration(directory, filename, sql):
+    path = directory / filename
+    path.write_text(sql, encoding='utf-8')
+    return str(path)
+
+
+def test_statements_split_on_trailing_semicolons(tmp_path):
+    path = write_migration(tmp_path, '0001_indexes.sql', (
+        "-- migrate: no-transaction\n"
+        "-- Comentario con ; que no separa nada\n"
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_a;\n"
+        "\n"
+        "CREATE INDEX CONCURRENTLY idx_a\n"
+        "    ON t (a, b DESC);   \n"
+        "CREATE INDEX CONCURRENTLY idx_b ON t (c)\n"
+    ))
+    migration = Migration(1, 'indexes', path)
+
+    assert not migration.transactional
+    assert migration.statements() == [
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_a",
+        "CREATE INDEX CONCURRENTLY idx_a\n    ON t (a, b DESC)",
+        "CREATE INDEX CONCURRENTLY idx_b ON t (c)",
+    ]
+
+
+def test_semicolon_inside_line_does_not_split(tmp_path):
+    path = write_migration(tmp_path, '0001_x.sql', "INSERT INTO t VALUES ('a;b'); SELECT 1;\n")
+    assert Migration(1, 'x', path).statements() == ["INSERT INTO t VALUES ('a;b'); SELECT 1"]
+
+
+def test_repo_migrations_are_ordered_and_parse():
+    migrations = load_migrations(MIGRATIONS_DIR)
+    versions = [m.version for m in migrations]
+    assert versions == sorted(versions) == list(range(1, len(versions) + 1))
+    for migration in migrations:
+        assert len(migration.checksum) == 64
+        if not migration.transactional:
+            assert migration.statements()
+
+
+def test_load_migrations_ignores_other_files_and_rejects_duplicates(tmp_path):
+    write_migration(tmp_path, '0001_a.sql', "SELECT 1;")
+    write_migration(tmp_path, 'README.md', "no es una migración")
+    assert [repr(m) for m in load_migrations(str(tmp_path))] == ['0001_a']
+
+    write_migration(tmp_path, '0001_b.sql', "SELECT 2;")
+    with pytest.raises(ValueError, match="duplicadas"):
+        load_migrations(str(tmp_path))
+
+
+def test_migrate_is_idempotent(empty_database):
+    runner = MigrationRunner(empty_database)
+
+    applied = runner.migrate()
+    assert [m.version for m in applied] == [m.version for m in runner.migrations]
+    assert all(is_applied and checksum_ok for _, is_applied, checksum_ok in runner.status())
+
+    assert runner.migrate() == []
+
+
+def test_migrate_up_to_target_then_rest(empty_database):
+    runner = MigrationRunner(empty_database)
+
+    assert [m.version for m in runner.migrate(target=2)] == [1, 2]
+    assert [is_applied for _, is_applied, _ in runner.status()][:3] == [True, True, False]
+    assert [m.version for m in runner.migrate()] == [m.version for m in runner.migrations[2:]]
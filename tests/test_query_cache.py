@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+from src.utils.query_cache import ANY_TABLE, QueryCache, normalize_sql, referenced_tables, written_table
+
+
+def test_normalize_sql_collapses_whitespace_outside_literals():
+    query = "SELECT *\n  FROM   teams\tWHERE name = 'Man  City' ;\n"
+    assert normalize_sql(query) == "SELECT * FROM teams WHERE name = 'Man  City'"
+
+
+def test_make_key_ignores_formatting_and_param_order():
+    a = QueryCache.make_key('db', "SELECT * FROM teams WHERE id = :id AND s = :s;", {'id': 1, 's': 'x'})
+    b = QueryCache.make_key('db', "SELECT *   FROM teams\nWHERE id = :id AND s = :s", {'s': 'x', 'id': 1})
+    assert a == b
+    assert QueryCache.make_key('otra', "SELECT * FROM teams") != QueryCache.make_key('db', "SELECT * FROM teams")
+
+
+def test_referenced_tables():
+    query = 'SELECT * FROM public.team_stats ts JOIN "Teams" t ON t.team_id = ts.team_id'
+    assert referenced_tables(query) == {'team_stats', 'teams'}
+    assert referenced_tables("SELECT 1") == {ANY_TABLE}
+
+
+@pytest.mark.parametrize('query, table', [
+    ("INSERT INTO team_stats (a) VALUES (1)", 'team_stats'),
+    ("  update ONLY public.teams SET a = 1", 'teams'),
+    ("DELETE FROM player_stats WHERE id = 1", 'player_stats'),
+    ("TRUNCATE TABLE load_state", 'load_state'),
+    ("REFRESH MATERIALIZED VIEW CONCURRENTLY current_standings", 'current_standings'),
+    ("COPY \"Teams\" FROM STDIN", 'teams'),
+    (b"INSERT INTO players (name) VALUES ('x')", 'players'),
+    ("SELECT * FROM teams", None),
+    ("WITH x AS (SELECT 1) SELECT * FROM x", None),
+    (None, None),
+])
+def test_written_table(query, table):
+    assert written_table(query) == table
+
+
+def test_written_table_only_reads_statement_head():
+    # execute_values envía sentencias enormes: solo se mira el principio
+    query = "INSERT INTO team_stats VALUES " + ", ".join(["(1)"] * 10000)
+    assert written_table(query) == 'team_stats'
+    assert written_table(query.encode('utf-8')) == 'team_stats'
+
+
+def _loader(calls, value=1):
+    def load():
+        calls.append(value)
+        return pd.DataFrame({'a': [value]})
+    return load
+
+
+def test_hits_return_copies():
+    cache = QueryCache(ttl=60)
+    key = cache.make_key('db', "SELECT * FROM teams")
+    calls = []
+
+    first = cache.get_or_load(key, _loader(calls))
+    first.loc[0, 'a'] = 99
+    second = cache.get_or_load(key, _loader(calls))
+
+    assert calls == [1]
+    assert second.loc[0, 'a'] == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_written_table_invalidates_readers_of_that_table():
+    cache = QueryCache(ttl=60)
+    teams = cache.make_key('db', "SELECT * FROM teams")
+    stats = cache.make_key('db', "SELECT * FROM team_stats")
+    unknown = cache.make_key('db', "SELECT current_season()")
+    calls = []
+    for key in (teams, stats, unknown):
+        cache.get_or_load(key, _loader(calls))
+
+    assert cache.invalidate_tables([written_table("INSERT INTO public.team_stats (a) VALUES (1)")]) == 2
+
+    cache.get_or_load(teams, _loader(calls, 2))
+    cache.get_or_load(stats, _loader(calls, 3))
+    cache.get_or_load(unknown, _loader(calls, 4))
+    assert calls == [1, 1, 1, 3, 4]
+
+
+def test_result_loaded_during_a_write_is_not_cached():
+    cache = QueryCache(ttl=60)
+    key = cache.make_key('db', "SELECT * FROM teams")
+
+    def load_while_writing():
+        cache.invalidate_tables(['teams'])
+        return pd.DataFrame({'a': [1]})
+
+    cache.get_or_load(key, load_while_writing)
+    assert cache.stats()['entries'] == 0
+
+
+def test_ttl_zero_disables_cache():
+    cache = QueryCache(ttl=0)
+    key = cache.make_key('db', "SELECT * FROM teams")
+    calls = []
+    cache.get_or_load(key, _loader(calls))
+    cache.get_or_load(key, _loader(calls))
+    assert calls == [1, 1]
+
+
+def test_lru_eviction_by_entries():
+    cache = QueryCache(ttl=60, max_entries=2)
+    keys = [cache.make_key('db', f"SELECT * FROM t{i}") for i in range(3)]
+    calls = []
+    for key in keys:
+        cache.get_or_load(key, _loader(calls))
+
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+    cache.get_or_load(keys[0], _loader(calls))
+    assert len(calls) == 4
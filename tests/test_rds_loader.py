@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from sqlalchemy.engine import make_url
+from src.loaders.rds_loader import RDSLoader
+
+
+@pytest.fixture
+def rds_loader(empty_database):
+    from src.utils.resources import close_all
+
+    url = make_url(empty_database).set(drivername='postgresql+psycopg2')
+    try:
+        yield RDSLoader(url.render_as_string(hide_password=False))
+    finally:
+        close_all()
+
+
+def standings(points):
+    return pd.DataFrame({
+        'season': ['2023-2024'] * len(points),
+        'team': [team for team, _ in points],
+        'points': [value for _, value in points],
+    })
+
+
+def read_table(loader):
+    return loader.execute_query("SELECT team, points FROM standings ORDER BY team", use_cache=False)
+
+
+def test_copy_upsert_inserts_and_updates(rds_loader):
+    keys = ['season', 'team']
+    assert rds_loader.upload_to_rds(standings([('Arsenal', 80), ('Chelsea', 60)]), 'standings',
+                                    method='copy', conflict_keys=keys)
+    assert rds_loader.upload_to_rds(standings([('Chelsea', 63), ('Everton', 40)]), 'standings',
+                                    method='copy', conflict_keys=keys)
+
+    assert read_table(rds_loader).values.tolist() == [['Arsenal', 80], ['Chelsea', 63], ['Everton', 40]]
+
+
+def test_copy_upsert_with_repeated_keys_keeps_last_row(rds_loader, caplog):
+    keys = ['season', 'team']
+    assert rds_loader.upload_to_rds(standings([('Arsenal', 80)]), 'standings',
+                                    method='copy', conflict_keys=keys)
+
+    repeated = standings([('Arsenal', 81), ('Chelsea', 60), ('Arsenal', 83), ('Chelsea', 61)])
+    assert rds_loader.upload_to_rds(repeated, 'standings', method='copy', conflict_keys=keys)
+
+    assert read_table(rds_loader).values.tolist() == [['Arsenal', 83], ['Chelsea', 61]]
+    assert "repetida en standings" in caplog.text
+    # El DataFrame del llamador no se modifica
+    assert len(repeated) == 4
@@ -0,0 +1,319 @@
+import json
+import threading
+from datetime import datetime
+from unittest import mock
+import pandas as pd
+import pytest
+from botocore.exceptions import ClientError
+
+SEASON = '2023-2024'
+
+
+def scorers(goals):
+    return pd.DataFrame({
+        'Posición': pd.array([1, 2], dtype='Int16'),
+        'Jugador': ['Erling Haaland', 'Mohamed Salah'],
+        'País': pd.Categorical(['Norway', 'Egypt']),
+        'Equipo': pd.Categorical(['Manchester City', 'Liverpool']),
+        'Goles': pd.array([goals, 18], dtype='int16'),
+        'Penales': pd.array([7, 5], dtype='int16'),
+    })
+
+
+def save_at(loader, df, when, data_type='top_scorers', **kwargs):
+    """save_to_s3 con datetime.now() fijado (las claves y el manifiesto usan la fecha)"""
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromisoformat(when)
+
+    with mock.patch('src.loaders.s3_loader.datetime', FixedDatetime):
+        return loader.save_to_s3(df, data_type, SEASON, **kwargs)
+
+
+def parquet_keys(loader, prefix='premier_league/'):
+    return sorted(obj['Key'] for obj in loader.iter_objects(prefix) if obj['Key'].endswith('.parquet'))
+
+
+def test_save_records_snapshot_in_manifest(s3_loader):
+    assert save_at(s3_loader, scorers(27), '2023-10-01T10:00:00')
+
+    [entry] = s3_loader.find_snapshots('top_scorers', SEASON)
+    assert entry['key'] == parquet_keys(s3_loader)[0]
+    assert entry['key'].startswith(f"premier_league/top_scorers/season={SEASON}/snapshot_date=2023-10-01/part-100000-")
+    assert entry['rows'] == 2
+    assert entry['snapshot_ts'] == '2023-10-01T10:00:00'
+    assert len(entry['frame_hash']) == 64
+
+
+def test_unchanged_data_is_not_uploaded_again(s3_loader):
+    assert save_at(s3_loader, scorers(27), '2023-10-01T10:00:00')
+    # Mismos datos con otros tipos y otro índice: siguen sin cambios
+    same = scorers(27).astype({'Goles': 'int64', 'Jugador': 'string'}).set_axis([5, 6])
+    assert save_at(s3_loader, same, '2023-10-02T10:00:00')
+    assert len(parquet_keys(s3_loader)) == 1
+
+    assert save_at(s3_loader, scorers(28), '2023-10-03T10:00:00')
+    assert len(parquet_keys(s3_loader)) == 2
+    # La comparación es con el último snapshot, no con cualquiera
+    assert save_at(s3_loader, scorers(27), '2023-10-04T10:00:00')
+    assert len(parquet_keys(s3_loader)) == 3
+
+    assert save_at(s3_loader, scorers(27), '2023-10-05T10:00:00', skip_unchanged=False)
+    assert len(parquet_keys(s3_loader)) == 4
+
+
+def test_dedupe_lookup_failure_uploads_anyway(s3_loader, caplog):
+    assert save_at(s3_loader, scorers(27), '2023-10-01T10:00:00')
+
+    real_get = s3_loader._get_manifest
+    denied = ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denegado'}}, 'GetObject')
+    with mock.patch.object(s3_loader, '_get_manifest', side_effect=[denied, real_get('top_scorers')]):
+        assert save_at(s3_loader, scorers(27), '2023-10-02T10:00:00')
+
+    assert len(parquet_keys(s3_loader)) == 2
+    assert len(s3_loader.find_snapshots('top_scorers')) == 2
+    assert "se sube igualmente" in caplog.text
+
+
+def test_corrupt_manifest_does_not_block_uploads(s3_loader):
+    s3_loader.s3_client.put_object(Bucket=s3_loader.bucket_name, Key=s3_loader.manifest_key('top_scorers'),
+                                   Body=b'{no es json')
+    assert save_at(s3_loader, scorers(27), '2023-10-01T10:00:00')
+    assert len(parquet_keys(s3_loader)) == 1
+
+
+def test_manifest_write_is_conditional(s3_loader):
+    manifest, etag = s3_loader._get_manifest('top_scorers')
+    assert etag is None
+    s3_loader._write_manifest('top_scorers', manifest, etag)
+
+    # Otro proceso lo cambió después de leerlo: la escritura se rechaza
+    _, etag = s3_loader._get_manifest('top_scorers')
+    s3_loader._write_manifest('top_scorers', {**manifest, 'snapshots': [{'key': 'otro'}]}, etag)
+    with pytest.raises(ClientError) as error:
+        s3_loader._write_manifest('top_scorers', manifest, etag)
+    assert error.value.response['Error']['Code'] == 'PreconditionFailed'
+
+    # Si ya existe, tampoco se puede crear como nuevo
+    with pytest.raises(ClientError):
+        s3_loader._write_manifest('top_scorers', manifest, None)
+
+
+def test_concurrent_record_keeps_every_entry(s3_loader):
+    barrier = threading.Barrier(2)
+    real_get = s3_loader._get_manifest
+
+    def racing_get(data_type):
+        # Los dos escritores leen la misma versión antes de escribir
+        result = real_get(data_type)
+        try:
+            barrier.wait(timeout=1)
+        except threading.BrokenBarrierError:
+            pass
+        return result
+
+    entry = {'season': SEASON, 'snapshot_ts': '2023-10-01T10:00:00', 'rows': 1}
+    with mock.patch.object(s3_loader, '_get_manifest', side_effect=racing_get), \
+            mock.patch('src.loaders.s3_loader.time.sleep'):
+        threads = [threading.Thread(target=s3_loader._record_snapshots,
+                                    args=('top_scorers', [{**entry, 'key': f'k{i}'}])) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert sorted(e['key'] for e in s3_loader.read_manifest('top_scorers')['snapshots']) == ['k0', 'k1']
+
+
+def test_find_snapshots_filters_by_season_and_range(s3_loader):
+    for day in ('01', '05', '09'):
+        save_at(s3_loader, scorers(int(day)), f'2023-10-{day}T10:00:00', skip_unchanged=False)
+
+    assert [e['snapshot_ts'][:10] for e in s3_loader.find_snapshots('top_scorers', SEASON)] == \
+        ['2023-10-01', '2023-10-05', '2023-10-09']
+    assert len(s3_loader.find_snapshots('top_scorers', since='2023-10-05', until='2023-10-09T10:00:00')) == 2
+    assert s3_loader.find_snapshots('top_scorers', season='2022-2023') == []
+
+
+def test_rebuild_manifest_from_listing(s3_loader):
+    for day in ('01', '05'):
+        save_at(s3_loader, scorers(int(day)), f'2023-10-{day}T10:00:00')
+    s3_loader.s3_client.delete_object(Bucket=s3_loader.bucket_name, Key=s3_loader.manifest_key('top_scorers'))
+
+    manifest = s3_loader.rebuild_manifest('top_scorers')
+    assert [e['key'] for e in manifest['snapshots']] == parquet_keys(s3_loader)
+    assert all(e['season'] == SEASON and e['rows'] == 2 for e in manifest['snapshots'])
+    assert json.loads(s3_loader.s3_client.get_object(
+        Bucket=s3_loader.bucket_name, Key=s3_loader.manifest_key('top_scorers'))['Body'].read()) == manifest
+
+
+def test_rebuilt_manifest_keeps_dedupe_working(s3_loader):
+    df = scorers(27)
+    df.loc[1, 'Posición'] = pd.NA  # empate: posición vacía
+    assert save_at(s3_loader, df, '2023-10-01T10:00:00')
+    [original] = s3_loader.find_snapshots('top_scorers')
+
+    s3_loader.s3_client.delete_object(Bucket=s3_loader.bucket_name, Key=s3_loader.manifest_key('top_scorers'))
+    [rebuilt] = s3_loader.rebuild_manifest('top_scorers')['snapshots']
+    assert rebuilt['frame_hash'] == original['frame_hash']
+
+    assert save_at(s3_loader, df, '2023-10-02T10:00:00')
+    assert len(parquet_keys(s3_loader)) == 1
+
+
+def test_rebuilt_frame_hash_matches_cleaned_league_table(s3_loader):
+    from src.benchmarks.fixtures import load_fixture
+    from src.extractors.html_parser import parse_league_table
+    from src.transformers.data_cleaner import clean_league_table
+
+    # El limpiador deja las columnas en otro orden que el esquema de S3
+    df = clean_league_table(parse_league_table(load_fixture('league_table')))
+    assert save_at(s3_loader, df, '2023-10-01T10:00:00', data_type='league_table')
+    recorded = s3_loader.read_manifest('league_table')['snapshots']
+
+    assert s3_loader.rebuild_manifest('league_table')['snapshots'] == recorded
+
+
+def test_rebuild_keeps_snapshots_saved_meanwhile_and_drops_missing(s3_loader):
+    assert save_at(s3_loader, scorers(1), '2023-10-01T10:00:00')
+    s3_loader._record_snapshots('top_scorers', [{
+        'key': 'premier_league/top_scorers/season=2023-2024/snapshot_date=2023-09-01/part-100000-borrado.parquet',
+        'season': SEASON, 'snapshot_ts': '2023-09-01T10:00:00', 'rows': 2}])
+
+    # Un save_to_s3 termina mientras se lista el prefijo
+    real_iter = s3_loader.iter_objects
+
+    def listing_then_save(prefix):
+        objects = list(real_iter(prefix))
+        assert save_at(s3_loader, scorers(2), '2023-10-02T10:00:00')
+        return iter(objects)
+
+    with mock.patch.object(s3_loader, 'iter_objects', side_effect=listing_then_save):
+        manifest = s3_loader.rebuild_manifest('top_scorers')
+
+    assert [e['snapshot_ts'][:10] for e in manifest['snapshots']] == ['2023-10-01', '2023-10-02']
+    assert sorted(e['key'] for e in s3_loader.read_manifest('top_scorers')['snapshots']) == parquet_keys(s3_loader)
+
+
+@pytest.fixture
+def compacted(s3_loader):
+    """Temporada con tres snapshots en octubre y uno en noviembre, compactada"""
+    from src.loaders.s3_compactor import S3Compactor
+
+    for goals, when in enumerate(('2023-10-01T10:00:00', '2023-10-05T10:00:00',
+                                  '2023-10-09T10:00:00', '2023-11-02T10:00:00')):
+        assert save_at(s3_loader, scorers(goals), when)
+
+    entries = S3Compactor(s3_loader).compact_season('top_scorers', SEASON)
+    assert [e['month'] for e in entries] == ['2023-10', '2023-11']
+    return s3_loader
+
+
+def test_compaction_keeps_snapshots_findable(compacted):
+    assert parquet_keys(compacted, 'premier_league/top_scorers/') == []
+
+    snapshots = compacted.find_snapshots('top_scorers', SEASON)
+    assert [(e['first_snapshot_ts'], e['snapshot_ts'], e['snapshots']) for e in snapshots] == [
+        ('2023-10-01T10:00:00', '2023-10-09T10:00:00', 3),
+        ('2023-11-02T10:00:00', '2023-11-02T10:00:00', 1),
+    ]
+    assert all(set(e['files']) <= set(parquet_keys(compacted)) for e in snapshots)
+    # Un rango dentro del mes compactado devuelve su entrada
+    assert len(compacted.find_snapshots('top_scorers', since='2023-10-04', until='2023-10-06')) == 1
+
+
+def test_compaction_keeps_dedupe_working(compacted):
+    assert save_at(compacted, scorers(3), '2023-11-10T10:00:00')
+    assert len(compacted.find_snapshots('top_scorers')) == 2
+
+    assert save_at(compacted, scorers(4), '2023-11-11T10:00:00')
+    assert len(compacted.find_snapshots('top_scorers')) == 3
+
+
+def test_read_cache_reads_compacted_months(compacted, tmp_path):
+    from src.loaders.s3_cache import S3ReadCache
+
+    cache = S3ReadCache(compacted, cache_dir=str(tmp_path))
+    table = cache.read_snapshots('top_scorers', SEASON).to_pandas()
+    assert table['snapshot_ts'].dt.strftime('%m-%d').unique().tolist() == ['10-01', '10-05', '10-09', '11-02']
+    assert table.loc[table['Jugador'] == 'Erling Haaland', 'Goles'].tolist() == [0, 1, 2, 3]
+
+    window = cache.read_snapshots('top_scorers', since='2023-10-04', until='2023-10-06',
+                                  columns=['Jugador', 'Goles']).to_pandas()
+    assert list(window.columns) == ['Jugador', 'Goles', 'snapshot_ts']
+    assert window['Goles'].tolist() == [1, 18]
+
+
+def test_recompaction_merges_new_snapshots(compacted, tmp_path):
+    from src.loaders.s3_cache import S3ReadCache
+    from src.loaders.s3_compactor import S3Compactor
+
+    assert save_at(compacted, scorers(9), '2023-11-20T09:00:00')
+    S3Compactor(compacted).compact_season('top_scorers', SEASON, '2023-11')
+
+    november = compacted.find_snapshots('top_scorers', since='2023-11-01')
+    assert [(e['snapshot_ts'], e['snapshots']) for e in november] == [('2023-11-20T09:00:00', 2)]
+    table = S3ReadCache(compacted, cache_dir=str(tmp_path)).read_snapshots('top_scorers', since='2023-11-01')
+    assert table.num_rows == 4
+
+
+def run_before_first_put(loader, key, action):
+    """Ejecuta action() justo antes de la primera escritura de key (una carrera)"""
+    real_put = loader.put_json
+    pending = [action]
+
+    def racing_put(put_key, *args, **kwargs):
+        if put_key == key and pending:
+            pending.pop()()
+        return real_put(put_key, *args, **kwargs)
+
+    return mock.patch.object(loader, 'put_json', side_effect=racing_put)
+
+
+def referenced_and_stored_files(loader):
+    from src.loaders.s3_compactor import S3Compactor
+
+    compactor = S3Compactor(loader)
+    manifest = compactor.read_manifest('top_scorers')
+    referenced = sorted(key for entry in manifest['partitions'].values() for key in entry['files'])
+    return manifest, referenced, parquet_keys(loader, compactor.compacted_prefix('top_scorers'))
+
+
+def test_overlapping_compactions_of_different_months_keep_both(s3_loader):
+    from src.loaders.s3_compactor import S3Compactor
+
+    for goals, when in enumerate(('2023-10-01T10:00:00', '2023-11-02T10:00:00')):
+        assert save_at(s3_loader, scorers(goals), when)
+
+    compactor = S3Compactor(s3_loader)
+    other = S3Compactor(s3_loader)
+    with run_before_first_put(s3_loader, compactor.manifest_key('top_scorers'),
+                              lambda: other.compact('top_scorers', SEASON, '2023-11')), \
+            mock.patch('src.loaders.s3_loader.time.sleep'):
+        assert compactor.compact('top_scorers', SEASON, '2023-10')
+
+    manifest, referenced, stored = referenced_and_stored_files(s3_loader)
+    assert sorted(manifest['partitions']) == [f'{SEASON}/2023-10', f'{SEASON}/2023-11']
+    assert referenced == stored
+    assert len(s3_loader.find_snapshots('top_scorers')) == 2
+
+
+def test_overlapping_compactions_of_the_same_month_leave_no_orphans(s3_loader):
+    from src.loaders.s3_compactor import S3Compactor
+
+    for goals, when in enumerate(('2023-10-01T10:00:00', '2023-10-05T10:00:00')):
+        assert save_at(s3_loader, scorers(goals), when)
+
+    compactor = S3Compactor(s3_loader)
+    other = S3Compactor(s3_loader)
+    with run_before_first_put(s3_loader, compactor.manifest_key('top_scorers'),
+                              lambda: other.compact('top_scorers', SEASON, '2023-10')):
+        with pytest.raises(RuntimeError, match="Otra compactación"):
+            compactor.compact('top_scorers', SEASON, '2023-10')
+
+    manifest, referenced, stored = referenced_and_stored_files(s3_loader)
+    assert manifest['partitions'][f'{SEASON}/2023-10']['snapshots'] == 2
+    assert referenced == stored
+    [entry] = s3_loader.find_snapshots('top_scorers')
+    assert entry['files'] == referenced
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from unittest import mock
+import pytest
+from src.scheduler import MATCH_WINDOWS, PipelineScheduler, SourceState, in_match_window
+
+# 2024-01-13 es sábado y 2024-01-16 martes; en enero Londres está en UTC
+SATURDAY_MATCH = datetime(2024, 1, 13, 15, 0, tzinfo=timezone.utc)
+SATURDAY_NIGHT = datetime(2024, 1, 13, 23, 30, tzinfo=timezone.utc)
+TUESDAY_MORNING = datetime(2024, 1, 16, 9, 0, tzinfo=timezone.utc)
+TUESDAY_EVENING = datetime(2024, 1, 16, 20, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('now, expected', [
+    (SATURDAY_MATCH, True),
+    (SATURDAY_NIGHT, False),
+    (TUESDAY_MORNING, False),
+    (TUESDAY_EVENING, True),
+])
+def test_in_match_window(now, expected):
+    assert in_match_window(now, MATCH_WINDOWS) is expected
+
+
+def test_in_match_window_uses_london_time():
+    # Sábado 12:30 en Londres (horario de verano) son las 11:30 UTC
+    assert in_match_window(datetime(2024, 8, 17, 11, 30, tzinfo=timezone.utc))
+    assert not in_match_window(datetime(2024, 8, 17, 10, 30, tzinfo=timezone.utc))
+
+
+@pytest.fixture
+def scheduler():
+    return PipelineScheduler(season='2023-2024', fast_interval=120, slow_interval=1800,
+                             max_backoff=3600, jitter=0)
+
+
+def test_interval_fast_during_matches_and_slow_otherwise(scheduler):
+    state = SourceState('league_table')
+    assert scheduler.interval(state, SATURDAY_MATCH) == 120
+    assert scheduler.interval(state, TUESDAY_MORNING) == 1800
+
+
+def test_interval_exponential_backoff_is_capped(scheduler):
+    state = SourceState('league_table')
+    delays = []
+    for errors in range(6):
+        state.errors = errors
+        delays.append(scheduler.interval(state, SATURDAY_MATCH))
+    assert delays == [120, 240, 480, 960, 1920, 3600]
+
+    state.errors = 1
+    assert scheduler.interval(state, TUESDAY_MORNING) == 3600
+
+
+def test_interval_jitter_bounds():
+    scheduler = PipelineScheduler(season='2023-2024', fast_interval=100, jitter=0.1)
+    state = SourceState('top_scorers')
+    with mock.patch('src.scheduler.random.uniform', side_effect=lambda low, high: low):
+        assert scheduler.interval(state, SATURDAY_MATCH) == pytest.approx(90)
+    with mock.patch('src.scheduler.random.uniform', side_effect=lambda low, high: high):
+        assert scheduler.interval(state, SATURDAY_MATCH) == pytest.approx(110)
+    for _ in range(50):
+        assert 90 <= scheduler.interval(state, SATURDAY_MATCH) <= 110
+
+
+def test_run_pending_backs_off_after_errors(scheduler):
+    scheduler.sources = {'league_table': SourceState('league_table')}
+    with mock.patch.object(scheduler, 'poll', return_value=False), \
+            mock.patch('src.scheduler.in_match_window', return_value=True):
+        scheduler.run_pending()
+        assert scheduler.sources['league_table'].errors == 1
+        scheduler.sources['league_table'].next_run = 0
+        delay = scheduler.run_pending()
+        assert scheduler.sources['league_table'].errors == 2
+        assert delay == pytest.approx(480, abs=1)
+
+    with mock.patch.object(scheduler, 'poll', return_value=True):
+        scheduler.sources['league_table'].next_run = 0
+        scheduler.run_pending()
+        assert scheduler.sources['league_table'].errors == 0
@@ -0,0 +1,87 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from src.loaders.sinks import Sink, SinkFanout, SinkResult, drain_pending
+
+DF = pd.DataFrame({'a': [1, 2]})
+
+
+def ok(df):
+    return True
+
+
+def returns_false(df):
+    return False
+
+
+def raises(df):
+    raise ConnectionError("sin conexión")
+
+
+def test_succeeded_when_all_sinks_succeed():
+    results = SinkFanout([Sink('s3', ok), Sink('postgres', ok)]).write(DF, 'league_table')
+    assert SinkFanout.succeeded(results)
+    assert SinkFanout.failed_sinks(results) == []
+    assert all(result.ok and result.seconds >= 0 for result in results.values())
+
+
+@pytest.mark.parametrize('write', [returns_false, raises])
+def test_required_sink_failure_fails_dataset(write):
+    results = SinkFanout([Sink('s3', write), Sink('postgres', ok)]).write(DF, 'league_table')
+    assert not SinkFanout.succeeded(results)
+    assert SinkFanout.failed_sinks(results) == ['s3']
+    assert results['s3'].error
+
+
+@pytest.mark.parametrize('write', [returns_false, raises])
+def test_optional_sink_failure_does_not_fail_dataset(write):
+    results = SinkFanout([Sink('s3', write, required=False), Sink('postgres', ok)]).write(DF, 'league_table')
+    assert SinkFanout.succeeded(results)
+    # Sigue contando como fallido: la página no se marca como procesada
+    assert SinkFanout.failed_sinks(results) == ['s3']
+
+
+def test_succeeded_only_looks_at_required_results():
+    results = {
+        'a': SinkResult('a', True, 0.1, required=True),
+        'b': SinkResult('b', False, 0.1, required=False, error="x"),
+    }
+    assert SinkFanout.succeeded(results)
+    results['c'] = SinkResult('c', False, 0.1, required=True, error="y")
+    assert not SinkFanout.succeeded(results)
+    assert SinkFanout.succeeded({})
+
+
+def test_sinks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait_for_other(df):
+        barrier.wait()
+        return True
+
+    results = SinkFanout([Sink('a', wait_for_other), Sink('b', wait_for_other)]).write(DF, 'league_table')
+    assert SinkFanout.succeeded(results)
+
+
+def test_timed_out_sink_fails_and_is_drained():
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow(df):
+        release.wait(5)
+        finished.set()
+        return True
+
+    start = time.monotonic()
+    results = SinkFanout([Sink('slow', slow, timeout=0.2), Sink('fast', ok)]).write(DF, 'league_table')
+    assert time.monotonic() - start < 2
+    assert results['slow'].timed_out
+    assert not SinkFanout.succeeded(results)
+    assert not finished.is_set()
+
+    # close_all() espera a la escritura abandonada antes de cerrar los recursos
+    assert not drain_pending(timeout=0.05)
+    release.set()
+    assert drain_pending(timeout=5)
+    assert finished.is_set()